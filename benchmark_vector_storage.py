@@ -0,0 +1,118 @@
+"""
+Compare recall@k and latency of the IVF-flat index and of quantized (float16 / uint8)
+vectors, with and without float32 re-ranking, against exact float32 search on MemmapVectorDB.
+
+    python benchmark_vector_storage.py --rows 200000 --dim 384 --queries 200 --top-k 10
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from lightrag.ann import IVFFlatIndex
+from lightrag.memmap_vectordb import MemmapVectorDB
+
+
+def make_vectors(rows, dim, clusters, seed=0):
+    """Clustered random vectors, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=rows)
+    return (centers[labels] + 0.3 * rng.normal(size=(rows, dim))).astype(np.float32)
+
+
+def make_queries(vectors, count, seed=1):
+    """Sampled data vectors, moved by noise: queries from the same clusters as the data."""
+    rng = np.random.default_rng(seed)
+    samples = vectors[rng.integers(0, len(vectors), size=count)]
+    return (samples + 0.3 * rng.normal(size=samples.shape)).astype(np.float32)
+
+
+def build_db(working_dir, vectors, index=None, dtype="float32", rerank_factor=0):
+    db = MemmapVectorDB(
+        vectors.shape[1],
+        storage_file=os.path.join(working_dir, "vdb_benchmark"),
+        dtype=dtype,
+        index=index,
+        index_min_rows=0 if index is not None else 10000,
+        rerank_factor=rerank_factor,
+    )
+    batch_size = 50000
+    for start in range(0, len(vectors), batch_size):
+        db.upsert(
+            [
+                {"__id__": f"vec-{i}", "__vector__": vectors[i]}
+                for i in range(start, min(start + batch_size, len(vectors)))
+            ]
+        )
+    return db
+
+
+def run_queries(db, queries, top_k, **query_kwargs):
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = db.query(query, top_k=top_k, **query_kwargs)
+        latencies.append(time.perf_counter() - start)
+        results.append({hit["__id__"] for hit in hits})
+    return results, np.array(latencies) * 1000
+
+
+def recall_at_k(results, exact_results):
+    return np.mean(
+        [len(found & exact) / max(len(exact), 1) for found, exact in zip(results, exact_results)]
+    )
+
+
+def report(name, results, latencies, exact_results, db=None):
+    size = ""
+    if db is not None:
+        size = " " + " ".join(
+            f"{kind}={nbytes / 2**20:.1f}MiB" for kind, nbytes in db.nbytes().items()
+        )
+    print(
+        f"{name:<28} recall@k={recall_at_k(results, exact_results):.4f} "
+        f"p50={np.percentile(latencies, 50):.2f}ms p95={np.percentile(latencies, 95):.2f}ms"
+        f"{size}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--dtype", nargs="+", default=["float16", "uint8"])
+    parser.add_argument("--rerank-factor", type=int, nargs="+", default=[0, 4])
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.rows, args.dim, clusters=max(args.nlist, 16))
+    queries = make_queries(vectors, args.queries)
+
+    with tempfile.TemporaryDirectory() as exact_dir, tempfile.TemporaryDirectory() as ivf_dir:
+        exact_db = build_db(exact_dir, vectors)
+        exact_results, latencies = run_queries(exact_db, queries, args.top_k)
+        report("exact", exact_results, latencies, exact_results, exact_db)
+
+        start = time.perf_counter()
+        ivf_db = build_db(ivf_dir, vectors, IVFFlatIndex(nlist=args.nlist))
+        print(f"IVF build: {time.perf_counter() - start:.1f}s")
+        for nprobe in args.nprobe:
+            results, latencies = run_queries(ivf_db, queries, args.top_k, nprobe=nprobe)
+            report(f"ivf nlist={args.nlist} nprobe={nprobe}", results, latencies, exact_results)
+
+    for dtype in args.dtype:
+        for rerank_factor in args.rerank_factor:
+            with tempfile.TemporaryDirectory() as quantized_dir:
+                db = build_db(quantized_dir, vectors, dtype=dtype, rerank_factor=rerank_factor)
+                results, latencies = run_queries(db, queries, args.top_k)
+                report(f"{dtype} rerank={rerank_factor}", results, latencies, exact_results, db)
+
+
+if __name__ == "__main__":
+    main()
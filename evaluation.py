@@ -0,0 +1,237 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# List of all valid sections
+SECTIONS = ["194C", "194JA", "194JB", "194Q", "194A", "194IA", "194IB", "194H", "NO TDS"]
+
+# Original answers containing any of these (after cleaning) count as a match for every mode
+ANY_SECTION_MARKERS = ["DOUBT", "CANTFINDANYSECTION"]
+
+NO_SECTION = "NONE"
+
+
+def _section_key(section):
+    """Section name as it appears in a cleaned string, e.g. "NO TDS" -> "NOTDS"."""
+    return re.sub(r"[^A-Z0-9]+", "", section.upper())
+
+
+SECTION_KEYS = {_section_key(section): section for section in SECTIONS}
+
+# One alternation over every section, longest first so "194JA" wins over a shorter prefix
+SECTION_PATTERN = "|".join(
+    re.escape(key) for key in sorted(SECTION_KEYS, key=len, reverse=True)
+)
+ANSWER_PATTERNS = {
+    "Section 1": f"SECTION1({SECTION_PATTERN})",
+    "Section 2": f"SECTION2({SECTION_PATTERN})",
+}
+FIRST_SECTION_PATTERN = f"({SECTION_PATTERN})"
+
+# make_results.py's original exact comparison: the four characters after the first
+# "SECTION1:" (before any "SECTION2:") and after the first "SECTION2:", spaces removed
+EXACT_PATTERNS = {
+    "Section 1": r"^(?:(?!SECTION2:).)*?SECTION1:((?:(?!SECTION1:|SECTION2:).){0,4})",
+    "Section 2": r"SECTION2:((?:(?!SECTION2:).){0,4})",
+}
+
+# How match_sections decides a row matches, see its docstring
+MATCH_METHODS = ("sections", "exact", "answer")
+
+
+def clean_sections_text(values):
+    """
+    Uppercase and remove all punctuation and whitespace from a Series of answers.
+    Missing values become "".
+    """
+    cleaned = (
+        pd.Series(values)
+        .astype("string")
+        .str.upper()
+        .str.replace(r"[^A-Z0-9]+", "", regex=True)
+    )
+    return cleaned.fillna("").astype(object)
+
+
+def section_flags(cleaned):
+    """
+    Boolean DataFrame with one column per section telling whether the cleaned answer
+    mentions it.
+    """
+    return pd.DataFrame(
+        {
+            section: cleaned.str.contains(key, regex=False)
+            for key, section in SECTION_KEYS.items()
+        },
+        index=cleaned.index,
+    )
+
+
+def flags_to_sections(flags):
+    """Comma separated list of the flagged sections in each row, in SECTIONS order."""
+    labels = np.array([f"{section}, " for section in flags.columns], dtype=object)
+    selected = np.where(flags.to_numpy(dtype=bool), labels, "").astype(object)
+    joined = selected.sum(axis=1) if selected.shape[1] else np.full(len(flags), "")
+    return pd.Series(joined, index=flags.index, dtype=object).str.rstrip(", ")
+
+
+def extract_sections(values):
+    """
+    Extract recognized TDS sections from a Series of answers, returned as comma separated
+    lists. 'NO TDS' is recognized as 'NOTDS' since spaces and punctuation are removed.
+    """
+    return flags_to_sections(section_flags(clean_sections_text(values)))
+
+
+def extract_answer_sections(cleaned):
+    """
+    The sections given as "Section 1: ..." and "Section 2: ..." in cleaned answers, and the
+    first section mentioned anywhere as a fallback for answers that don't follow the format.
+    """
+    answers = pd.DataFrame(index=cleaned.index)
+    for column, pattern in ANSWER_PATTERNS.items():
+        answers[column] = cleaned.str.extract(pattern, expand=False).map(SECTION_KEYS)
+    first = cleaned.str.extract(FIRST_SECTION_PATTERN, expand=False).map(SECTION_KEYS)
+    answers["Section 1"] = answers["Section 1"].fillna(first)
+    return answers
+
+
+def exact_match(retrieved, original):
+    """
+    make_results.py's original metric: with spaces removed and uppercased, the whole
+    original answer must equal the four characters following "SECTION1:" or "SECTION2:"
+    in the retrieved answer. No doubt markers, no fallback, no partial originals.
+    """
+    retrieved = pd.Series(retrieved).astype("string").str.replace(" ", "").str.upper()
+    original = pd.Series(original).astype("string").str.replace(" ", "").str.upper()
+    match = pd.Series(False, index=retrieved.index)
+    for pattern in EXACT_PATTERNS.values():
+        # A missing section compares as "" like in the original script
+        section = retrieved.str.extract(pattern, flags=re.DOTALL, expand=False).fillna("")
+        match |= original.eq(section).fillna(False).astype(bool)
+    return match
+
+
+def match_sections(df, retrieved="Retrieved Section", original="Original Answer", match="sections"):
+    """
+    Add section analysis columns to `df` and return it:
+      - 'Retrieved Sections List' / 'Original Sections List': recognized sections
+      - 'Predicted Section' / 'Expected Section': primary retrieved and original section
+      - 'Match', depending on `match`:
+        - "sections" (make_results_2.py): the original mentions 'doubt' or "can't find
+          any section", or any section mentioned in the retrieved answer is in the
+          original sections.
+        - "exact" (make_results.py): the original answer is exactly the answered
+          Section 1 or Section 2, see exact_match. Doubt markers never match.
+        - "answer": like "sections", but only the answered Section 1 and Section 2
+          count, falling back to the first section mentioned for unformatted answers.
+          Looser than "exact", so its accuracy is not comparable with it.
+    """
+    if match not in MATCH_METHODS:
+        raise ValueError(f"match must be one of {MATCH_METHODS}, got {match!r}")
+    cleaned_retrieved = clean_sections_text(df[retrieved])
+    cleaned_original = clean_sections_text(df[original])
+
+    original_flags = section_flags(cleaned_original)
+    answers = extract_answer_sections(cleaned_retrieved)
+    if match != "sections":
+        retrieved_flags = pd.DataFrame(
+            {
+                section: answers["Section 1"].eq(section)
+                | answers["Section 2"].eq(section)
+                for section in SECTIONS
+            },
+            index=df.index,
+        )
+    else:
+        retrieved_flags = section_flags(cleaned_retrieved)
+
+    any_section = cleaned_original.str.contains(
+        "|".join(ANY_SECTION_MARKERS), regex=True
+    )
+
+    df = df.copy()
+    df["Retrieved Sections List"] = flags_to_sections(retrieved_flags)
+    df["Original Sections List"] = flags_to_sections(original_flags)
+    df["Predicted Section"] = answers["Section 1"].fillna(NO_SECTION)
+    df["Expected Section"] = (
+        extract_answer_sections(cleaned_original)["Section 1"].fillna(NO_SECTION)
+    )
+    if match == "exact":
+        df["Match"] = exact_match(df[retrieved], df[original])
+    else:
+        df["Match"] = any_section | (retrieved_flags & original_flags).any(axis=1)
+    return df
+
+
+def calculate_metrics(df, by="Mode"):
+    """
+    Precision, recall and accuracy (in %) per mode. Every match is a true positive and
+    every non-match a false positive, there are no false negatives.
+    """
+    grouped = df.groupby(by, sort=False)["Match"]
+    metrics = pd.DataFrame({"TP": grouped.sum(), "Total": grouped.size()})
+    FP = metrics["Total"] - metrics["TP"]
+    FN = 0
+    metrics["Precision"] = (metrics["TP"] / (metrics["TP"] + FP)).fillna(0) * 100
+    metrics["Recall"] = (metrics["TP"] / (metrics["TP"] + FN)).fillna(0) * 100
+    metrics["Accuracy"] = (metrics["TP"] / metrics["Total"]).fillna(0) * 100
+    return metrics[["Precision", "Recall", "Accuracy"]].reset_index()
+
+
+def confusion_matrix(df, by="Mode"):
+    """
+    Counts of expected (rows) against predicted (columns) primary sections for each mode.
+    """
+    return pd.crosstab(
+        [df[by], df["Expected Section"]],
+        df["Predicted Section"],
+        rownames=[by, "Expected Section"],
+        colnames=["Predicted Section"],
+    )
+
+
+def section_metrics(df, by="Mode"):
+    """
+    Per mode and section precision and recall (in %) of the primary predicted section.
+    """
+    predicted = df["Predicted Section"].rename("Section")
+    expected = df["Expected Section"].rename("Section")
+    correct = predicted.eq(expected)
+    metrics = pd.concat(
+        {
+            "TP": correct.groupby([df[by], predicted]).sum(),
+            "Predicted": predicted.groupby([df[by], predicted]).size(),
+            "Expected": expected.groupby([df[by], expected]).size(),
+        },
+        axis=1,
+    ).fillna(0)
+    metrics["Precision"] = (metrics["TP"] / metrics["Predicted"]).fillna(0) * 100
+    metrics["Recall"] = (metrics["TP"] / metrics["Expected"]).fillna(0) * 100
+    return metrics.astype({"TP": int, "Predicted": int, "Expected": int}).reset_index()
+
+
+def evaluate(df, by="Mode", match="sections"):
+    """
+    Run the whole evaluation on logged results and return
+    (detailed rows, per-mode summary, confusion matrix, per-section metrics).
+    `match` picks the Match rule, see match_sections.
+    """
+    detailed = match_sections(df, match=match)
+    return (
+        detailed,
+        calculate_metrics(detailed, by=by),
+        confusion_matrix(detailed, by=by),
+        section_metrics(detailed, by=by),
+    )
+
+
+def load_results(file_name, columns=("Transaction No", "Mode", "Retrieved Section", "Original Answer")):
+    """Read logged results from an Excel, CSV or Parquet file."""
+    columns = list(columns)
+    if file_name.endswith(".csv"):
+        return pd.read_csv(file_name, usecols=columns)
+    if file_name.endswith(".parquet"):
+        return pd.read_parquet(file_name, columns=columns)
+    return pd.read_excel(file_name, usecols=columns)
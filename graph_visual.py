@@ -1,9 +1,19 @@
-import networkx as nx
+import os
 from pyvis.network import Network
 import random
 
-# Load the GraphML file
-G = nx.read_graphml("./final_database/graph_chunk_entity_relation.graphml")
+from lightrag.storage import NetworkXStorage
+
+GRAPH_FILE = "./final_database/graph_chunk_entity_relation.pkl"
+GRAPHML_FILE = "./final_database/graph_chunk_entity_relation.graphml"
+
+# Load the graph, saved by NetworkXStorage (as GraphML by older versions)
+G = NetworkXStorage.load_nx_graph(
+    GRAPH_FILE if os.path.exists(GRAPH_FILE) else GRAPHML_FILE
+)
+
+# Export a GraphML copy for other graph tools
+NetworkXStorage.write_nx_graph(G, GRAPHML_FILE)
 
 # Create a Pyvis network
 net = Network(height="100vh", notebook=True)
@@ -0,0 +1,127 @@
+import os
+
+import numpy as np
+
+from .utils import logger
+
+
+class IVFFlatIndex:
+    """
+    Inverted-file index over normalized vectors, in pure NumPy.
+
+    Vectors are clustered into `nlist` cells with spherical k-means. A query is only scored
+    exactly against the rows of its `nprobe` closest cells, so latency scales with
+    nprobe / nlist of the rows; raising `nprobe` trades latency for recall, and
+    `nprobe == nlist` is the exact search. Rows are added incrementally to their closest
+    cell and removed by row number; the index stores row numbers only, the vectors stay in
+    the storage that owns them.
+    """
+
+    def __init__(self, nlist: int = 100, nprobe: int = 8, n_iter: int = 10, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids = None
+        self.assignments = np.zeros(0, dtype=np.int32)  # row -> cell, -1 if not indexed
+        self._cells = None
+        self.trained_rows = 0
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray):
+        """
+        Fit the cell centroids on (a sample of) `vectors` and drop all assignments.
+        """
+        rng = np.random.default_rng(self.seed)
+        nlist = min(self.nlist, len(vectors))
+        sample_size = min(len(vectors), 256 * nlist)
+        sample = np.asarray(
+            vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))],
+            dtype=np.float32,
+        )
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+        for _ in range(self.n_iter):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            empty = counts == 0
+            # Re-seed empty cells with random sample points
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.where(norms == 0, 1, norms)
+        self.centroids = centroids.astype(np.float32)
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self._cells = None
+        self.trained_rows = len(vectors)
+        logger.info(f"Trained IVF index with {nlist} cells on {sample_size} vectors")
+
+    def assign(self, vectors: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), chunk_size):
+            block = np.asarray(vectors[start : start + chunk_size], dtype=np.float32)
+            labels[start : start + chunk_size] = np.argmax(block @ self.centroids.T, axis=1)
+        return labels
+
+    def add(self, first_row: int, vectors: np.ndarray):
+        """Index `vectors`, stored at rows first_row, first_row + 1, ..."""
+        end = first_row + len(vectors)
+        if len(self.assignments) < end:
+            self.assignments = np.concatenate(
+                [self.assignments, np.full(end - len(self.assignments), -1, dtype=np.int32)]
+            )
+        self.assignments[first_row:end] = self.assign(vectors)
+        self._cells = None
+
+    def remove(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[rows < len(self.assignments)]
+        self.assignments[rows] = -1
+        self._cells = None
+
+    def remap(self, kept_rows: np.ndarray):
+        """Renumber rows after the storage compacted `kept_rows` into rows 0..n-1."""
+        kept_rows = kept_rows[kept_rows < len(self.assignments)]
+        self.assignments = self.assignments[kept_rows]
+        self._cells = None
+
+    def _build_cells(self):
+        # Rows grouped by cell, as one sorted array plus offsets
+        order = np.argsort(self.assignments, kind="stable")
+        labels = self.assignments[order]
+        first_indexed = np.searchsorted(labels, 0)
+        order, labels = order[first_indexed:], labels[first_indexed:]
+        offsets = np.searchsorted(labels, np.arange(len(self.centroids) + 1))
+        self._cells = (order, offsets)
+
+    def candidates(self, query: np.ndarray, nprobe: int = None) -> np.ndarray:
+        """Rows in the `nprobe` cells closest to the normalized `query`."""
+        if self._cells is None:
+            self._build_cells()
+        order, offsets = self._cells
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        cells = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([order[offsets[c] : offsets[c + 1]] for c in cells])
+
+    def save(self, file_name: str):
+        tmp_file_name = f"{file_name}.tmp.npz"
+        np.savez(
+            tmp_file_name,
+            centroids=self.centroids,
+            assignments=self.assignments,
+            trained_rows=self.trained_rows,
+        )
+        os.replace(tmp_file_name, file_name)
+
+    def load(self, file_name: str) -> bool:
+        if not os.path.exists(file_name):
+            return False
+        with np.load(file_name) as saved:
+            self.centroids = saved["centroids"]
+            self.assignments = saved["assignments"]
+            self.trained_rows = int(saved["trained_rows"])
+        self._cells = None
+        return True
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Request
 from pydantic import BaseModel
+import asyncio
 import logging
 import argparse
 import json
@@ -585,14 +586,9 @@ def create_app(args):
         # Startup logic
         try:
             new_files = doc_manager.scan_directory()
-            for file_path in new_files:
-                try:
-                    await index_file(file_path)
-                except Exception as e:
-                    trace_exception(e)
-                    logging.error(f"Error indexing file {file_path}: {str(e)}")
+            indexed_count = await index_files(new_files)
 
-            logging.info(f"Indexed {len(new_files)} documents from {args.input_dir}")
+            logging.info(f"Indexed {indexed_count} documents from {args.input_dir}")
         except Exception as e:
             logging.error(f"Error during startup indexing: {str(e)}")
         yield
@@ -718,36 +714,10 @@ def create_app(args):
             embedding_func=embedding_func,
         )
 
-    async def index_file(file_path: Union[str, Path]) -> None:
-        """Index all files inside the folder with support for multiple file formats
-
-        Args:
-            file_path: Path to the file to be indexed (str or Path object)
-
-        Raises:
-            ValueError: If file format is not supported
-            FileNotFoundError: If file doesn't exist
-        """
-        if not pm.is_installed("aiofiles"):
-            pm.install("aiofiles")
-
-        # Convert to Path object if string
-        file_path = Path(file_path)
-
-        # Check if file exists
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-
+    def extract_file_content(file_path: Path) -> str:
+        """Extract the text of a PDF, Word or PowerPoint file (blocking)"""
         content = ""
-        # Get file extension in lowercase
-        ext = file_path.suffix.lower()
-
-        match ext:
-            case ".txt" | ".md":
-                # Text files handling
-                async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-                    content = await f.read()
-
+        match file_path.suffix.lower():
             case ".pdf":
                 if not pm.is_installed("pypdf2"):
                     pm.install("pypdf2")
@@ -755,7 +725,6 @@ def create_app(args):
 
                 # PDF handling
                 reader = PdfReader(str(file_path))
-                content = ""
                 for page in reader.pages:
                     content += page.extract_text() + "\n"
 
@@ -775,22 +744,90 @@ def create_app(args):
 
                 # PowerPoint handling
                 prs = Presentation(file_path)
-                content = ""
                 for slide in prs.slides:
                     for shape in slide.shapes:
                         if hasattr(shape, "text"):
                             content += shape.text + "\n"
+        return content
+
+    async def read_file(file_path: Union[str, Path]) -> str:
+        """Read the text content of a file in any supported format
+
+        Args:
+            file_path: Path to the file to be read (str or Path object)
+
+        Raises:
+            ValueError: If file format is not supported
+            FileNotFoundError: If file doesn't exist
+        """
+        if not pm.is_installed("aiofiles"):
+            pm.install("aiofiles")
+
+        # Convert to Path object if string
+        file_path = Path(file_path)
+
+        # Check if file exists
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        # Get file extension in lowercase
+        ext = file_path.suffix.lower()
+
+        match ext:
+            case ".txt" | ".md":
+                # Text files handling
+                async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
+                    return await f.read()
+
+            case ".pdf" | ".docx" | ".pptx":
+                # Parsing is CPU bound, keep it off the event loop
+                return await asyncio.to_thread(extract_file_content, file_path)
 
             case _:
                 raise ValueError(f"Unsupported file format: {ext}")
 
+    async def index_file(file_path: Union[str, Path]) -> None:
+        """Index a file in any supported format
+
+        Args:
+            file_path: Path to the file to be indexed (str or Path object)
+
+        Raises:
+            ValueError: If file format is not supported
+            FileNotFoundError: If file doesn't exist
+        """
+        await index_files([file_path], raise_errors=True)
+
+    async def index_files(
+        file_paths: list[Union[str, Path]], raise_errors: bool = False
+    ) -> int:
+        """Read files concurrently and index them with a single ainsert call, so the
+        documents are chunked and extracted in parallel. Returns the number of files
+        indexed.
+        """
+        contents = await asyncio.gather(
+            *[read_file(file_path) for file_path in file_paths],
+            return_exceptions=True,
+        )
+        indexed = {}
+        for file_path, content in zip(file_paths, contents):
+            if isinstance(content, Exception):
+                if raise_errors:
+                    raise content
+                trace_exception(content)
+                logging.error(f"Error indexing file {file_path}: {str(content)}")
+            elif content:
+                indexed[file_path] = content
+            else:
+                logging.warning(f"No content extracted from file: {file_path}")
+
         # Insert content into RAG system
-        if content:
-            await rag.ainsert(content)
-            doc_manager.mark_as_indexed(file_path)
-            logging.info(f"Successfully indexed file: {file_path}")
-        else:
-            logging.warning(f"No content extracted from file: {file_path}")
+        if indexed:
+            await rag.ainsert(list(indexed.values()))
+            for file_path in indexed:
+                doc_manager.mark_as_indexed(file_path)
+                logging.info(f"Successfully indexed file: {file_path}")
+        return len(indexed)
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
@@ -798,14 +835,9 @@ def create_app(args):
         # Startup logic
         try:
             new_files = doc_manager.scan_directory()
-            for file_path in new_files:
-                try:
-                    await index_file(file_path)
-                except Exception as e:
-                    trace_exception(e)
-                    logging.error(f"Error indexing file {file_path}: {str(e)}")
+            indexed_count = await index_files(new_files)
 
-            logging.info(f"Indexed {len(new_files)} documents from {args.input_dir}")
+            logging.info(f"Indexed {indexed_count} documents from {args.input_dir}")
         except Exception as e:
             logging.error(f"Error during startup indexing: {str(e)}")
 
@@ -814,14 +846,7 @@ def create_app(args):
         """Manually trigger scanning for new documents"""
         try:
             new_files = doc_manager.scan_directory()
-            indexed_count = 0
-
-            for file_path in new_files:
-                try:
-                    await index_file(file_path)
-                    indexed_count += 1
-                except Exception as e:
-                    logging.error(f"Error indexing file {file_path}: {str(e)}")
+            indexed_count = await index_files(new_files)
 
             return {
                 "status": "success",
@@ -1,3 +1,4 @@
+import asyncio
 from dataclasses import dataclass, field
 from typing import TypedDict, Union, Literal, Generic, TypeVar, Optional, Dict, Any
 from enum import Enum
@@ -34,6 +35,10 @@ class QueryParam:
     hl_keywords: list[str] = field(default_factory=list)
     ll_keywords: list[str] = field(default_factory=list)
     transaction_no: int = 0
+    # Maximum number of queries answered by one LLM call in batch query mode.
+    batch_size: int = 8
+    # Minimum share of a query's retrieved entities/relations that must already be in a batch's context for the query to join it.
+    batch_min_context_overlap: float = 0.5
 
 
 @dataclass
@@ -49,6 +54,11 @@ class StorageNameSpace:
         """commit the storage operations after querying"""
         pass
 
+    def has_local_data(self) -> Union[bool, None]:
+        """Whether the files holding this storage in the working dir exist and are not
+        empty, checked without loading them. None for storages kept elsewhere."""
+        return None
+
 
 @dataclass
 class BaseVectorStorage(StorageNameSpace):
@@ -58,6 +68,15 @@ class BaseVectorStorage(StorageNameSpace):
     async def query(self, query: str, top_k: int) -> list[dict]:
         raise NotImplementedError
 
+    async def query_many(
+        self, queries: list[str], top_k: int, embeddings: np.ndarray = None
+    ) -> list[list[dict]]:
+        """Run several queries, returning one result list per query.
+        Storages that override this embed all queries in one batch (or use `embeddings`,
+        precomputed with this storage's embedding_func) and score them together.
+        """
+        return await asyncio.gather(*[self.query(query, top_k) for query in queries])
+
     async def upsert(self, data: dict[str, dict]):
         """Use 'content' field from value for embedding, use key as id.
         If embedding_func is None, use 'embedding' field from value
@@ -128,6 +147,38 @@ class BaseGraphStorage(StorageNameSpace):
     ):
         raise NotImplementedError
 
+    async def get_nodes(self, node_ids: list[str]) -> dict[str, dict]:
+        """Existing nodes among node_ids, keyed by id.
+        Remote backends override the bulk methods to batch the items in a few queries.
+        """
+        nodes = await asyncio.gather(*[self.get_node(node_id) for node_id in node_ids])
+        return {
+            node_id: node for node_id, node in zip(node_ids, nodes) if node is not None
+        }
+
+    async def get_edges(
+        self, edges: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        """Existing edges among (source, target) pairs, keyed by pair."""
+        found = await asyncio.gather(*[self.get_edge(src, tgt) for src, tgt in edges])
+        return {pair: edge for pair, edge in zip(edges, found) if edge is not None}
+
+    async def upsert_nodes(self, nodes: dict[str, dict[str, str]]):
+        await asyncio.gather(
+            *[
+                self.upsert_node(node_id, node_data)
+                for node_id, node_data in nodes.items()
+            ]
+        )
+
+    async def upsert_edges(self, edges: dict[tuple[str, str], dict[str, str]]):
+        await asyncio.gather(
+            *[
+                self.upsert_edge(src, tgt, edge_data)
+                for (src, tgt), edge_data in edges.items()
+            ]
+        )
+
     async def delete_node(self, node_id: str):
         raise NotImplementedError
 
@@ -27,6 +27,15 @@ if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
+# Nodes or edges read by one UNION ALL query in the bulk graph methods
+GRAPH_BATCH_SIZE = 200
+
+
+def _batched(items: list, size: int = GRAPH_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
 class AGEQueryException(Exception):
     """Exception for the AGE queries."""
 
@@ -310,6 +319,34 @@ class AGEStorage(BaseGraphStorage):
         # convert cypher query to pgsql/age query
         wrapped_query = self._wrap_query(query, self.graph_name, **params)
 
+        await self._ensure_graph()
+
+        # execute the query, rolling back on an error
+        async with self._get_pool_connection() as conn:
+            async with conn.cursor(row_factory=namedtuple_row) as curs:
+                try:
+                    await curs.execute('SET search_path = ag_catalog, "$user", public')
+                    await curs.execute(wrapped_query)
+                    await conn.commit()
+                except psycopg.Error as e:
+                    await conn.rollback()
+                    raise AGEQueryException(
+                        {
+                            "message": f"Error executing graph query: {query.format(**params)}",
+                            "detail": str(e),
+                        }
+                    ) from e
+
+                data = await curs.fetchall()
+                if data is None:
+                    result = []
+                # decode records
+                else:
+                    result = [AGEStorage._record_to_dict(d) for d in data]
+
+                return result
+
+    async def _ensure_graph(self):
         await self._driver.open()
 
         # create graph if it doesn't exist
@@ -325,31 +362,37 @@ class AGEStorage(BaseGraphStorage):
                 ):
                     await conn.rollback()
 
-        # execute the query, rolling back on an error
+    async def _execute_many(self, queries: List[Tuple[str, Dict[str, str]]]):
+        """
+        Run cypher write queries in one transaction, pipelined so that the whole batch
+        costs a single round-trip instead of one per query
+
+        Args:
+            queries (List[Tuple[str, Dict[str, str]]]): (cypher query, parameters) pairs
+        """
+        if not queries:
+            return
+        await self._ensure_graph()
+
         async with self._get_pool_connection() as conn:
-            async with conn.cursor(row_factory=namedtuple_row) as curs:
+            async with conn.cursor() as curs:
                 try:
                     await curs.execute('SET search_path = ag_catalog, "$user", public')
-                    await curs.execute(wrapped_query)
+                    async with conn.pipeline():
+                        for query, params in queries:
+                            await curs.execute(
+                                self._wrap_query(query, self.graph_name, **params)
+                            )
                     await conn.commit()
                 except psycopg.Error as e:
                     await conn.rollback()
                     raise AGEQueryException(
                         {
-                            "message": f"Error executing graph query: {query.format(**params)}",
+                            "message": f"Error executing {len(queries)} graph queries",
                             "detail": str(e),
                         }
                     ) from e
 
-                data = await curs.fetchall()
-                if data is None:
-                    result = []
-                # decode records
-                else:
-                    result = [AGEStorage._record_to_dict(d) for d in data]
-
-                return result
-
     async def has_node(self, node_id: str) -> bool:
         entity_name_label = node_id.strip('"')
 
@@ -593,6 +636,85 @@ class AGEStorage(BaseGraphStorage):
             logger.error("Error during edge upsert: {%s}", e)
             raise
 
+    async def get_nodes(self, node_ids: list[str]) -> dict[str, dict]:
+        """Fetch nodes with one UNION ALL query per batch instead of one per node."""
+        nodes = {}
+        node_ids = list(dict.fromkeys(node_ids))
+        for batch in _batched(node_ids):
+            query = " UNION ALL ".join(
+                "MATCH (n:`%s`) RETURN %d AS i, n"
+                % (AGEStorage._encode_graph_label(node_id.strip('"')), i)
+                for i, node_id in enumerate(batch)
+            )
+            for record in await self._query(query):
+                nodes.setdefault(batch[record["i"]], record["n"])
+        return nodes
+
+    async def get_edges(
+        self, edges: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        """Fetch edges with one UNION ALL query per batch instead of one per edge."""
+        found = {}
+        edges = list(dict.fromkeys(edges))
+        for batch in _batched(edges):
+            query = " UNION ALL ".join(
+                "MATCH (a:`%s`)-[r]->(b:`%s`) RETURN %d AS i, properties(r) AS edge_properties"
+                % (
+                    AGEStorage._encode_graph_label(src.strip('"')),
+                    AGEStorage._encode_graph_label(tgt.strip('"')),
+                    i,
+                )
+                for i, (src, tgt) in enumerate(batch)
+            )
+            for record in await self._query(query):
+                if record["edge_properties"]:
+                    found.setdefault(batch[record["i"]], record["edge_properties"])
+        return found
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((AGEQueryException,)),
+    )
+    async def upsert_nodes(self, nodes: dict[str, dict[str, Any]]):
+        """Upsert nodes in one pipelined transaction."""
+        await self._execute_many(
+            [
+                (
+                    "MERGE (n:`{label}`) SET n += {properties}",
+                    {
+                        "label": AGEStorage._encode_graph_label(node_id.strip('"')),
+                        "properties": AGEStorage._format_properties(node_data),
+                    },
+                )
+                for node_id, node_data in nodes.items()
+            ]
+        )
+        logger.debug("Upserted %d nodes", len(nodes))
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((AGEQueryException,)),
+    )
+    async def upsert_edges(self, edges: dict[tuple[str, str], dict[str, Any]]):
+        """Upsert edges in one pipelined transaction."""
+        await self._execute_many(
+            [
+                (
+                    "MATCH (source:`{src_label}`) WITH source MATCH (target:`{tgt_label}`) "
+                    "MERGE (source)-[r:DIRECTED]->(target) SET r += {properties} RETURN r",
+                    {
+                        "src_label": AGEStorage._encode_graph_label(src.strip('"')),
+                        "tgt_label": AGEStorage._encode_graph_label(tgt.strip('"')),
+                        "properties": AGEStorage._format_properties(edge_data),
+                    },
+                )
+                for (src, tgt), edge_data in edges.items()
+            ]
+        )
+        logger.debug("Upserted %d edges", len(edges))
+
     async def _node2vec_embed(self):
         print("Implemented but never called.")
 
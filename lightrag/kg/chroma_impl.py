@@ -167,6 +167,41 @@ class ChromaVectorDBStorage(BaseVectorStorage):
             logger.error(f"Error during ChromaDB query: {str(e)}")
             raise
 
+    async def query_many(
+        self, queries: list[str], top_k=5, embeddings=None
+    ) -> list[list[dict]]:
+        """Embed all queries in one batch and search them with one collection query"""
+        if not queries:
+            return []
+        try:
+            if embeddings is None:
+                embeddings = await self.embedding_func(queries)
+
+            results = self._collection.query(
+                query_embeddings=np.asarray(embeddings).tolist(),
+                n_results=top_k * 2,  # Request more results to allow for filtering
+                include=["metadatas", "distances", "documents"],
+            )
+
+            return [
+                [
+                    {
+                        "id": results["ids"][q][i],
+                        "distance": 1 - results["distances"][q][i],
+                        "content": results["documents"][q][i],
+                        **results["metadatas"][q][i],
+                    }
+                    for i in range(len(results["ids"][q]))
+                    if (1 - results["distances"][q][i])
+                    >= self.cosine_better_than_threshold
+                ][:top_k]
+                for q in range(len(queries))
+            ]
+
+        except Exception as e:
+            logger.error(f"Error during ChromaDB query: {str(e)}")
+            raise
+
     async def index_done_callback(self):
         # ChromaDB handles persistence automatically
         pass
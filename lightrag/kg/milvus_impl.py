@@ -88,3 +88,24 @@ class MilvusVectorDBStorge(BaseVectorStorage):
             {**dp["entity"], "id": dp["id"], "distance": dp["distance"]}
             for dp in results[0]
         ]
+
+    async def query_many(self, queries: list[str], top_k=5, embeddings=None):
+        """Embed all queries in one batch and search them with one request"""
+        if not queries:
+            return []
+        if embeddings is None:
+            embeddings = await self.embedding_func(queries)
+        results = self._client.search(
+            collection_name=self.namespace,
+            data=embeddings,
+            limit=top_k,
+            output_fields=list(self.meta_fields),
+            search_params={"metric_type": "COSINE", "params": {"radius": 0.2}},
+        )
+        return [
+            [
+                {**dp["entity"], "id": dp["id"], "distance": dp["distance"]}
+                for dp in query_results
+            ]
+            for query_results in results
+        ]
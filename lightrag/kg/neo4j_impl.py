@@ -21,6 +21,19 @@ from tenacity import (
 from lightrag.utils import logger
 from ..base import BaseGraphStorage
 
+# Items folded into one generated statement by the bulk methods. Labels cannot be query
+# parameters, so each item gets its own clause; this bounds the statement size.
+BULK_BATCH_SIZE = 200
+
+
+def _batched(items: list, size: int = BULK_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _label(node_id: str) -> str:
+    return node_id.strip('"')
+
 
 @dataclass
 class Neo4JStorage(BaseGraphStorage):
@@ -337,5 +350,110 @@ class Neo4JStorage(BaseGraphStorage):
             logger.error(f"Error during edge upsert: {str(e)}")
             raise
 
+    async def get_nodes(self, node_ids: list[str]) -> dict[str, dict]:
+        """One UNION ALL query per batch instead of a query per node."""
+        nodes = {}
+        async with self._driver.session(database=self._DATABASE) as session:
+            for batch in _batched(list(dict.fromkeys(node_ids))):
+                query = " UNION ALL ".join(
+                    f"MATCH (n:`{_label(node_id)}`) RETURN {i} AS i, n"
+                    for i, node_id in enumerate(batch)
+                )
+                result = await session.run(query)
+                async for record in result:
+                    nodes.setdefault(batch[record["i"]], dict(record["n"]))
+        logger.debug(f"get_nodes: found {len(nodes)} of {len(node_ids)} nodes")
+        return nodes
+
+    async def get_edges(
+        self, edges: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        """One UNION ALL query per batch instead of a query per edge."""
+        found = {}
+        async with self._driver.session(database=self._DATABASE) as session:
+            for batch in _batched(list(dict.fromkeys(edges))):
+                query = " UNION ALL ".join(
+                    f"MATCH (:`{_label(src)}`)-[r]->(:`{_label(tgt)}`) "
+                    f"RETURN {i} AS i, properties(r) AS edge_properties"
+                    for i, (src, tgt) in enumerate(batch)
+                )
+                result = await session.run(query)
+                async for record in result:
+                    found.setdefault(
+                        batch[record["i"]], dict(record["edge_properties"])
+                    )
+        logger.debug(f"get_edges: found {len(found)} of {len(edges)} edges")
+        return found
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type(
+            (
+                neo4jExceptions.ServiceUnavailable,
+                neo4jExceptions.TransientError,
+                neo4jExceptions.WriteServiceUnavailable,
+            )
+        ),
+    )
+    async def upsert_nodes(self, nodes: dict[str, dict[str, Any]]):
+        """Upsert nodes in one transaction, one MERGE statement per batch."""
+        items = list(nodes.items())
+
+        async def _do_upsert(tx: AsyncManagedTransaction):
+            for batch in _batched(items):
+                query = "\n".join(
+                    f"MERGE (n{i}:`{_label(node_id)}`) SET n{i} += $p{i}"
+                    for i, (node_id, _) in enumerate(batch)
+                )
+                params = {f"p{i}": node_data for i, (_, node_data) in enumerate(batch)}
+                await tx.run(query, params)
+
+        try:
+            async with self._driver.session(database=self._DATABASE) as session:
+                await session.execute_write(_do_upsert)
+            logger.debug(f"Upserted {len(items)} nodes")
+        except Exception as e:
+            logger.error(f"Error during bulk upsert: {str(e)}")
+            raise
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type(
+            (
+                neo4jExceptions.ServiceUnavailable,
+                neo4jExceptions.TransientError,
+                neo4jExceptions.WriteServiceUnavailable,
+            )
+        ),
+    )
+    async def upsert_edges(self, edges: dict[tuple[str, str], dict[str, Any]]):
+        """Upsert edges in one transaction, one statement per batch.
+
+        Each edge is a unit subquery, so an edge whose endpoints are missing is skipped
+        like in upsert_edge instead of ending the statement.
+        """
+        items = list(edges.items())
+
+        async def _do_upsert_edges(tx: AsyncManagedTransaction):
+            for batch in _batched(items):
+                query = "\n".join(
+                    f"CALL {{ MATCH (source:`{_label(src)}`) "
+                    f"MATCH (target:`{_label(tgt)}`) "
+                    f"MERGE (source)-[r:DIRECTED]->(target) SET r += $p{i} }}"
+                    for i, ((src, tgt), _) in enumerate(batch)
+                )
+                params = {f"p{i}": edge_data for i, (_, edge_data) in enumerate(batch)}
+                await tx.run(query, params)
+
+        try:
+            async with self._driver.session(database=self._DATABASE) as session:
+                await session.execute_write(_do_upsert_edges)
+            logger.debug(f"Upserted {len(items)} edges")
+        except Exception as e:
+            logger.error(f"Error during bulk edge upsert: {str(e)}")
+            raise
+
     async def _node2vec_embed(self):
         print("Implemented but never called.")
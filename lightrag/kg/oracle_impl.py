@@ -17,6 +17,10 @@ from ..base import (
 import oracledb
 
 
+# 批量读取时每条 IN (...) 语句绑定的节点或边数, Oracle 的 IN 列表最多 1000 项
+GRAPH_BATCH_SIZE = 500
+
+
 class OracleDB:
     def __init__(self, config, **kwargs):
         self.host = config.get("host", None)
@@ -161,6 +165,20 @@ class OracleDB:
             print(data)
             raise
 
+    async def executemany(self, sql: str, data: list[dict]):
+        """执行批量写入, 一次往返提交所有行"""
+        try:
+            async with self.pool.acquire() as connection:
+                connection.inputtypehandler = self.input_type_handler
+                connection.outputtypehandler = self.output_type_handler
+                with connection.cursor() as cursor:
+                    await cursor.executemany(sql, data)
+                    await connection.commit()
+        except Exception as e:
+            logger.error(f"Oracle database error: {e}")
+            print(sql)
+            raise
+
 
 @dataclass
 class OracleKVStorage(BaseKVStorage):
@@ -456,6 +474,67 @@ class OracleGraphStorage(BaseGraphStorage):
         await self.db.execute(merge_sql, data)
         # self._graph.add_edge(source_node_id, target_node_id, **edge_data)
 
+    async def _embed(self, contents: list[str]) -> np.ndarray:
+        batches = [
+            contents[i : i + self._max_batch_size]
+            for i in range(0, len(contents), self._max_batch_size)
+        ]
+        embeddings_list = await asyncio.gather(
+            *[self.embedding_func(batch) for batch in batches]
+        )
+        return np.concatenate(embeddings_list)
+
+    async def upsert_nodes(self, nodes: dict[str, dict[str, str]]):
+        """批量插入或更新节点"""
+        if not nodes:
+            return
+        contents = [
+            node_id + node_data["description"] for node_id, node_data in nodes.items()
+        ]
+        embeddings = await self._embed(contents)
+        data = [
+            {
+                "workspace": self.db.workspace,
+                "name": node_id,
+                "entity_type": node_data["entity_type"],
+                "description": node_data["description"],
+                "source_chunk_id": node_data["source_id"],
+                "content": content,
+                "content_vector": content_vector,
+            }
+            for (node_id, node_data), content, content_vector in zip(
+                nodes.items(), contents, embeddings
+            )
+        ]
+        await self.db.executemany(SQL_TEMPLATES["merge_node"], data)
+
+    async def upsert_edges(self, edges: dict[tuple[str, str], dict[str, str]]):
+        """批量插入或更新边"""
+        if not edges:
+            return
+        contents = [
+            edge_data["keywords"] + source_name + target_name + edge_data["description"]
+            for (source_name, target_name), edge_data in edges.items()
+        ]
+        embeddings = await self._embed(contents)
+        data = [
+            {
+                "workspace": self.db.workspace,
+                "source_name": source_name,
+                "target_name": target_name,
+                "weight": edge_data["weight"],
+                "keywords": edge_data["keywords"],
+                "description": edge_data["description"],
+                "source_chunk_id": edge_data["source_id"],
+                "content": content,
+                "content_vector": content_vector,
+            }
+            for ((source_name, target_name), edge_data), content, content_vector in zip(
+                edges.items(), contents, embeddings
+            )
+        ]
+        await self.db.executemany(SQL_TEMPLATES["merge_edge"], data)
+
     async def embed_nodes(self, algorithm: str) -> tuple[np.ndarray, list[str]]:
         """为节点生成向量"""
         if algorithm not in self._node_embed_algorithms:
@@ -563,6 +642,45 @@ class OracleGraphStorage(BaseGraphStorage):
             # print("Edge not exist!",self.db.workspace, source_node_id, target_node_id)
             return None
 
+    async def get_nodes(self, node_ids: list[str]) -> dict[str, dict]:
+        """根据节点id批量获取节点数据"""
+        nodes = {}
+        node_ids = list(dict.fromkeys(node_ids))
+        for start in range(0, len(node_ids), GRAPH_BATCH_SIZE):
+            batch = node_ids[start : start + GRAPH_BATCH_SIZE]
+            params = {f"node_id_{i}": node_id for i, node_id in enumerate(batch)}
+            SQL = SQL_TEMPLATES["get_nodes"].format(
+                node_ids=",".join(f":{key}" for key in params)
+            )
+            params["workspace"] = self.db.workspace
+            res = await self.db.query(SQL, params, multirows=True)
+            for node in res:
+                nodes.setdefault(node["name"], node)
+        return nodes
+
+    async def get_edges(
+        self, edges: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        """根据源和目标节点id批量获取边"""
+        found = {}
+        edges = list(dict.fromkeys(edges))
+        for start in range(0, len(edges), GRAPH_BATCH_SIZE):
+            batch = edges[start : start + GRAPH_BATCH_SIZE]
+            params = {"workspace": self.db.workspace}
+            for i, (source_node_id, target_node_id) in enumerate(batch):
+                params[f"source_node_id_{i}"] = source_node_id
+                params[f"target_node_id_{i}"] = target_node_id
+            SQL = SQL_TEMPLATES["get_edges"].format(
+                pairs=",".join(
+                    f"(:source_node_id_{i},:target_node_id_{i})"
+                    for i in range(len(batch))
+                )
+            )
+            res = await self.db.query(SQL, params, multirows=True)
+            for edge in res:
+                found.setdefault((edge["source_name"], edge["target_name"]), edge)
+        return found
+
     async def get_node_edges(self, source_node_id: str):
         """根据节点id获取节点的所有边"""
         if await self.has_node(source_node_id):
@@ -787,6 +905,13 @@ SQL_TEMPLATES = {
         AND a.name=:source_node_id and b.name = :target_node_id
         COLUMNS (e.id,a.name as source_id)
         ) t1 JOIN LIGHTRAG_GRAPH_EDGES t2 on t1.id=t2.id""",
+    "get_nodes": """SELECT name,entity_type,source_chunk_id as source_id,NVL(description,'') AS description
+        FROM LIGHTRAG_GRAPH_NODES
+        WHERE workspace=:workspace AND name IN ({node_ids})""",
+    "get_edges": """SELECT source_name,target_name,weight,source_chunk_id as source_id,
+        NVL(description,'') AS description,NVL(keywords,'') AS keywords
+        FROM LIGHTRAG_GRAPH_EDGES
+        WHERE workspace=:workspace AND (source_name,target_name) IN ({pairs})""",
     "get_node_edges": """SELECT source_name,target_name
             FROM GRAPH_TABLE (lightrag_graph
             MATCH (a)-[e]->(b)
@@ -32,6 +32,15 @@ if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
+# Nodes or edges sent to AGE in one round trip by the bulk graph methods
+GRAPH_BATCH_SIZE = 500
+
+
+def _batched(items: list, size: int = GRAPH_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
 class PostgreSQLDB:
     def __init__(self, config, **kwargs):
         self.pool = None
@@ -410,6 +419,34 @@ class PGVectorStorage(BaseVectorStorage):
         results = await self.db.query(sql, params=params, multirows=True)
         return results
 
+    async def query_many(
+        self, queries: list[str], top_k=5, embeddings=None
+    ) -> list[list[dict]]:
+        """Embed all queries in one batch and run their searches in one round trip"""
+        if not queries:
+            return []
+        if embeddings is None:
+            embeddings = await self.embedding_func(queries)
+
+        sql = " UNION ALL ".join(
+            f"(SELECT {i} AS query_index, q{i}.* FROM ("
+            + SQL_TEMPLATES[self.namespace].format(
+                embedding_string=",".join(map(str, embedding))
+            )
+            + f") q{i})"
+            for i, embedding in enumerate(embeddings)
+        )
+        params = {
+            "workspace": self.db.workspace,
+            "better_than_threshold": self.cosine_better_than_threshold,
+            "top_k": top_k,
+        }
+        rows = await self.db.query(sql, params=params, multirows=True)
+        results = [[] for _ in queries]
+        for row in rows:
+            results[row.pop("query_index")].append(row)
+        return results
+
 
 @dataclass
 class PGDocStatusStorage(DocStatusStorage):
@@ -910,6 +947,34 @@ class PGGraphStorage(BaseGraphStorage):
 
         return edges
 
+    def _upsert_node_query(self, node_id: str, node_data: Dict[str, Any]) -> str:
+        return """SELECT * FROM cypher('%s', $$
+                     MERGE (n:Entity {node_id: "%s"})
+                     SET n += %s
+                     RETURN n
+                   $$) AS (n agtype)""" % (
+            self.graph_name,
+            PGGraphStorage._encode_graph_label(node_id.strip('"')),
+            PGGraphStorage._format_properties(node_data),
+        )
+
+    def _upsert_edge_query(
+        self, source_node_id: str, target_node_id: str, edge_data: Dict[str, Any]
+    ) -> str:
+        return """SELECT * FROM cypher('%s', $$
+                     MATCH (source:Entity {node_id: "%s"})
+                     WITH source
+                     MATCH (target:Entity {node_id: "%s"})
+                     MERGE (source)-[r:DIRECTED]->(target)
+                     SET r += %s
+                     RETURN r
+                   $$) AS (r agtype)""" % (
+            self.graph_name,
+            PGGraphStorage._encode_graph_label(source_node_id.strip('"')),
+            PGGraphStorage._encode_graph_label(target_node_id.strip('"')),
+            PGGraphStorage._format_properties(edge_data),
+        )
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -925,16 +990,7 @@ class PGGraphStorage(BaseGraphStorage):
         """
         label = PGGraphStorage._encode_graph_label(node_id.strip('"'))
         properties = node_data
-
-        query = """SELECT * FROM cypher('%s', $$
-                     MERGE (n:Entity {node_id: "%s"})
-                     SET n += %s
-                     RETURN n
-                   $$) AS (n agtype)""" % (
-            self.graph_name,
-            label,
-            PGGraphStorage._format_properties(properties),
-        )
+        query = self._upsert_node_query(node_id, node_data)
 
         try:
             await self._query(query, readonly=False, upsert=True)
@@ -966,20 +1022,7 @@ class PGGraphStorage(BaseGraphStorage):
         src_label = PGGraphStorage._encode_graph_label(source_node_id.strip('"'))
         tgt_label = PGGraphStorage._encode_graph_label(target_node_id.strip('"'))
         edge_properties = edge_data
-
-        query = """SELECT * FROM cypher('%s', $$
-                     MATCH (source:Entity {node_id: "%s"})
-                     WITH source
-                     MATCH (target:Entity {node_id: "%s"})
-                     MERGE (source)-[r:DIRECTED]->(target)
-                     SET r += %s
-                     RETURN r
-                   $$) AS (r agtype)""" % (
-            self.graph_name,
-            src_label,
-            tgt_label,
-            PGGraphStorage._format_properties(edge_properties),
-        )
+        query = self._upsert_edge_query(source_node_id, target_node_id, edge_data)
         # logger.info(f"-- inserting edge after formatted: {params}")
         try:
             await self._query(query, readonly=False, upsert=True)
@@ -993,6 +1036,99 @@ class PGGraphStorage(BaseGraphStorage):
             logger.error("Error during edge upsert: {%s}", e)
             raise
 
+    async def get_nodes(self, node_ids: list[str]) -> dict[str, dict]:
+        """Fetch nodes with one query per batch instead of one per node."""
+        nodes = {}
+        labels = list(
+            dict.fromkeys(
+                PGGraphStorage._encode_graph_label(node_id.strip('"'))
+                for node_id in node_ids
+            )
+        )
+        for batch in _batched(labels):
+            query = """SELECT * FROM cypher('%s', $$
+                         MATCH (n:Entity)
+                         WHERE n.node_id IN %s
+                         RETURN n
+                       $$) AS (n agtype)""" % (self.graph_name, json.dumps(batch))
+            for record in await self._query(query):
+                node = record["n"]
+                nodes.setdefault(node["label"], node)
+        # Callers may pass quoted ids, key the result by what was asked for
+        return {
+            node_id: nodes[node_id.strip('"')]
+            for node_id in node_ids
+            if node_id.strip('"') in nodes
+        }
+
+    async def get_edges(
+        self, edges: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        """Fetch edges with one query per batch instead of one per edge."""
+        found = {}
+        for batch in _batched(list(dict.fromkeys(edges))):
+            pairs = {
+                (
+                    PGGraphStorage._encode_graph_label(src.strip('"')),
+                    PGGraphStorage._encode_graph_label(tgt.strip('"')),
+                ): (src, tgt)
+                for src, tgt in batch
+            }
+            # One match per requested pair, so the cost follows the number of pairs
+            query = "\nUNION ALL\n".join(
+                """SELECT * FROM cypher('%s', $$
+                     MATCH (a:Entity {node_id: "%s"})-[r]->(b:Entity {node_id: "%s"})
+                     RETURN a.node_id AS src, b.node_id AS tgt,
+                            properties(r) AS edge_properties
+                     LIMIT 1
+                   $$) AS (src agtype, tgt agtype, edge_properties agtype)"""
+                % (self.graph_name, src_label, tgt_label)
+                for src_label, tgt_label in pairs
+            )
+            for record in await self._query(query):
+                pair = pairs.get((record["src"], record["tgt"]))
+                if pair is not None and record["edge_properties"]:
+                    found.setdefault(pair, record["edge_properties"])
+        return found
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((PGGraphQueryException,)),
+    )
+    async def upsert_nodes(self, nodes: dict[str, dict[str, Any]]):
+        """Upsert nodes with the statement of upsert_node, a batch of them per round trip."""
+        queries = [
+            self._upsert_node_query(node_id, node_data)
+            for node_id, node_data in nodes.items()
+        ]
+        for batch in _batched(queries):
+            try:
+                await self._query(";\n".join(batch), readonly=False, upsert=True)
+            except Exception as e:
+                logger.error("Error during bulk upsert: {%s}", e)
+                raise
+        logger.debug("Upserted %d nodes", len(queries))
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((PGGraphQueryException,)),
+    )
+    async def upsert_edges(self, edges: dict[tuple[str, str], dict[str, Any]]):
+        """Upsert edges with the statement of upsert_edge, a batch of them per round trip."""
+        queries = [
+            self._upsert_edge_query(src, tgt, edge_data)
+            for (src, tgt), edge_data in edges.items()
+        ]
+        for batch in _batched(queries):
+            try:
+                await self._query(";\n".join(batch), readonly=False, upsert=True)
+            except Exception as e:
+                logger.error("Error during bulk edge upsert: {%s}", e)
+                raise
+        logger.debug("Upserted %d edges", len(queries))
+
     async def _node2vec_embed(self):
         print("Implemented but never called.")
 
@@ -0,0 +1,290 @@
+import os
+import sqlite3
+from dataclasses import dataclass
+from enum import Enum
+from typing import Union, Dict, Set
+
+import orjson
+
+from ..utils import logger
+from ..base import (
+    BaseKVStorage,
+    DocStatusStorage,
+    DocStatus,
+    DocProcessingStatus,
+)
+
+# SQLite allows at most 999 parameters per statement in older builds
+MAX_SQL_PARAMS = 900
+
+_connections = {}  # database file -> connection shared by every namespace
+
+
+def get_connection(file_name: str) -> sqlite3.Connection:
+    """Open (once per process) the SQLite database in WAL mode."""
+    conn = _connections.get(file_name)
+    if conn is None:
+        conn = sqlite3.connect(file_name, check_same_thread=False)
+        # WAL lets other processes read while this one writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _connections[file_name] = conn
+        logger.info(f"Opened SQLite database {file_name}")
+    return conn
+
+
+def _dumps(value) -> str:
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY, default=str).decode()
+
+
+def _status_value(status) -> Union[str, None]:
+    return status.value if isinstance(status, Enum) else status
+
+
+def _chunked(items: list, size: int = MAX_SQL_PARAMS):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+@dataclass
+class SQLiteKVStorage(BaseKVStorage):
+    """
+    KV storage in a local SQLite database (`kv_store.sqlite` in the working dir), one table
+    per namespace with the value as JSON.
+
+    Unlike JsonKVStorage nothing is held in memory: lookups are point queries on the
+    primary key, `full_doc_id` and `status` are indexed columns, and every upsert is one
+    transaction. The llm_response_cache namespace stores one row per (mode, args hash),
+    `get_by_id(mode)` returns the mode's entries as a dict like the JSON cache does.
+    """
+
+    def __post_init__(self):
+        self._file_name = os.path.join(
+            self.global_config["working_dir"], "kv_store.sqlite"
+        )
+        self._table = f"kv_{self.namespace}"
+        self._is_llm_cache = self.namespace == "llm_response_cache"
+        self._loaded_conn = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # Opened on first use, so namespaces a process never touches are never created
+        if self._loaded_conn is None:
+            conn = get_connection(self._file_name)
+            with conn:
+                conn.execute(
+                    f"""CREATE TABLE IF NOT EXISTS {self._table} (
+                        mode TEXT NOT NULL DEFAULT '',
+                        id TEXT NOT NULL,
+                        full_doc_id TEXT,
+                        status TEXT,
+                        data TEXT NOT NULL,
+                        PRIMARY KEY (mode, id)
+                    )"""
+                )
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {self._table}_full_doc_id "
+                    f"ON {self._table} (full_doc_id)"
+                )
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {self._table}_status "
+                    f"ON {self._table} (status)"
+                )
+            self._loaded_conn = conn
+        return self._loaded_conn
+
+    def _select(self, where: str, params: tuple = ()) -> list[tuple]:
+        return self._conn.execute(
+            f"SELECT id, data FROM {self._table} WHERE {where}", params
+        ).fetchall()
+
+    def _select_ids(self, ids: list[str], columns: str = "id, data") -> list[tuple]:
+        rows = []
+        for chunk in _chunked(ids):
+            rows.extend(
+                self._conn.execute(
+                    f"SELECT {columns} FROM {self._table} WHERE mode = '' "
+                    f"AND id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+            )
+        return rows
+
+    @staticmethod
+    def _value(id: str, data: str) -> dict:
+        value = orjson.loads(data)
+        if isinstance(value, dict):
+            value.setdefault("id", id)
+        return value
+
+    def _write(self, rows: list[tuple]):
+        """Insert or replace (mode, id, full_doc_id, status, data) rows in one transaction."""
+        if not rows:
+            return
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self._table} "
+                "(mode, id, full_doc_id, status, data) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    async def all_keys(self) -> list[str]:
+        column = "DISTINCT mode" if self._is_llm_cache else "id"
+        return [
+            row[0]
+            for row in self._conn.execute(f"SELECT {column} FROM {self._table}")
+        ]
+
+    async def get_by_id(self, id: str) -> Union[dict, None]:
+        if self._is_llm_cache:
+            rows = self._select("mode = ?", (id,))
+            return {row_id: orjson.loads(data) for row_id, data in rows} or None
+        rows = self._select("mode = '' AND id = ?", (id,))
+        return self._value(*rows[0]) if rows else None
+
+    async def get_by_mode_and_id(self, mode: str, id: str) -> Union[dict, None]:
+        """Specifically for llm_response_cache."""
+        rows = self._select("mode = ? AND id = ?", (mode, id))
+        return {id: orjson.loads(rows[0][1])} if rows else None
+
+    async def get_by_ids(self, ids: list[str], fields=None) -> list[Union[dict, None]]:
+        values = {id: self._value(id, data) for id, data in self._select_ids(ids)}
+        if fields is not None:
+            values = {
+                id: {k: v for k, v in value.items() if k in fields}
+                for id, value in values.items()
+            }
+        return [values.get(id) for id in ids]
+
+    async def get_by_status_and_ids(
+        self, status: str, ids: Union[list[str], None]
+    ) -> Union[list[dict], None]:
+        status = _status_value(status)
+        if ids is None:
+            rows = self._select("status = ?", (status,))
+        else:
+            rows = [
+                row
+                for row in self._select_ids(ids, "id, data, status")
+                if row[2] == status
+            ]
+        return [self._value(row[0], row[1]) for row in rows] or None
+
+    async def filter_keys(self, data: list[str]) -> set[str]:
+        """Return keys that don't exist in storage"""
+        existing = {row[0] for row in self._select_ids(list(data), "id")}
+        return set(key for key in data if key not in existing)
+
+    async def upsert(self, data: dict[str, dict]):
+        if self._is_llm_cache:
+            rows = [
+                (mode, id, None, None, _dumps(entry))
+                for mode, entries in data.items()
+                for id, entry in entries.items()
+            ]
+        else:
+            rows = [
+                (
+                    "",
+                    id,
+                    value.get("full_doc_id"),
+                    _status_value(value.get("status")),
+                    _dumps(value),
+                )
+                for id, value in data.items()
+            ]
+        self._write(rows)
+        return data
+
+    async def change_status(self, id: str, status: str):
+        status = _status_value(status)
+        with self._conn:
+            self._conn.execute(
+                f"UPDATE {self._table} SET status = ?, "
+                "data = json_set(data, '$.status', ?) WHERE mode = '' AND id = ?",
+                (status, status, id),
+            )
+
+    async def filter(self, filter_func):
+        """Filter key-value pairs based on a filter function"""
+        return {
+            id: value
+            for id, data in self._conn.execute(
+                f"SELECT id, data FROM {self._table} WHERE mode = ''"
+            )
+            if filter_func(value := self._value(id, data))
+        }
+
+    async def delete(self, ids: list[str]):
+        """Delete data with specified IDs (modes for llm_response_cache)"""
+        column = "mode" if self._is_llm_cache else "id"
+        with self._conn:
+            for chunk in _chunked(ids):
+                self._conn.execute(
+                    f"DELETE FROM {self._table} "
+                    f"WHERE {column} IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+        logger.info(f"Successfully deleted {len(ids)} items from {self.namespace}")
+
+    async def drop(self):
+        with self._conn:
+            self._conn.execute(f"DELETE FROM {self._table}")
+
+    def has_local_data(self) -> bool:
+        if not os.path.exists(self._file_name):
+            return False
+        row = self._conn.execute(f"SELECT 1 FROM {self._table} LIMIT 1").fetchone()
+        return row is not None
+
+    async def index_done_callback(self):
+        if self._loaded_conn is None:
+            return
+        # Every write is already committed, fold the WAL back into the database file
+        self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+
+@dataclass
+class SQLiteDocStatusStorage(SQLiteKVStorage, DocStatusStorage):
+    """SQLite implementation of document status storage"""
+
+    async def filter_keys(self, data: list[str]) -> Set[str]:
+        """Return keys that should be processed (not in storage or not successfully processed)"""
+        processed = {
+            row[0]
+            for row in self._select_ids(list(data), "id, status")
+            if row[1] == DocStatus.PROCESSED.value
+        }
+        return set(key for key in data if key not in processed)
+
+    async def get_status_counts(self) -> Dict[str, int]:
+        """Get counts of documents in each status"""
+        counts = {status: 0 for status in DocStatus}
+        for status, count in self._conn.execute(
+            f"SELECT status, COUNT(*) FROM {self._table} "
+            "WHERE status IS NOT NULL GROUP BY status"
+        ):
+            counts[DocStatus(status)] = count
+        return counts
+
+    async def get_docs_by_status(
+        self, status: DocStatus
+    ) -> Dict[str, DocProcessingStatus]:
+        """Get all documents with the given status"""
+        return {
+            id: orjson.loads(data)
+            for id, data in self._select("status = ?", (_status_value(status),))
+        }
+
+    async def get_failed_docs(self) -> Dict[str, DocProcessingStatus]:
+        """Get all failed documents"""
+        return await self.get_docs_by_status(DocStatus.FAILED)
+
+    async def get_pending_docs(self) -> Dict[str, DocProcessingStatus]:
+        """Get all pending documents"""
+        return await self.get_docs_by_status(DocStatus.PENDING)
+
+    async def get(self, doc_id: str) -> Union[DocProcessingStatus, None]:
+        """Get document status by ID"""
+        rows = self._select("mode = '' AND id = ?", (doc_id,))
+        return orjson.loads(rows[0][1]) if rows else None
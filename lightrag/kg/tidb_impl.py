@@ -11,6 +11,10 @@ from lightrag.base import BaseVectorStorage, BaseKVStorage, BaseGraphStorage
 from lightrag.utils import logger
 
 
+# Names or name pairs bound into one IN (...) list by the bulk graph reads
+GRAPH_BATCH_SIZE = 500
+
+
 class TiDB(object):
     def __init__(self, config, **kwargs):
         self.host = config.get("host", None)
@@ -396,6 +400,67 @@ class TiDBGraphStorage(BaseGraphStorage):
         }
         await self.db.execute(merge_sql, data)
 
+    async def _embed(self, contents: list[str]) -> np.ndarray:
+        batches = [
+            contents[i : i + self._max_batch_size]
+            for i in range(0, len(contents), self._max_batch_size)
+        ]
+        embeddings_list = await asyncio.gather(
+            *[self.embedding_func(batch) for batch in batches]
+        )
+        return np.concatenate(embeddings_list)
+
+    async def upsert_nodes(self, nodes: dict[str, dict[str, str]]):
+        """Embed every node in embedding_batch_num batches and write them with one executemany."""
+        if not nodes:
+            return
+        contents = [
+            node_id + node_data["description"] for node_id, node_data in nodes.items()
+        ]
+        embeddings = await self._embed(contents)
+        data = [
+            {
+                "workspace": self.db.workspace,
+                "name": node_id,
+                "entity_type": node_data["entity_type"],
+                "description": node_data["description"],
+                "source_chunk_id": node_data["source_id"],
+                "content": content,
+                "content_vector": f"{content_vector.tolist()}",
+            }
+            for (node_id, node_data), content, content_vector in zip(
+                nodes.items(), contents, embeddings
+            )
+        ]
+        await self.db.execute(SQL_TEMPLATES["upsert_node"], data)
+
+    async def upsert_edges(self, edges: dict[tuple[str, str], dict[str, str]]):
+        """Embed every edge in embedding_batch_num batches and write them with one executemany."""
+        if not edges:
+            return
+        contents = [
+            edge_data["keywords"] + source_name + target_name + edge_data["description"]
+            for (source_name, target_name), edge_data in edges.items()
+        ]
+        embeddings = await self._embed(contents)
+        data = [
+            {
+                "workspace": self.db.workspace,
+                "source_name": source_name,
+                "target_name": target_name,
+                "weight": edge_data["weight"],
+                "keywords": edge_data["keywords"],
+                "description": edge_data["description"],
+                "source_chunk_id": edge_data["source_id"],
+                "content": content,
+                "content_vector": f"{content_vector.tolist()}",
+            }
+            for ((source_name, target_name), edge_data), content, content_vector in zip(
+                edges.items(), contents, embeddings
+            )
+        ]
+        await self.db.execute(SQL_TEMPLATES["upsert_edge"], data)
+
     async def embed_nodes(self, algorithm: str) -> tuple[np.ndarray, list[str]]:
         if algorithm not in self._node_embed_algorithms:
             raise ValueError(f"Node embedding algorithm {algorithm} not supported")
@@ -445,6 +510,39 @@ class TiDBGraphStorage(BaseGraphStorage):
         }
         return await self.db.query(sql, param)
 
+    async def get_nodes(self, node_ids: list[str]) -> dict[str, dict]:
+        nodes = {}
+        node_ids = list(dict.fromkeys(node_ids))
+        for start in range(0, len(node_ids), GRAPH_BATCH_SIZE):
+            batch = node_ids[start : start + GRAPH_BATCH_SIZE]
+            param = {f"name_{i}": name for i, name in enumerate(batch)}
+            sql = SQL_TEMPLATES["get_nodes"].format(
+                names=", ".join(f":{key}" for key in param)
+            )
+            for row in await self.db.query(sql, param, multirows=True):
+                nodes.setdefault(row["name"], row)
+        return nodes
+
+    async def get_edges(
+        self, edges: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        found = {}
+        edges = list(dict.fromkeys(edges))
+        for start in range(0, len(edges), GRAPH_BATCH_SIZE):
+            batch = edges[start : start + GRAPH_BATCH_SIZE]
+            param = {}
+            for i, (source_name, target_name) in enumerate(batch):
+                param[f"source_name_{i}"] = source_name
+                param[f"target_name_{i}"] = target_name
+            sql = SQL_TEMPLATES["get_edges"].format(
+                pairs=", ".join(
+                    f"(:source_name_{i}, :target_name_{i})" for i in range(len(batch))
+                )
+            )
+            for row in await self.db.query(sql, param, multirows=True):
+                found.setdefault((row["source_name"], row["target_name"]), row)
+        return found
+
     async def get_node_edges(
         self, source_node_id: str
     ) -> Union[list[tuple[str, str]], None]:
@@ -627,6 +725,14 @@ SQL_TEMPLATES = {
         SELECT relation_id AS id, workspace, source_name, target_name, weight, keywords, description, source_chunk_id AS source_id, content, content_vector
         FROM LIGHTRAG_GRAPH_EDGES WHERE source_name = :source_name AND target_name = :target_name AND workspace = :workspace
     """,
+    "get_nodes": """
+        SELECT entity_id AS id, workspace, name, entity_type, description, source_chunk_id AS source_id, content, content_vector
+        FROM LIGHTRAG_GRAPH_NODES WHERE workspace = :workspace AND name IN ({names})
+    """,
+    "get_edges": """
+        SELECT relation_id AS id, workspace, source_name, target_name, weight, keywords, description, source_chunk_id AS source_id, content, content_vector
+        FROM LIGHTRAG_GRAPH_EDGES WHERE workspace = :workspace AND (source_name, target_name) IN ({pairs})
+    """,
     "get_node_edges": """
         SELECT relation_id AS id, workspace, source_name, target_name, weight, keywords, description, source_chunk_id, content, content_vector
         FROM LIGHTRAG_GRAPH_EDGES WHERE source_name = :source_name AND workspace = :workspace
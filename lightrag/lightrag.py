@@ -1,12 +1,11 @@
 import asyncio
 import os
 from tqdm.asyncio import tqdm as tqdm_async
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime
 from functools import partial
 from typing import Type, cast, Dict
 from langchain.prompts import PromptTemplate
-from transaction_logger import mylogger
 
 from .llm import (
     gpt_4o_mini_complete,
@@ -14,23 +13,31 @@ from .llm import (
 )
 from .operate import (
     chunking_by_token_size,
+    ChunkingService,
     extract_entities,
+    extract_chunk_entities,
+    merge_extracted_entities,
     # local_query,global_query,hybrid_query,
     kg_query,
     naive_query,
     mix_kg_vector_query,
     extract_keywords_only,
     kg_query_with_keywords,
+    kg_batch_query_with_keywords,
 )
 
 from .utils import (
     EmbeddingFunc,
     compute_mdhash_id,
+    count_tokens,
     limit_async_func_call,
     convert_response_to_json,
     logger,
     set_logger,
     statistic_data,
+    get_trace_sink,
+    load_json,
+    write_json,
 )
 from .base import (
     BaseGraphStorage,
@@ -45,7 +52,9 @@ from .prompt import GRAPH_FIELD_SEP
 
 STORAGES = {
     "JsonKVStorage": ".storage",
+    "JsonLLMCacheStorage": ".storage",
     "NanoVectorDBStorage": ".storage",
+    "MemmapVectorDBStorage": ".storage",
     "NetworkXStorage": ".storage",
     "JsonDocStatusStorage": ".storage",
     "Neo4JStorage": ".kg.neo4j_impl",
@@ -64,6 +73,8 @@ STORAGES = {
     "PGGraphStorage": ".kg.postgres_impl",
     "GremlinStorage": ".kg.gremlin_impl",
     "PGDocStatusStorage": ".kg.postgres_impl",
+    "SQLiteKVStorage": ".kg.sqlite_impl",
+    "SQLiteDocStatusStorage": ".kg.sqlite_impl",
 }
 
 
@@ -128,6 +139,8 @@ class LightRAG:
     kv_storage: str = field(default="JsonKVStorage")
     vector_storage: str = field(default="NanoVectorDBStorage")
     graph_storage: str = field(default="NetworkXStorage")
+    # LLM response cache storage, None for the kv_storage (JsonLLMCacheStorage for JsonKVStorage)
+    llm_cache_storage: str = field(default=None)
 
     current_log_level = logger.level
     log_level: str = field(default=current_log_level)
@@ -140,6 +153,8 @@ class LightRAG:
     # entity extraction
     entity_extract_max_gleaning: int = 1
     entity_summary_to_max_tokens: int = 500
+    # Concurrent LLM calls summarizing long entity/relation descriptions during merges
+    entity_summary_max_async: int = 4
 
     # node embedding
     node_embedding_algorithm: str = "node2vec"
@@ -168,10 +183,17 @@ class LightRAG:
 
     # storage
     vector_db_storage_cls_kwargs: dict = field(default_factory=dict)
+    # Json*Storage write-ahead logs: fsync every write, lines logged before the JSON file is rewritten
+    json_storage_fsync: bool = False
+    json_storage_compact_entries: int = 1000
 
     enable_llm_cache: bool = True
     # Sometimes there are some reason the LLM failed at Extracting Entities, and we want to continue without LLM cost, we can use this flag
     enable_llm_cache_for_entity_extract: bool = True
+    # Logged cache entries after which JsonLLMCacheStorage rewrites its JSON snapshot
+    llm_cache_compact_entries: int = 1000
+    # Skip inserts of a corpus already recorded in the corpus manifest without loading any storage
+    enable_warm_start: bool = True
 
     # extension
     addon_params: dict = field(default_factory=dict)
@@ -183,6 +205,8 @@ class LightRAG:
     # Custom Chunking Function
     chunking_func: callable = chunking_by_token_size
     chunking_func_kwargs: dict = field(default_factory=dict)
+    # Threads chunking documents concurrently during ainsert, None for the executor default
+    chunking_max_workers: int = None
 
     def __post_init__(self):
         log_file = os.path.join("lightrag.log")
@@ -199,6 +223,12 @@ class LightRAG:
         _print_config = ",\n  ".join([f"{k} = {v}" for k, v in global_config.items()])
         logger.debug(f"LightRAG init with param:\n  {_print_config}\n")
 
+        self.chunking_service = ChunkingService(
+            self.chunking_func,
+            max_workers=self.chunking_max_workers,
+            **self.chunking_func_kwargs,
+        )
+
         # Init LLM
         self.embedding_func = limit_async_func_call(self.embedding_func_max_async)(
             self.embedding_func
@@ -232,8 +262,12 @@ class LightRAG:
             embedding_func=None,
         )
 
-        self.llm_response_cache = self.key_string_value_json_storage_cls(
+        llm_cache_storage = self.llm_cache_storage or (
+            "JsonLLMCacheStorage" if self.kv_storage == "JsonKVStorage" else self.kv_storage
+        )
+        self.llm_response_cache = self._get_storage_class(llm_cache_storage)(
             namespace="llm_response_cache",
+            global_config=global_config,
             embedding_func=None,
         )
 
@@ -371,39 +405,41 @@ class LightRAG:
 
         logger.info(f"Processing {len(new_docs)} new unique documents")
 
-        # Process documents in batches
+        # Documents go through a staged pipeline: up to `insert_batch_size` documents are
+        # chunked, embedded and sent to the LLM for extraction concurrently, a single merge
+        # stage folds their entities into the graph as they finish, and the storages are
+        # persisted once per batch of merged documents instead of after every document.
         batch_size = self.addon_params.get("insert_batch_size", 10)
-        for i in range(0, len(new_docs), batch_size):
-            batch_docs = dict(list(new_docs.items())[i : i + batch_size])
-
-            for doc_id, doc in tqdm_async(
-                batch_docs.items(), desc=f"Processing batch {i // batch_size + 1}"
-            ):
+        global_config = asdict(self)
+        in_flight = asyncio.Semaphore(batch_size)
+        extracted = asyncio.Queue(maxsize=batch_size)
+
+        async def extract_stage(doc_id: str, doc: dict):
+            async with in_flight:
+                doc_status = {
+                    "content_summary": doc["content_summary"],
+                    "content_length": doc["content_length"],
+                    "status": DocStatus.PROCESSING,
+                    "created_at": doc["created_at"],
+                    "updated_at": datetime.now().isoformat(),
+                }
+                chunks = {}
                 try:
-                    # Update status to processing
-                    doc_status = {
-                        "content_summary": doc["content_summary"],
-                        "content_length": doc["content_length"],
-                        "status": DocStatus.PROCESSING,
-                        "created_at": doc["created_at"],
-                        "updated_at": datetime.now().isoformat(),
-                    }
                     await self.doc_status.upsert({doc_id: doc_status})
 
-                    # Generate chunks from document
+                    # Generate chunks from document, off the event loop
                     chunks = {
                         compute_mdhash_id(dp["content"], prefix="chunk-"): {
                             **dp,
                             "full_doc_id": doc_id,
                         }
-                        for dp in self.chunking_func(
+                        for dp in await self.chunking_service.chunk(
                             doc["content"],
                             split_by_character=split_by_character,
                             split_by_character_only=split_by_character_only,
                             overlap_token_size=self.chunk_overlap_token_size,
                             max_token_size=self.chunk_token_size,
                             tiktoken_model=self.tiktoken_model_name,
-                            **self.chunking_func_kwargs,
                         )
                     }
 
@@ -416,72 +452,153 @@ class LightRAG:
                     )
                     await self.doc_status.upsert({doc_id: doc_status})
 
-                    try:
-                        # Store chunks in vector database
-                        await self.chunks_vdb.upsert(chunks)
-
-                        # Extract and store entities and relationships
-                        maybe_new_kg = await extract_entities(
+                    # Embed the chunks while the LLM extracts entities and relationships
+                    _, result = await asyncio.gather(
+                        self.chunks_vdb.upsert(chunks),
+                        extract_chunk_entities(
                             chunks,
-                            knowledge_graph_inst=self.chunk_entity_relation_graph,
-                            entity_vdb=self.entities_vdb,
-                            relationships_vdb=self.relationships_vdb,
+                            global_config,
                             llm_response_cache=self.llm_response_cache,
-                            global_config=asdict(self),
-                        )
+                        ),
+                    )
+                except Exception as e:
+                    result = e
+                await extracted.put((doc_id, doc, doc_status, chunks, result))
 
-                        if maybe_new_kg is None:
-                            raise Exception(
-                                "Failed to extract entities and relationships"
-                            )
+        async def merge_stage():
+            merged = 0
+            for _ in tqdm_async(range(len(new_docs)), desc="Processing documents"):
+                doc_id, doc, doc_status, chunks, result = await extracted.get()
+                try:
+                    if isinstance(result, Exception):
+                        raise result
 
-                        self.chunk_entity_relation_graph = maybe_new_kg
+                    # Merge entities and relationships into the graph and vector storages
+                    maybe_new_kg = await merge_extracted_entities(
+                        *result,
+                        knowledge_graph_inst=self.chunk_entity_relation_graph,
+                        entity_vdb=self.entities_vdb,
+                        relationships_vdb=self.relationships_vdb,
+                        global_config=global_config,
+                        llm_response_cache=self.llm_response_cache,
+                    )
+                    if maybe_new_kg is None:
+                        raise Exception("Failed to extract entities and relationships")
 
-                        # Store original document and chunks
-                        await self.full_docs.upsert(
-                            {doc_id: {"content": doc["content"]}}
-                        )
-                        await self.text_chunks.upsert(chunks)
-
-                        # Update status to processed
-                        doc_status.update(
-                            {
-                                "status": DocStatus.PROCESSED,
-                                "updated_at": datetime.now().isoformat(),
-                            }
-                        )
-                        await self.doc_status.upsert({doc_id: doc_status})
+                    self.chunk_entity_relation_graph = maybe_new_kg
 
-                    except Exception as e:
-                        # Mark as failed if any step fails
-                        doc_status.update(
-                            {
-                                "status": DocStatus.FAILED,
-                                "error": str(e),
-                                "updated_at": datetime.now().isoformat(),
-                            }
-                        )
-                        await self.doc_status.upsert({doc_id: doc_status})
-                        raise e
+                    # Store original document and chunks
+                    await self.full_docs.upsert({doc_id: {"content": doc["content"]}})
+                    await self.text_chunks.upsert(chunks)
+
+                    # Update status to processed
+                    doc_status.update(
+                        {
+                            "status": DocStatus.PROCESSED,
+                            "updated_at": datetime.now().isoformat(),
+                        }
+                    )
+                    await self.doc_status.upsert({doc_id: doc_status})
 
                 except Exception as e:
                     import traceback
 
+                    # Mark as failed if any step fails
+                    doc_status.update(
+                        {
+                            "status": DocStatus.FAILED,
+                            "error": str(e),
+                            "updated_at": datetime.now().isoformat(),
+                        }
+                    )
+                    await self.doc_status.upsert({doc_id: doc_status})
                     error_msg = f"Failed to process document {doc_id}: {str(e)}\n{traceback.format_exc()}"
                     logger.error(error_msg)
-                    continue
 
-                finally:
-                    # Ensure all indexes are updated after each document
+                merged += 1
+                if merged % batch_size == 0 or merged == len(new_docs):
+                    # Persist all indexes once per batch of documents
                     await self._insert_done()
 
+        try:
+            await asyncio.gather(
+                merge_stage(),
+                *[extract_stage(doc_id, doc) for doc_id, doc in new_docs.items()],
+            )
+        finally:
+            # Release the chunking threads between inserts, the next one starts a new pool
+            self.chunking_service.close()
+
     def insert_custom_chunks(self, full_text: str, text_chunks: list[str]):
         loop = always_get_an_event_loop()
         return loop.run_until_complete(
             self.ainsert_custom_chunks(full_text, text_chunks)
         )
 
+    @property
+    def _corpus_manifest_file(self) -> str:
+        return os.path.join(self.working_dir, "corpus_manifest.json")
+
+    def _corpus_fingerprint(self, full_text: str, text_chunks: list[str]) -> str:
+        """Fingerprint of a document and the way it is chunked."""
+        return compute_mdhash_id(
+            "\n".join(
+                [compute_mdhash_id(full_text.strip(), prefix="doc-")]
+                + [compute_mdhash_id(c.strip(), prefix="chunk-") for c in text_chunks]
+            ),
+            prefix="corpus-",
+        )
+
+    def _is_corpus_indexed(self, fingerprint: str) -> bool:
+        if not self.enable_warm_start:
+            return False
+        manifest = load_json(self._corpus_manifest_file) or {}
+        if fingerprint not in manifest.get("fingerprints", {}):
+            return False
+        # The manifest only vouches for the storages it was written with: if their files
+        # were removed, emptied or dropped since, index again. Remote storages report None.
+        for storage_inst in [
+            self.full_docs,
+            self.text_chunks,
+            self.chunks_vdb,
+            self.chunk_entity_relation_graph,
+        ]:
+            if cast(StorageNameSpace, storage_inst).has_local_data() is False:
+                logger.info(
+                    f"Storage {storage_inst.namespace} has no data, ignoring the corpus manifest."
+                )
+                self._forget_corpus()
+                return False
+        return True
+
+    def _record_corpus(self, fingerprint: str, doc_key: str, chunk_count: int):
+        manifest = load_json(self._corpus_manifest_file) or {}
+        manifest.setdefault("fingerprints", {})[fingerprint] = {
+            "doc_id": doc_key,
+            "chunk_count": chunk_count,
+            "indexed_at": datetime.now().isoformat(),
+        }
+        write_json(manifest, self._corpus_manifest_file)
+
+    def _forget_corpus(self, doc_id: str = None):
+        """Remove the manifest entries of doc_id, or all entries if doc_id is None."""
+        manifest = load_json(self._corpus_manifest_file)
+        if not manifest or not manifest.get("fingerprints"):
+            return
+        manifest["fingerprints"] = {
+            fingerprint: entry
+            for fingerprint, entry in manifest["fingerprints"].items()
+            if doc_id is not None and entry["doc_id"] != doc_id
+        }
+        write_json(manifest, self._corpus_manifest_file)
+
     async def ainsert_custom_chunks(self, full_text: str, text_chunks: list[str]):
+        # Warm start: an unchanged corpus returns before any storage is loaded
+        fingerprint = self._corpus_fingerprint(full_text, text_chunks)
+        if self._is_corpus_indexed(fingerprint):
+            logger.info("Corpus unchanged since it was indexed, skipping insert.")
+            return
+
         update_storage = False
         try:
             doc_key = compute_mdhash_id(full_text.strip(), prefix="doc-")
@@ -491,6 +608,7 @@ class LightRAG:
             new_docs = {k: v for k, v in new_docs.items() if k in _add_doc_keys}
             if not len(new_docs):
                 logger.warning("This document is already in the storage.")
+                self._record_corpus(fingerprint, doc_key, len(text_chunks))
                 return
 
             update_storage = True
@@ -502,6 +620,9 @@ class LightRAG:
                 chunk_key = compute_mdhash_id(chunk_text_stripped, prefix="chunk-")
 
                 inserting_chunks[chunk_key] = {
+                    "tokens": count_tokens(
+                        chunk_text_stripped, model_name=self.tiktoken_model_name
+                    ),
                     "content": chunk_text_stripped,
                     "full_doc_id": doc_key,
                 }
@@ -514,6 +635,7 @@ class LightRAG:
             }
             if not len(inserting_chunks):
                 logger.warning("All chunks are already in the storage.")
+                self._record_corpus(fingerprint, doc_key, len(text_chunks))
                 return
 
             logger.info(f"[New Chunks] inserting {len(inserting_chunks)} chunks")
@@ -541,6 +663,7 @@ class LightRAG:
         finally:
             if update_storage:
                 await self._insert_done()
+        self._record_corpus(fingerprint, doc_key, len(text_chunks))
 
     async def apipeline_process_documents(self, string_or_strings):
         """Input list remove duplicates, generate document IDs and initial pendding status, filter out already stored documents, store docs
@@ -983,11 +1106,16 @@ class LightRAG:
             ),
         )
 
-        mylogger.update_transaction(param.transaction_no,param.mode, **{
-            "High-Level Keywords": hl_keywords, 
-            "Low-Level Keywords": ll_keywords
-            }
-        )
+        trace_sink = get_trace_sink()
+        if trace_sink.enabled:
+            trace_sink.emit(
+                param.transaction_no,
+                param.mode,
+                **{
+                    "High-Level Keywords": hl_keywords,
+                    "Low-Level Keywords": ll_keywords,
+                },
+            )
 
         param.hl_keywords = (hl_keywords,)
         param.ll_keywords = (ll_keywords,)
@@ -1065,6 +1193,113 @@ class LightRAG:
         await self._query_done()
         return response
 
+    def query_batch_with_separate_keyword_extraction(
+        self,
+        queries: list[str],
+        prompt: PromptTemplate,
+        instructions: str,
+        param: QueryParam = QueryParam(),
+        transaction_nos: list = None,
+    ):
+        """
+        Batch version of query_with_separate_keyword_extraction, see
+        aquery_batch_with_separate_keyword_extraction.
+        """
+        loop = always_get_an_event_loop()
+        return loop.run_until_complete(
+            self.aquery_batch_with_separate_keyword_extraction(
+                queries, prompt, instructions, param, transaction_nos
+            )
+        )
+
+    async def aquery_batch_with_separate_keyword_extraction(
+        self,
+        queries: list[str],
+        prompt: PromptTemplate,
+        instructions: str,
+        param: QueryParam = QueryParam(),
+        transaction_nos: list = None,
+    ) -> list[str]:
+        """
+        1. Extracts HL/LL keywords for every query concurrently.
+        2. Answers the formatted questions with kg_batch_query_with_keywords, which puts queries
+           with overlapping retrieved context into one LLM call. `prompt` formats a single
+           question and `instructions` are stated once per call.
+        Responses are returned in the order of `queries`.
+        """
+        if param.mode not in ["local", "global", "hybrid"]:
+            raise ValueError(f"Batch queries don't support mode {param.mode}")
+        if transaction_nos is None:
+            transaction_nos = [param.transaction_no] * len(queries)
+        hashing_kv = (
+            self.llm_response_cache
+            if self.llm_response_cache
+            and hasattr(self.llm_response_cache, "global_config")
+            else self.key_string_value_json_storage_cls(
+                namespace="llm_response_cache",
+                global_config=asdict(self),
+                embedding_func=None,
+            )
+        )
+
+        # ---------------------
+        # STEP 1: Keyword Extraction
+        # ---------------------
+        params = [replace(param, transaction_no=no) for no in transaction_nos]
+        keywords = await asyncio.gather(
+            *[
+                extract_keywords_only(
+                    text=query,
+                    param=item_param,
+                    global_config=asdict(self),
+                    hashing_kv=hashing_kv,
+                )
+                for query, item_param in zip(queries, params)
+            ]
+        )
+
+        formatted_questions = []
+        for query, item_param, (hl_keywords, ll_keywords) in zip(
+            queries, params, keywords
+        ):
+            trace_sink = get_trace_sink()
+            if trace_sink.enabled:
+                trace_sink.emit(
+                    item_param.transaction_no,
+                    item_param.mode,
+                    **{
+                        "High-Level Keywords": hl_keywords,
+                        "Low-Level Keywords": ll_keywords,
+                    },
+                )
+            item_param.hl_keywords = (hl_keywords,)
+            item_param.ll_keywords = (ll_keywords,)
+            formatted_questions.append(
+                prompt.format(
+                    ll_keywords=", ".join(ll_keywords),
+                    hl_keywords=", ".join(hl_keywords),
+                    summary=query,
+                )
+            )
+
+        # ---------------------
+        # STEP 2: Batched Query Logic
+        # ---------------------
+        responses = await kg_batch_query_with_keywords(
+            formatted_questions,
+            params,
+            instructions,
+            self.chunk_entity_relation_graph,
+            self.entities_vdb,
+            self.relationships_vdb,
+            self.text_chunks,
+            asdict(self),
+            hashing_kv=hashing_kv,
+        )
+
+        await self._query_done()
+        return responses
+
     async def _query_done(self):
         tasks = []
         for storage_inst in [self.llm_response_cache]:
@@ -1084,6 +1319,8 @@ class LightRAG:
             await self.entities_vdb.delete_entity(entity_name)
             await self.relationships_vdb.delete_entity_relation(entity_name)
             await self.chunk_entity_relation_graph.delete_node(entity_name)
+            # An entity spans documents, so no recorded corpus is complete any more
+            self._forget_corpus()
 
             logger.info(
                 f"Entity '{entity_name}' and its relationships have been deleted."
@@ -1264,6 +1501,7 @@ class LightRAG:
             # 6. Delete original document and status
             await self.full_docs.delete([doc_id])
             await self.doc_status.delete([doc_id])
+            self._forget_corpus(doc_id)
 
             # 7. Ensure all indexes are updated
             await self._insert_done()
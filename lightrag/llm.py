@@ -1,13 +1,17 @@
+import asyncio
 import base64
 import copy
 import json
 import os
 import re
 import struct
-from functools import lru_cache
+import weakref
+from collections import deque
+from functools import lru_cache, partial
 from typing import List, Dict, Callable, Any, Union, Optional
 import aioboto3
 import aiohttp
+import httpx
 import numpy as np
 import ollama
 import torch
@@ -17,6 +21,7 @@ from openai import (
     RateLimitError,
     APITimeoutError,
     AsyncAzureOpenAI,
+    DefaultAsyncHttpxClient,
 )
 from pydantic import BaseModel, Field
 from tenacity import (
@@ -43,6 +48,68 @@ else:
 
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+# Maximum number of pooled HTTP connections per OpenAI/Azure client
+LLM_CLIENT_POOL_SIZE = int(os.getenv("LLM_CLIENT_POOL_SIZE", 100))
+
+# event loop -> {(client class, endpoint, api key, api version): client}
+# httpx connections are bound to the loop that opened them, so clients are shared per loop.
+_client_registry: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_pooled_client(client_cls, registry_key: tuple, pool_size: int = None, **kwargs):
+    """Return a shared client for registry_key, creating it on first use.
+    Clients keep their HTTP connections alive so later calls skip TCP/TLS setup.
+    """
+    loop = asyncio.get_running_loop()
+    loop_clients = _client_registry.setdefault(loop, {})
+    key = (client_cls.__name__, *registry_key)
+    client = loop_clients.get(key)
+    if client is None:
+        pool_size = pool_size or LLM_CLIENT_POOL_SIZE
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            )
+        )
+        client = client_cls(http_client=http_client, **kwargs)
+        loop_clients[key] = client
+    return client
+
+
+def get_openai_async_client(
+    base_url: str = None, api_key: str = None, pool_size: int = None
+) -> AsyncOpenAI:
+    """Get the shared AsyncOpenAI client for (base_url, api_key)"""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    client_kwargs = {"api_key": api_key}
+    if base_url is not None:
+        client_kwargs["base_url"] = base_url
+    return _get_pooled_client(
+        AsyncOpenAI, (base_url, api_key, None), pool_size=pool_size, **client_kwargs
+    )
+
+
+def get_azure_openai_async_client(
+    azure_endpoint: str = None,
+    api_key: str = None,
+    api_version: str = None,
+    pool_size: int = None,
+) -> AsyncAzureOpenAI:
+    """Get the shared AsyncAzureOpenAI client for (endpoint, api_key, api_version)"""
+    azure_endpoint = azure_endpoint or os.getenv("AZURE_OPENAI_ENDPOINT")
+    api_key = api_key or os.getenv("AZURE_OPENAI_API_KEY")
+    api_version = api_version or os.getenv("AZURE_OPENAI_API_VERSION")
+    return _get_pooled_client(
+        AsyncAzureOpenAI,
+        (azure_endpoint, api_key, api_version),
+        pool_size=pool_size,
+        azure_endpoint=azure_endpoint,
+        api_key=api_key,
+        api_version=api_version,
+    )
+
 
 @retry(
     stop=stop_after_attempt(3),
@@ -63,8 +130,8 @@ async def openai_complete_if_cache(
     if api_key:
         os.environ["OPENAI_API_KEY"] = api_key
 
-    openai_async_client = (
-        AsyncOpenAI() if base_url is None else AsyncOpenAI(base_url=base_url)
+    openai_async_client = get_openai_async_client(
+        base_url=base_url, pool_size=kwargs.pop("pool_size", None)
     )
     kwargs.pop("hashing_kv", None)
     kwargs.pop("keyword_extraction", None)
@@ -131,10 +198,8 @@ async def azure_openai_complete_if_cache(
     if api_version:
         os.environ["AZURE_OPENAI_API_VERSION"] = api_version
 
-    openai_async_client = AsyncAzureOpenAI(
-        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+    openai_async_client = get_azure_openai_async_client(
+        pool_size=kwargs.pop("pool_size", None)
     )
     kwargs.pop("hashing_kv", None)
     messages = []
@@ -910,9 +975,7 @@ async def openai_embedding(
     if api_key:
         os.environ["OPENAI_API_KEY"] = api_key
 
-    openai_async_client = (
-        AsyncOpenAI() if base_url is None else AsyncOpenAI(base_url=base_url)
-    )
+    openai_async_client = get_openai_async_client(base_url=base_url)
     response = await openai_async_client.embeddings.create(
         model=model, input=texts, encoding_format="float"
     )
@@ -974,9 +1037,7 @@ async def nvidia_openai_embedding(
     if api_key:
         os.environ["OPENAI_API_KEY"] = api_key
 
-    openai_async_client = (
-        AsyncOpenAI() if base_url is None else AsyncOpenAI(base_url=base_url)
-    )
+    openai_async_client = get_openai_async_client(base_url=base_url)
     response = await openai_async_client.embeddings.create(
         model=model,
         input=texts,
@@ -1008,11 +1069,7 @@ async def azure_openai_embedding(
     if api_version:
         os.environ["AZURE_OPENAI_API_VERSION"] = api_version
 
-    openai_async_client = AsyncAzureOpenAI(
-        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-    )
+    openai_async_client = get_azure_openai_async_client()
 
     response = await openai_async_client.embeddings.create(
         model=model, input=texts, encoding_format="float"
@@ -1146,6 +1203,100 @@ async def hf_embedding(texts: list[str], tokenizer, embed_model) -> np.ndarray:
         return embeddings.detach().cpu().numpy()
 
 
+@lru_cache(maxsize=None)
+def initialize_sentence_transformer(model_name: str, device: str = None):
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name, device=device)
+
+
+class SentenceTransformerEmbedding:
+    """
+    Embedding function backed by a SentenceTransformer model that is loaded once per process.
+
+    `encode` runs in a worker thread so it does not block the event loop, and calls that arrive
+    within `batch_window` seconds of each other are merged into a single `encode` call.
+
+    Usage example:
+        ```python
+        embedder = SentenceTransformerEmbedding("all-MiniLM-L6-v2")
+        rag = LightRAG(
+            embedding_func=EmbeddingFunc(embedding_dim=384, max_token_size=8192, func=embedder)
+            / ..other args
+            )
+        ```
+    """
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        device: str = None,
+        batch_window: float = 0.005,
+        max_batch_size: int = 256,
+        **encode_kwargs,
+    ):
+        self.model_name = model_name
+        self.device = device
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.encode_kwargs = encode_kwargs
+        self._pending = deque()
+        self._flush_task = None
+
+    async def _get_model(self):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, initialize_sentence_transformer, self.model_name, self.device
+        )
+
+    async def __call__(self, texts: list[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((list(texts), future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush())
+        return await future
+
+    async def _flush(self):
+        loop = asyncio.get_running_loop()
+        # Give concurrent callers a moment to join this batch
+        await asyncio.sleep(self.batch_window)
+        while self._pending:
+            batch = [self._pending.popleft()]
+            batch_size = len(batch[0][0])
+            while (
+                self._pending
+                and batch_size + len(self._pending[0][0]) <= self.max_batch_size
+            ):
+                texts, future = self._pending.popleft()
+                batch.append((texts, future))
+                batch_size += len(texts)
+
+            all_texts = [text for texts, _ in batch for text in texts]
+            try:
+                model = await self._get_model()
+                embeddings = await loop.run_in_executor(
+                    None,
+                    partial(
+                        model.encode,
+                        all_texts,
+                        convert_to_numpy=True,
+                        **self.encode_kwargs,
+                    ),
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            offset = 0
+            for texts, future in batch:
+                if not future.done():
+                    future.set_result(embeddings[offset : offset + len(texts)])
+                offset += len(texts)
+
+
 async def ollama_embedding(texts: list[str], embed_model, **kwargs) -> np.ndarray:
     """
     Deprecated in favor of `embed`.
@@ -0,0 +1,493 @@
+import json
+import os
+from typing import Union
+
+import numpy as np
+
+from .ann import IVFFlatIndex
+from .utils import logger, dequantize_embedding
+
+META_VERSION = 1
+
+# 8-bit vectors store one [min, max] pair per row to dequantize them
+QUANTIZED_DTYPE = "uint8"
+
+
+class MemmapVectorDB:
+    """
+    Local vector database whose matrix lives in a raw, contiguous file opened with np.memmap.
+
+    Files, for a storage prefix `vdb_entities`:
+      - `vdb_entities.<generation>.vectors`: normalized vectors as float32, float16 or
+        uint8 rows. New vectors are appended, the file is never rewritten except by
+        compaction.
+      - `vdb_entities.<generation>.quant`: per-row [min, max] of uint8 vectors, quantized
+        like utils.quantize_embedding.
+      - `vdb_entities.<generation>.full`: float32 copies of float16/uint8 vectors, kept when
+        `rerank_factor` is set.
+      - `vdb_entities.meta.jsonl`: a header line (dim, dtype, file generation) followed by one
+        line per inserted row and per delete, also append-only.
+
+    Opening the database only parses the metadata; the matrix is mapped, so loading is close
+    to free and processes on the same host share one page-cached copy. Upserting an existing
+    id appends a new row and tombstones the old one; `save` compacts the files once
+    tombstones exceed `compact_ratio` of the rows.
+
+    float16 halves and uint8 quarters the matrix that queries scan. With `rerank_factor`,
+    the top `top_k * rerank_factor` rows by the reduced-precision score are re-scored with
+    the float32 copies, which are only paged in for those rows.
+
+    With an `index` (IVFFlatIndex), queries only score the rows of the closest index cells
+    once the database holds `index_min_rows` vectors. The index is trained on first use,
+    retrained after the database grew `retrain_growth` times and saved next to the vectors
+    as `vdb_entities.<generation>.ivf.npz`.
+    """
+
+    def __init__(
+        self,
+        embedding_dim: int,
+        storage_file: str,
+        dtype: str = "float32",
+        compact_ratio: float = 0.3,
+        index: IVFFlatIndex = None,
+        index_min_rows: int = 10000,
+        retrain_growth: float = 4.0,
+        rerank_factor: int = 0,
+    ):
+        self.embedding_dim = embedding_dim
+        self.storage_file = storage_file
+        self.dtype = np.dtype(dtype)
+        self.compact_ratio = compact_ratio
+        self.index = index
+        self.index_min_rows = index_min_rows
+        self.retrain_growth = retrain_growth
+        self.rerank_factor = rerank_factor
+        self.full_precision = rerank_factor > 0 and self.dtype != np.float32
+        self._meta_file_name = f"{storage_file}.meta.jsonl"
+        self._generation = 0
+        self._rows = []  # row -> metadata dict, None for tombstones
+        self._id_to_row = {}
+        self._valid = np.zeros(0, dtype=bool)
+        self._arrays = {}
+        self._load()
+        if self.rerank_factor and self.dtype != np.float32 and not self.full_precision:
+            logger.warning(
+                f"{self.storage_file} was created without full precision vectors, re-ranking is disabled"
+            )
+        self._load_index()
+
+    @property
+    def _quantized(self) -> bool:
+        return self.dtype == np.dtype(QUANTIZED_DTYPE)
+
+    @property
+    def _rerank(self) -> bool:
+        return self.rerank_factor > 0 and self.full_precision
+
+    @property
+    def _layers(self) -> dict:
+        """File kind -> (dtype, row width) of every file this database keeps."""
+        layers = {"vectors": (self.dtype, self.embedding_dim)}
+        if self._quantized:
+            layers["quant"] = (np.dtype(np.float32), 2)
+        if self.full_precision:
+            layers["full"] = (np.dtype(np.float32), self.embedding_dim)
+        return layers
+
+    def _file_name(self, kind: str, generation: int = None) -> str:
+        generation = self._generation if generation is None else generation
+        return f"{self.storage_file}.{generation}.{kind}"
+
+    @property
+    def _vectors_file_name(self) -> str:
+        return self._file_name("vectors")
+
+    @property
+    def _index_file_name(self) -> str:
+        return self._file_name("ivf.npz")
+
+    @property
+    def _matrix(self) -> np.ndarray:
+        return self._arrays["vectors"]
+
+    @property
+    def _use_index(self) -> bool:
+        return self.index is not None and self.index.is_trained
+
+    def __len__(self):
+        return len(self._id_to_row)
+
+    def _load(self):
+        if not os.path.exists(self._meta_file_name):
+            self._write_header(self._meta_file_name)
+            self._map()
+            return
+
+        with open(self._meta_file_name, "rb") as f:
+            header = json.loads(f.readline())
+            if header["dim"] != self.embedding_dim:
+                raise ValueError(
+                    f"{self._meta_file_name} stores {header['dim']}-d vectors, expected {self.embedding_dim}"
+                )
+            self.dtype = np.dtype(header["dtype"])
+            self.full_precision = header.get("full_precision", False)
+            self._generation = header["generation"]
+            good_offset = f.tell()
+            for line in iter(f.readline, b""):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    entry = None
+                if entry is None or not line.endswith(b"\n"):
+                    # A partly written last line from a crash, cut it off before appending
+                    logger.warning(f"Dropping incomplete line in {self._meta_file_name}")
+                    break
+                if "delete" in entry:
+                    for id in entry["delete"]:
+                        self._tombstone(id)
+                else:
+                    self._add_row(entry)
+                good_offset = f.tell()
+        if good_offset < os.path.getsize(self._meta_file_name):
+            with open(self._meta_file_name, "r+b") as f:
+                f.truncate(good_offset)
+
+        self._valid = np.array([row is not None for row in self._rows], dtype=bool)
+        self._map()
+        logger.info(
+            f"Mapped {len(self)} vectors from {self._vectors_file_name} ({self.dtype})"
+        )
+
+    def _load_index(self):
+        if self.index is None:
+            return
+        if self.index.load(self._index_file_name):
+            # Index rows appended or deleted since the index was saved
+            indexed = len(self.index.assignments)
+            if indexed < len(self._rows):
+                self._add_to_index(indexed, len(self._rows))
+            self.index.remove(np.flatnonzero(~self._valid))
+        self._maybe_train_index()
+
+    def _add_to_index(self, start: int, end: int, chunk_size: int = 65536):
+        for chunk_start in range(start, end, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, end)
+            self.index.add(chunk_start, self.vectors(slice(chunk_start, chunk_end)))
+
+    def _maybe_train_index(self):
+        if self.index is None or len(self) < max(self.index_min_rows, self.index.nlist):
+            return
+        if self._use_index and len(self) < self.retrain_growth * self.index.trained_rows:
+            return
+        valid_rows = np.flatnonzero(self._valid)
+        sample_size = min(len(valid_rows), 256 * self.index.nlist)
+        sample_rows = np.sort(
+            np.random.default_rng(self.index.seed).choice(
+                valid_rows, sample_size, replace=False
+            )
+        )
+        self.index.train(self.vectors(sample_rows))
+        self.index.trained_rows = len(valid_rows)
+        self._add_to_index(0, len(self._rows))
+        self.index.remove(np.flatnonzero(~self._valid))
+
+    def _header(self) -> dict:
+        return {
+            "version": META_VERSION,
+            "dim": self.embedding_dim,
+            "dtype": self.dtype.name,
+            "full_precision": self.full_precision,
+            "generation": self._generation,
+        }
+
+    def _write_header(self, file_name: str):
+        with open(file_name, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self._header()) + "\n")
+
+    def _add_row(self, data: dict):
+        self._tombstone(data["__id__"])
+        self._id_to_row[data["__id__"]] = len(self._rows)
+        self._rows.append(data)
+
+    def _tombstone(self, id: str):
+        row = self._id_to_row.pop(id, None)
+        if row is not None:
+            self._rows[row] = None
+            if row < len(self._valid):
+                self._valid[row] = False
+            if self._use_index:
+                self.index.remove([row])
+
+    def _map(self):
+        """(Re)map the files, covering exactly the rows listed in the metadata."""
+        count = len(self._rows)
+        for kind, (dtype, width) in self._layers.items():
+            file_name = self._file_name(kind)
+            if count == 0 or not os.path.exists(file_name):
+                self._arrays[kind] = np.zeros((0, width), dtype=dtype)
+                continue
+            self._arrays[kind] = np.memmap(
+                file_name, dtype=dtype, mode="r", shape=(count, width)
+            )
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def _encode(self, vectors: np.ndarray) -> dict:
+        """File kind -> rows to append for normalized float32 `vectors`."""
+        encoded = {}
+        if self._quantized:
+            # utils.quantize_embedding per row, guarding constant vectors
+            min_val = vectors.min(axis=1, keepdims=True)
+            max_val = vectors.max(axis=1, keepdims=True)
+            scale = 255 / np.where(max_val > min_val, max_val - min_val, 1)
+            encoded["vectors"] = np.round((vectors - min_val) * scale).astype(np.uint8)
+            encoded["quant"] = np.hstack([min_val, max_val]).astype(np.float32)
+        else:
+            encoded["vectors"] = vectors.astype(self.dtype)
+        if self.full_precision:
+            encoded["full"] = vectors
+        return encoded
+
+    def vectors(self, rows) -> np.ndarray:
+        """float32 vectors of `rows` (an index array or slice), dequantized if needed."""
+        if self._quantized:
+            min_max = np.asarray(self._arrays["quant"][rows])
+            return dequantize_embedding(
+                np.asarray(self._matrix[rows]), min_max[:, :1], min_max[:, 1:]
+            )
+        return np.asarray(self._matrix[rows], dtype=np.float32)
+
+    def upsert(self, datas: list[dict]) -> dict:
+        """
+        Append `datas` (dicts with `__id__`, `__vector__` and metadata fields). Vectors are
+        written before their metadata, so a crash never leaves metadata without a vector.
+        """
+        if not datas:
+            return {"update": [], "insert": []}
+        report = {"update": [], "insert": []}
+        for data in datas:
+            key = "update" if data["__id__"] in self._id_to_row else "insert"
+            report[key].append(data["__id__"])
+
+        vectors = self.normalize(np.stack([data["__vector__"] for data in datas]))
+        start = len(self._rows)
+        layers = self._layers
+        for kind, rows in self._encode(vectors).items():
+            dtype, width = layers[kind]
+            with open(self._file_name(kind), "ab") as f:
+                # Only the rows listed in the metadata count, drop bytes left by a crash
+                f.truncate(start * width * dtype.itemsize)
+                f.write(np.ascontiguousarray(rows, dtype=dtype).tobytes())
+
+        lines = []
+        for data in datas:
+            entry = {k: v for k, v in data.items() if k != "__vector__"}
+            self._add_row(entry)
+            lines.append(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        with open(self._meta_file_name, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+        # Rows before `start` were tombstoned in place, new rows may repeat an id in the batch
+        self._valid = np.concatenate(
+            [
+                self._valid,
+                np.array([row is not None for row in self._rows[start:]], dtype=bool),
+            ]
+        )
+        self._map()
+        if self._use_index:
+            self._add_to_index(start, len(self._rows))
+            self.index.remove(start + np.flatnonzero(~self._valid[start:]))
+        self._maybe_train_index()
+        return report
+
+    def get(self, ids: list[str]) -> list[dict]:
+        return [
+            self._rows[self._id_to_row[id]] for id in ids if id in self._id_to_row
+        ]
+
+    def delete(self, ids: list[str]):
+        ids = [id for id in ids if id in self._id_to_row]
+        if not ids:
+            return
+        for id in ids:
+            self._tombstone(id)
+        with open(self._meta_file_name, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"delete": ids}, ensure_ascii=False) + "\n")
+
+    def scores(
+        self,
+        query: np.ndarray,
+        rows: Union[np.ndarray, None] = None,
+        chunk_size: int = 65536,
+    ) -> np.ndarray:
+        """
+        Cosine similarity of the normalized `query` (one vector, or a matrix of queries)
+        against the given rows (all rows by default), computed chunk by chunk so a float16
+        or uint8 matrix is never upcast as a whole.
+        """
+        query = self.normalize(query)
+        count = len(self._rows) if rows is None else len(rows)
+        result = np.empty((count,) + query.shape[:-1], dtype=np.float32)
+        for start in range(0, count, chunk_size):
+            end = min(start + chunk_size, count)
+            block = self.vectors(slice(start, end) if rows is None else rows[start:end])
+            result[start:end] = block @ query.T
+        return result
+
+    def query(
+        self,
+        query: np.ndarray,
+        top_k: int = 10,
+        better_than_threshold: float = None,
+        nprobe: int = None,
+    ) -> list[dict]:
+        if not len(self):
+            return []
+        if self._use_index:
+            rows = np.sort(self.index.candidates(self.normalize(query), nprobe))
+            rows = rows[self._valid[rows]]
+            return self._rank(
+                query, self.scores(query, rows=rows), top_k, better_than_threshold, rows
+            )
+        scores = self.scores(query)
+        scores[~self._valid] = -np.inf
+        return self._rank(query, scores, top_k, better_than_threshold)
+
+    def query_many(
+        self,
+        queries: np.ndarray,
+        top_k: int = 10,
+        better_than_threshold: float = None,
+        nprobe: int = None,
+    ) -> list[list[dict]]:
+        """Top matches of every query in `queries`, scored in one pass over the matrix."""
+        if not len(self) or self._use_index:
+            return [
+                self.query(query, top_k, better_than_threshold, nprobe)
+                for query in queries
+            ]
+        scores = self.scores(queries)
+        scores[~self._valid] = -np.inf
+        return [
+            self._rank(
+                query,
+                np.ascontiguousarray(scores[:, i]),
+                top_k,
+                better_than_threshold,
+            )
+            for i, query in enumerate(queries)
+        ]
+
+    def _rank(
+        self,
+        query: np.ndarray,
+        scores: np.ndarray,
+        top_k: int,
+        better_than_threshold: float = None,
+        rows: np.ndarray = None,
+    ) -> list[dict]:
+        """
+        Top rows by `scores` (one per row in `rows`, or per database row). With re-ranking,
+        the best `top_k * rerank_factor` candidates are re-scored at full precision first.
+        """
+        if not self._rerank or not len(scores):
+            return self._top_k(scores, top_k, better_than_threshold, rows)
+        count = min(top_k * self.rerank_factor, len(scores))
+        candidates = np.argpartition(-scores, count - 1)[:count]
+        candidates = candidates[np.isfinite(scores[candidates])]
+        candidate_rows = np.sort(candidates if rows is None else rows[candidates])
+        exact_scores = (
+            np.asarray(self._arrays["full"][candidate_rows], dtype=np.float32)
+            @ self.normalize(query)
+        )
+        return self._top_k(exact_scores, top_k, better_than_threshold, candidate_rows)
+
+    def _top_k(
+        self,
+        scores: np.ndarray,
+        top_k: int,
+        better_than_threshold: float = None,
+        rows: np.ndarray = None,
+    ) -> list[dict]:
+        top_k = min(top_k, len(scores))
+        if top_k <= 0:
+            return []
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        results = []
+        for i in top:
+            score = float(scores[i])
+            if score == -np.inf:
+                break
+            if better_than_threshold is not None and score < better_than_threshold:
+                break
+            row = int(i) if rows is None else int(rows[i])
+            results.append({**self._rows[row], "__metrics__": score})
+        return results
+
+    def all(self) -> list[dict]:
+        """Metadata of every live row."""
+        return [row for row in self._rows if row is not None]
+
+    @property
+    def storage(self) -> dict:
+        """NanoVectorDB-style view of the valid rows: {"data": [...], "matrix": ...}."""
+        valid_rows = np.flatnonzero(self._valid)
+        return {"data": self.all(), "matrix": self.vectors(valid_rows)}
+
+    def nbytes(self) -> dict:
+        """Size in bytes of each mapped file."""
+        return {kind: array.nbytes for kind, array in self._arrays.items()}
+
+    def save(self):
+        """
+        Persist pending state. Writes are already on disk, so this only compacts the files
+        once too many rows are tombstones and saves the index.
+        """
+        dead = len(self._rows) - len(self)
+        if dead and dead >= self.compact_ratio * len(self._rows):
+            self.compact()
+        if self._use_index:
+            self.index.save(self._index_file_name)
+
+    def compact(self, chunk_size: int = 65536):
+        """
+        Rewrite the live rows into a new file generation, then atomically replace the
+        metadata pointing to it. Readers that mapped the old files keep working.
+        """
+        valid_rows = np.flatnonzero(self._valid)
+        old_files = [self._file_name(kind) for kind in self._layers]
+        old_files.append(self._index_file_name)
+        self._generation += 1
+
+        for kind, (dtype, _) in self._layers.items():
+            with open(self._file_name(kind), "wb") as f:
+                for start in range(0, len(valid_rows), chunk_size):
+                    block = self._arrays[kind][valid_rows[start : start + chunk_size]]
+                    f.write(np.ascontiguousarray(block, dtype=dtype).tobytes())
+
+        rows = [self._rows[row] for row in valid_rows]
+        tmp_meta_file = f"{self._meta_file_name}.tmp"
+        self._write_header(tmp_meta_file)
+        with open(tmp_meta_file, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        os.replace(tmp_meta_file, self._meta_file_name)
+
+        self._rows = rows
+        self._id_to_row = {row["__id__"]: i for i, row in enumerate(rows)}
+        self._valid = np.ones(len(rows), dtype=bool)
+        self._map()
+        if self._use_index:
+            self.index.remap(valid_rows)
+        for old_file in old_files:
+            if os.path.exists(old_file):
+                os.remove(old_file)
+        logger.info(
+            f"Compacted {self.storage_file} to {len(rows)} vectors in {self._vectors_file_name}"
+        )
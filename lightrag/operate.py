@@ -1,6 +1,9 @@
 import asyncio
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, reduce
+import numpy as np
 from tqdm.asyncio import tqdm as tqdm_async
 from typing import Union
 from collections import Counter, defaultdict
@@ -10,17 +13,22 @@ from .utils import (
     compute_mdhash_id,
     decode_tokens_by_tiktoken,
     encode_string_by_tiktoken,
+    token_offsets,
     is_float_regex,
     list_of_list_to_csv,
+    csv_string_to_list,
     pack_user_ass_to_openai_messages,
     split_string_by_multi_markers,
     truncate_list_by_token_size,
+    count_tokens,
     process_combine_contexts,
     compute_args_hash,
     handle_cache,
     save_to_cache,
+    get_cached_response,
     CacheData,
     statistic_data,
+    get_trace_sink,
 )
 from .base import (
     BaseGraphStorage,
@@ -31,7 +39,26 @@ from .base import (
 )
 from .prompt import GRAPH_FIELD_SEP, PROMPTS
 import time
-from transaction_logger import mylogger
+
+
+def _split_by_token_windows(
+    content: str,
+    tokens: list[int],
+    overlap_token_size: int,
+    max_token_size: int,
+    tiktoken_model: str,
+) -> list[tuple[int, str]]:
+    """(token count, text) of the overlapping windows of `max_token_size` tokens."""
+    offsets = token_offsets(content, tokens, model_name=tiktoken_model)
+    windows = []
+    for start in range(0, len(tokens), max_token_size - overlap_token_size):
+        end = min(start + max_token_size, len(tokens))
+        if offsets is None:
+            text = decode_tokens_by_tiktoken(tokens[start:end], model_name=tiktoken_model)
+        else:
+            text = content[offsets[start] : offsets[end] if end < len(tokens) else None]
+        windows.append((end - start, text))
+    return windows
 
 
 def chunking_by_token_size(
@@ -43,64 +70,82 @@ def chunking_by_token_size(
     tiktoken_model="gpt-4o",
     **kwargs,
 ):
-    tokens = encode_string_by_tiktoken(content, model_name=tiktoken_model)
-    results = []
     if split_by_character:
-        raw_chunks = content.split(split_by_character)
         new_chunks = []
-        if split_by_character_only:
-            for chunk in raw_chunks:
-                _tokens = encode_string_by_tiktoken(chunk, model_name=tiktoken_model)
+        for chunk in content.split(split_by_character):
+            _tokens = encode_string_by_tiktoken(chunk, model_name=tiktoken_model)
+            if split_by_character_only or len(_tokens) <= max_token_size:
                 new_chunks.append((len(_tokens), chunk))
-        else:
-            for chunk in raw_chunks:
-                _tokens = encode_string_by_tiktoken(chunk, model_name=tiktoken_model)
-                if len(_tokens) > max_token_size:
-                    for start in range(
-                        0, len(_tokens), max_token_size - overlap_token_size
-                    ):
-                        chunk_content = decode_tokens_by_tiktoken(
-                            _tokens[start : start + max_token_size],
-                            model_name=tiktoken_model,
-                        )
-                        new_chunks.append(
-                            (min(max_token_size, len(_tokens) - start), chunk_content)
-                        )
-                else:
-                    new_chunks.append((len(_tokens), chunk))
-        for index, (_len, chunk) in enumerate(new_chunks):
-            results.append(
-                {
-                    "tokens": _len,
-                    "content": chunk.strip(),
-                    "chunk_order_index": index,
-                }
-            )
+            else:
+                new_chunks.extend(
+                    _split_by_token_windows(
+                        chunk,
+                        _tokens,
+                        overlap_token_size,
+                        max_token_size,
+                        tiktoken_model,
+                    )
+                )
     else:
-        for index, start in enumerate(
-            range(0, len(tokens), max_token_size - overlap_token_size)
-        ):
-            chunk_content = decode_tokens_by_tiktoken(
-                tokens[start : start + max_token_size], model_name=tiktoken_model
-            )
-            results.append(
-                {
-                    "tokens": min(max_token_size, len(tokens) - start),
-                    "content": chunk_content.strip(),
-                    "chunk_order_index": index,
-                }
+        tokens = encode_string_by_tiktoken(content, model_name=tiktoken_model)
+        new_chunks = _split_by_token_windows(
+            content, tokens, overlap_token_size, max_token_size, tiktoken_model
+        )
+    return [
+        {
+            "tokens": _len,
+            "content": chunk.strip(),
+            "chunk_order_index": index,
+        }
+        for index, (_len, chunk) in enumerate(new_chunks)
+    ]
+
+
+class ChunkingService:
+    """
+    Runs a chunking function on a thread pool. tiktoken releases the GIL while encoding,
+    so documents chunked concurrently use several cores, and the event loop keeps serving
+    LLM and storage calls meanwhile. The pool is started on first use and shut down by
+    `close`, which LightRAG calls when an insert is done.
+    """
+
+    def __init__(self, chunking_func: callable, max_workers: int = None, **chunking_kwargs):
+        self.chunking_func = chunking_func
+        self.max_workers = max_workers
+        self.chunking_kwargs = chunking_kwargs
+        self._executor = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="lightrag-chunking"
             )
-    return results
+        return self._executor
+
+    async def chunk(self, content: str, **kwargs) -> list[dict]:
+        """Chunks of one document, computed on the pool."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            partial(self.chunking_func, content, **{**self.chunking_kwargs, **kwargs}),
+        )
 
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
-async def _handle_entity_relation_summary(
-    entity_or_relation_name: str,
-    description: str,
+
+async def _summarize_descriptions(
+    descriptions: dict,
     global_config: dict,
-) -> str:
-    """Handle entity relation summary
-    For each entity or relation, input is the combined description of already existing description and new description.
-    If too long, use LLM to summarize.
+    llm_response_cache: BaseKVStorage = None,
+) -> dict:
+    """Summarization stage of the merge
+    Input is {key: (entity or relation name, merged description)}. Descriptions of at
+    least entity_summary_to_max_tokens tokens are summarized with the LLM: identical
+    prompts are sent once, at most entity_summary_max_async at a time, and the summaries
+    are cached in llm_response_cache. Returns {key: summary} for the summarized keys.
     """
     use_llm_func: callable = global_config["llm_model_func"]
     llm_max_tokens = global_config["llm_model_max_token_size"]
@@ -109,23 +154,71 @@ async def _handle_entity_relation_summary(
     language = global_config["addon_params"].get(
         "language", PROMPTS["DEFAULT_LANGUAGE"]
     )
-
-    tokens = encode_string_by_tiktoken(description, model_name=tiktoken_model_name)
-    if len(tokens) < summary_max_tokens:  # No need for summary
-        return description
-    prompt_template = PROMPTS["summarize_entity_descriptions"]
-    use_description = decode_tokens_by_tiktoken(
-        tokens[:llm_max_tokens], model_name=tiktoken_model_name
+    use_cache = (
+        global_config["enable_llm_cache_for_entity_extract"]
+        and llm_response_cache is not None
     )
-    context_base = dict(
-        entity_name=entity_or_relation_name,
-        description_list=use_description.split(GRAPH_FIELD_SEP),
-        language=language,
+    prompt_template = PROMPTS["summarize_entity_descriptions"]
+
+    prompts = {}  # prompt hash -> prompt
+    key_hashes = {}  # key -> prompt hash
+    for key, (name, description) in descriptions.items():
+        # count_tokens is cached, descriptions under budget are not tokenized again
+        if (
+            count_tokens(description, model_name=tiktoken_model_name)
+            < summary_max_tokens
+        ):
+            continue
+        tokens = encode_string_by_tiktoken(description, model_name=tiktoken_model_name)
+        use_description = decode_tokens_by_tiktoken(
+            tokens[:llm_max_tokens], model_name=tiktoken_model_name
+        )
+        prompt = prompt_template.format(
+            entity_name=name,
+            description_list=use_description.split(GRAPH_FIELD_SEP),
+            language=language,
+        )
+        args_hash = compute_args_hash(prompt)
+        prompts[args_hash] = prompt
+        key_hashes[key] = args_hash
+    if not prompts:
+        return {}
+
+    semaphore = asyncio.Semaphore(global_config["entity_summary_max_async"])
+
+    async def _summarize(args_hash: str, prompt: str) -> tuple[str, str]:
+        if use_cache:
+            cached_return = await get_cached_response(llm_response_cache, args_hash)
+            if cached_return is not None:
+                statistic_data["llm_cache"] += 1
+                return args_hash, cached_return
+        async with semaphore:
+            statistic_data["llm_call"] += 1
+            summary = await use_llm_func(prompt, max_tokens=summary_max_tokens)
+        if use_cache:
+            await save_to_cache(
+                llm_response_cache,
+                CacheData(args_hash=args_hash, content=summary, prompt=prompt),
+            )
+        return args_hash, summary
+
+    logger.debug(
+        f"Summarizing {len(key_hashes)} descriptions with {len(prompts)} LLM prompts"
     )
-    use_prompt = prompt_template.format(**context_base)
-    logger.debug(f"Trigger summary: {entity_or_relation_name}")
-    summary = await use_llm_func(use_prompt, max_tokens=summary_max_tokens)
-    return summary
+    summaries = {}
+    for result in tqdm_async(
+        asyncio.as_completed(
+            [_summarize(args_hash, prompt) for args_hash, prompt in prompts.items()]
+        ),
+        total=len(prompts),
+        desc="Level 3 - Summarizing descriptions",
+        unit="description",
+        position=2,
+        leave=False,
+    ):
+        args_hash, summary = await result
+        summaries[args_hash] = summary
+    return {key: summaries[args_hash] for key, args_hash in key_hashes.items()}
 
 
 async def _handle_single_entity_extraction(
@@ -176,18 +269,18 @@ async def _handle_single_relationship_extraction(
     )
 
 
-async def _merge_nodes_then_upsert(
-    entity_name: str,
+def _merge_nodes(
     nodes_data: list[dict],
-    knowledge_graph_inst: BaseGraphStorage,
+    already_node: Union[dict, None],
     global_config: dict,
-):
-    """Get existing nodes from knowledge graph use name,if exists, merge data, else create, then upsert."""
+) -> dict:
+    """Merge extracted nodes with the existing node of the same name, if any.
+    Long descriptions are summarized afterwards by _summarize_descriptions.
+    """
     already_entity_types = []
     already_source_ids = []
     already_description = []
 
-    already_node = await knowledge_graph_inst.get_node(entity_name)
     if already_node is not None:
         already_entity_types.append(already_node["entity_type"])
         already_source_ids.extend(
@@ -208,36 +301,32 @@ async def _merge_nodes_then_upsert(
     source_id = GRAPH_FIELD_SEP.join(
         set([dp["source_id"] for dp in nodes_data] + already_source_ids)
     )
-    description = await _handle_entity_relation_summary(
-        entity_name, description, global_config
-    )
-    node_data = dict(
+    return dict(
         entity_type=entity_type,
         description=description,
+        description_tokens=count_tokens(
+            description, model_name=global_config["tiktoken_model_name"]
+        ),
         source_id=source_id,
     )
-    await knowledge_graph_inst.upsert_node(
-        entity_name,
-        node_data=node_data,
-    )
-    node_data["entity_name"] = entity_name
-    return node_data
 
 
-async def _merge_edges_then_upsert(
-    src_id: str,
-    tgt_id: str,
+def _merge_edges(
     edges_data: list[dict],
-    knowledge_graph_inst: BaseGraphStorage,
+    already_edge: Union[dict, None],
     global_config: dict,
-):
+) -> tuple[dict, dict]:
+    """
+    Merge extracted edges with the existing edge between the same nodes, if any.
+    Also returns the data for a placeholder node, for endpoints that are not in the graph.
+    Long descriptions are summarized afterwards by _summarize_descriptions.
+    """
     already_weights = []
     already_source_ids = []
     already_description = []
     already_keywords = []
 
-    if await knowledge_graph_inst.has_edge(src_id, tgt_id):
-        already_edge = await knowledge_graph_inst.get_edge(src_id, tgt_id)
+    if already_edge is not None:
         already_weights.append(already_edge["weight"])
         already_source_ids.extend(
             split_string_by_multi_markers(already_edge["source_id"], [GRAPH_FIELD_SEP])
@@ -257,38 +346,23 @@ async def _merge_edges_then_upsert(
     source_id = GRAPH_FIELD_SEP.join(
         set([dp["source_id"] for dp in edges_data] + already_source_ids)
     )
-    for need_insert_id in [src_id, tgt_id]:
-        if not (await knowledge_graph_inst.has_node(need_insert_id)):
-            await knowledge_graph_inst.upsert_node(
-                need_insert_id,
-                node_data={
-                    "source_id": source_id,
-                    "description": description,
-                    "entity_type": '"UNKNOWN"',
-                },
-            )
-    description = await _handle_entity_relation_summary(
-        f"({src_id}, {tgt_id})", description, global_config
-    )
-    await knowledge_graph_inst.upsert_edge(
-        src_id,
-        tgt_id,
-        edge_data=dict(
-            weight=weight,
-            description=description,
-            keywords=keywords,
-            source_id=source_id,
-        ),
+    description_tokens = count_tokens(
+        description, model_name=global_config["tiktoken_model_name"]
     )
-
+    placeholder_node = {
+        "source_id": source_id,
+        "description": description,
+        "description_tokens": description_tokens,
+        "entity_type": '"UNKNOWN"',
+    }
     edge_data = dict(
-        src_id=src_id,
-        tgt_id=tgt_id,
+        weight=weight,
         description=description,
+        description_tokens=description_tokens,
         keywords=keywords,
+        source_id=source_id,
     )
-
-    return edge_data
+    return edge_data, placeholder_node
 
 
 async def extract_entities(
@@ -299,6 +373,30 @@ async def extract_entities(
     global_config: dict,
     llm_response_cache: BaseKVStorage = None,
 ) -> Union[BaseGraphStorage, None]:
+    maybe_nodes, maybe_edges = await extract_chunk_entities(
+        chunks, global_config, llm_response_cache=llm_response_cache
+    )
+    return await merge_extracted_entities(
+        maybe_nodes,
+        maybe_edges,
+        knowledge_graph_inst,
+        entity_vdb,
+        relationships_vdb,
+        global_config,
+        llm_response_cache=llm_response_cache,
+    )
+
+
+async def extract_chunk_entities(
+    chunks: dict[str, TextChunkSchema],
+    global_config: dict,
+    llm_response_cache: BaseKVStorage = None,
+) -> tuple[dict, dict]:
+    """
+    Extraction phase of extract_entities: run the LLM over `chunks` and return the
+    entities and relationships found, as {entity name: [entity, ...]} and
+    {(src, tgt): [relationship, ...]}. Nothing is written to the storages.
+    """
     use_llm_func: callable = global_config["llm_model_func"]
     entity_extract_max_gleaning = global_config["entity_extract_max_gleaning"]
     enable_llm_cache_for_entity_extract: bool = global_config[
@@ -488,41 +586,99 @@ async def extract_entities(
             maybe_nodes[k].extend(v)
         for k, v in m_edges.items():
             maybe_edges[tuple(sorted(k))].extend(v)
+    return dict(maybe_nodes), dict(maybe_edges)
+
+
+async def merge_extracted_entities(
+    maybe_nodes: dict[str, list[dict]],
+    maybe_edges: dict[tuple[str, str], list[dict]],
+    knowledge_graph_inst: BaseGraphStorage,
+    entity_vdb: BaseVectorStorage,
+    relationships_vdb: BaseVectorStorage,
+    global_config: dict,
+    llm_response_cache: BaseKVStorage = None,
+) -> Union[BaseGraphStorage, None]:
+    """
+    Merge phase of extract_entities: fold extracted entities and relationships into the
+    graph and upsert them into the vector storages. Merges read and rewrite graph nodes,
+    so calls must not overlap. Description summaries are cached in llm_response_cache.
+    """
+    # Read every node and edge the merge needs up front: one batched call per kind
+    # instead of several round-trips per item on remote graph stores
+    endpoint_ids = [
+        node_id
+        for node_id in dict.fromkeys(
+            node_id for pair in maybe_edges for node_id in pair
+        )
+        if node_id not in maybe_nodes
+    ]
+    already_nodes = await knowledge_graph_inst.get_nodes(
+        list(maybe_nodes) + endpoint_ids
+    )
+    already_edges = await knowledge_graph_inst.get_edges(list(maybe_edges))
+
     logger.debug("Inserting entities into storage...")
-    all_entities_data = []
-    for result in tqdm_async(
-        asyncio.as_completed(
-            [
-                _merge_nodes_then_upsert(k, v, knowledge_graph_inst, global_config)
-                for k, v in maybe_nodes.items()
-            ]
-        ),
-        total=len(maybe_nodes),
-        desc="Level 3 - Inserting entities",
-        unit="entity",
-        position=2,
-        leave=False,
-    ):
-        all_entities_data.append(await result)
+    merged_nodes = {
+        entity_name: _merge_nodes(
+            nodes_data, already_nodes.get(entity_name), global_config
+        )
+        for entity_name, nodes_data in maybe_nodes.items()
+    }
 
     logger.debug("Inserting relationships into storage...")
-    all_relationships_data = []
-    for result in tqdm_async(
-        asyncio.as_completed(
-            [
-                _merge_edges_then_upsert(
-                    k[0], k[1], v, knowledge_graph_inst, global_config
-                )
-                for k, v in maybe_edges.items()
-            ]
-        ),
-        total=len(maybe_edges),
-        desc="Level 3 - Inserting relationships",
-        unit="relationship",
-        position=3,
-        leave=False,
-    ):
-        all_relationships_data.append(await result)
+    merged_edges = {}
+    placeholder_nodes = {}
+    for pair, edges_data in maybe_edges.items():
+        edge_data, placeholder_node = _merge_edges(
+            edges_data, already_edges.get(pair), global_config
+        )
+        merged_edges[pair] = edge_data
+        for node_id in pair:
+            if node_id not in already_nodes and node_id not in merged_nodes:
+                placeholder_nodes.setdefault(node_id, placeholder_node)
+
+    # Summarize the over-budget descriptions of nodes and edges in one stage
+    summaries = await _summarize_descriptions(
+        {
+            **{
+                ("node", entity_name): (entity_name, node_data["description"])
+                for entity_name, node_data in merged_nodes.items()
+            },
+            **{
+                ("edge", pair): (f"({pair[0]}, {pair[1]})", edge_data["description"])
+                for pair, edge_data in merged_edges.items()
+            },
+        },
+        global_config,
+        llm_response_cache=llm_response_cache,
+    )
+    for (kind, key), summary in summaries.items():
+        data = merged_nodes[key] if kind == "node" else merged_edges[key]
+        data["description"] = summary
+        data["description_tokens"] = count_tokens(
+            summary, model_name=global_config["tiktoken_model_name"]
+        )
+
+    # Placeholders are never merged nodes, so both go in one write; endpoints must
+    # exist before their edges are written
+    if merged_nodes or placeholder_nodes:
+        await knowledge_graph_inst.upsert_nodes({**merged_nodes, **placeholder_nodes})
+    if merged_edges:
+        await knowledge_graph_inst.upsert_edges(merged_edges)
+
+    all_entities_data = [
+        dict(node_data, entity_name=entity_name)
+        for entity_name, node_data in merged_nodes.items()
+    ]
+    all_relationships_data = [
+        dict(
+            src_id=src_id,
+            tgt_id=tgt_id,
+            description=edge_data["description"],
+            keywords=edge_data["keywords"],
+        )
+        for (src_id, tgt_id), edge_data in merged_edges.items()
+    ]
 
     if not len(all_entities_data) and not len(all_relationships_data):
         logger.warning(
@@ -718,7 +874,6 @@ async def kg_query_with_keywords(
     # ---------------------------
     # 0) Handle potential cache
     # ---------------------------
-    use_model_func = global_config["llm_model_func"]
     args_hash = compute_args_hash(query_param.mode, query)
     cached_response, quantized, min_val, max_val = await handle_cache(
         hashing_kv, args_hash, query, query_param.mode
@@ -729,7 +884,56 @@ async def kg_query_with_keywords(
     # ---------------------------
     # 1) RETRIEVE KEYWORDS FROM query_param
     # ---------------------------
+    keywords = _get_keywords_from_query_param(query_param)
+    if keywords is None:
+        return PROMPTS["fail_response"]
+
+    logger.info("Using %s mode for query processing", query_param.mode)
+
+    # ---------------------------
+    # 2) BUILD CONTEXT
+    # ---------------------------
+    context = await _build_query_context(
+        keywords,
+        knowledge_graph_inst,
+        entities_vdb,
+        relationships_vdb,
+        text_chunks_db,
+        query_param,
+    )
+    if not context:
+        return PROMPTS["fail_response"]
+
+    # If only context is needed, return it
+    if query_param.only_need_context:
+        return context
+
+    # ---------------------------
+    # 3) BUILD THE SYSTEM PROMPT + CALL LLM + SAVE TO CACHE
+    # ---------------------------
+    return await _answer_with_context(
+        query,
+        context,
+        query_param,
+        global_config,
+        hashing_kv,
+        CacheData(
+            args_hash=args_hash,
+            content=None,
+            prompt=query,
+            quantized=quantized,
+            min_val=min_val,
+            max_val=max_val,
+            mode=query_param.mode,
+        ),
+    )
 
+
+def _get_keywords_from_query_param(query_param: QueryParam) -> Union[list[str], None]:
+    """
+    Read hl_keywords and ll_keywords from query_param, switching the mode when one side is
+    empty. Returns [ll_keywords_str, hl_keywords_str], or None when there are no keywords.
+    """
     # If these fields don't exist, default to empty lists/strings.
     hl_keywords = getattr(query_param, "hl_keywords", []) or []
     ll_keywords = getattr(query_param, "ll_keywords", []) or []
@@ -739,7 +943,7 @@ async def kg_query_with_keywords(
         logger.warning(
             "No keywords found in query_param. Could default to global mode or fail."
         )
-        return PROMPTS["fail_response"]
+        return None
     if not ll_keywords and query_param.mode in ["local", "hybrid"]:
         logger.warning("low_level_keywords is empty, switching to global mode.")
         query_param.mode = "global"
@@ -763,40 +967,38 @@ async def kg_query_with_keywords(
     ll_keywords_str = ", ".join(ll_keywords_flat) if ll_keywords_flat else ""
     hl_keywords_str = ", ".join(hl_keywords_flat) if hl_keywords_flat else ""
 
-    keywords = [ll_keywords_str, hl_keywords_str]
-
-    logger.info("Using %s mode for query processing", query_param.mode)
-
-    # ---------------------------
-    # 2) BUILD CONTEXT
-    # ---------------------------
-    context = await _build_query_context(
-        keywords,
-        knowledge_graph_inst,
-        entities_vdb,
-        relationships_vdb,
-        text_chunks_db,
-        query_param,
-    )
-    if not context:
-        return PROMPTS["fail_response"]
+    return [ll_keywords_str, hl_keywords_str]
 
-    # If only context is needed, return it
-    if query_param.only_need_context:
-        return context
 
-    # ---------------------------
-    # 3) BUILD THE SYSTEM PROMPT + CALL LLM
-    # ---------------------------
+async def _answer_with_context(
+    query: str,
+    context: str,
+    query_param: QueryParam,
+    global_config: dict,
+    hashing_kv: BaseKVStorage,
+    cache_data: CacheData,
+    instructions: str = None,
+) -> str:
+    """Answer a single query from an already built context and cache the response.
+    `instructions`, stated once per call by the batch prompt, are added to the system prompt.
+    """
+    use_model_func = global_config["llm_model_func"]
     sys_prompt_temp = PROMPTS["rag_response"]
     sys_prompt = sys_prompt_temp.format(
         context_data=context, response_type=query_param.response_type
     )
+    if instructions:
+        sys_prompt += PROMPTS["rag_response_instructions"].format(
+            instructions=instructions
+        )
 
-    mylogger.update_transaction(query_param.transaction_no,query_param.mode, **{
-            "Final Prompt": sys_prompt+query
-        }
-    )
+    trace_sink = get_trace_sink()
+    if trace_sink.enabled:
+        trace_sink.emit(
+            query_param.transaction_no,
+            query_param.mode,
+            **{"Final Prompt": sys_prompt + query},
+        )
 
     if query_param.only_need_prompt:
         return sys_prompt
@@ -820,22 +1022,264 @@ async def kg_query_with_keywords(
             .strip()
         )
 
-    # ---------------------------
-    # 4) SAVE TO CACHE
-    # ---------------------------
-    await save_to_cache(
-        hashing_kv,
-        CacheData(
+    cache_data.content = response
+    await save_to_cache(hashing_kv, cache_data)
+    return response
+
+
+async def kg_batch_query_with_keywords(
+    queries: list[str],
+    query_params: list[QueryParam],
+    instructions: str,
+    knowledge_graph_inst: BaseGraphStorage,
+    entities_vdb: BaseVectorStorage,
+    relationships_vdb: BaseVectorStorage,
+    text_chunks_db: BaseKVStorage[TextChunkSchema],
+    global_config: dict,
+    hashing_kv: BaseKVStorage = None,
+) -> list[str]:
+    """
+    Batch version of kg_query_with_keywords. Every query carries its own keywords in its
+    QueryParam. Queries that retrieve overlapping entities and relations are answered
+    together: one LLM call with a single shared context block, `instructions` stated once
+    and the numbered queries. Queries that fit no batch, and answers that can't be parsed
+    back, fall back to the single-query prompt, with `instructions` added to it.
+    Responses are returned in input order and cached under the same keys as
+    kg_query_with_keywords.
+    """
+    use_model_func = global_config["llm_model_func"]
+    responses = [None] * len(queries)
+
+    # 1) Handle cache
+    cache_datas = {}
+    for i, (query, query_param) in enumerate(zip(queries, query_params)):
+        args_hash = compute_args_hash(query_param.mode, query)
+        cached_response, quantized, min_val, max_val = await handle_cache(
+            hashing_kv, args_hash, query, query_param.mode
+        )
+        if cached_response is not None:
+            responses[i] = cached_response
+            continue
+        cache_datas[i] = CacheData(
             args_hash=args_hash,
-            content=response,
+            content=None,
             prompt=query,
             quantized=quantized,
             min_val=min_val,
             max_val=max_val,
             mode=query_param.mode,
+        )
+
+    # 2) Search the vector storages for all remaining queries at once
+    pending = list(cache_datas.keys())
+    keywords = {i: _get_keywords_from_query_param(query_params[i]) for i in pending}
+    entity_items = [
+        i
+        for i in pending
+        if keywords[i] is not None and query_params[i].mode in ["local", "hybrid"]
+    ]
+    relation_items = [
+        i
+        for i in pending
+        if keywords[i] is not None and query_params[i].mode in ["global", "hybrid"]
+    ]
+    entity_results, relation_results = await _query_vdbs(
+        [
+            (
+                entities_vdb,
+                [keywords[i][0] for i in entity_items],
+                max([query_params[i].top_k for i in entity_items] or [0]),
+            ),
+            (
+                relationships_vdb,
+                [keywords[i][1] for i in relation_items],
+                max([query_params[i].top_k for i in relation_items] or [0]),
+            ),
+        ]
+    )
+    entity_results = {
+        i: results[: query_params[i].top_k]
+        for i, results in zip(entity_items, entity_results)
+    }
+    relation_results = {
+        i: results[: query_params[i].top_k]
+        for i, results in zip(relation_items, relation_results)
+    }
+
+    # 3) Build the context tables of every remaining query
+    async def _retrieve(i):
+        if keywords[i] is None:
+            return None
+        return await _build_query_context_tables(
+            keywords[i],
+            knowledge_graph_inst,
+            entities_vdb,
+            relationships_vdb,
+            text_chunks_db,
+            query_params[i],
+            entity_results=entity_results.get(i),
+            relation_results=relation_results.get(i),
+        )
+
+    tables = dict(zip(pending, await asyncio.gather(*[_retrieve(i) for i in pending])))
+
+    batchable = []
+    for i in pending:
+        if tables[i] is None:
+            responses[i] = PROMPTS["fail_response"]
+        elif query_params[i].only_need_context:
+            responses[i] = _format_query_context(*tables[i])
+        elif query_params[i].only_need_prompt or query_params[i].batch_size <= 1:
+            responses[i] = await _answer_with_context(
+                queries[i],
+                _format_query_context(*tables[i]),
+                query_params[i],
+                global_config,
+                hashing_kv,
+                cache_datas[i],
+                instructions=instructions,
+            )
+        else:
+            batchable.append(i)
+
+    # 4) Group queries whose retrieved context overlaps
+    groups = _group_by_context_overlap(
+        [
+            (
+                i,
+                (query_params[i].mode, query_params[i].response_type),
+                _context_keys(tables[i][0], tables[i][1]),
+            )
+            for i in batchable
+        ],
+        max_group_size=max([query_params[i].batch_size for i in batchable] or [1]),
+        min_overlap=min(
+            [query_params[i].batch_min_context_overlap for i in batchable] or [0.0]
         ),
     )
-    return response
+    logger.info(
+        f"Batch query answers {len(batchable)} queries with {len(groups)} LLM calls"
+    )
+
+    # 5) Answer each group with one LLM call
+    async def _answer_group(group: list[int]):
+        if len(group) == 1:
+            i = group[0]
+            responses[i] = await _answer_with_context(
+                queries[i],
+                _format_query_context(*tables[i]),
+                query_params[i],
+                global_config,
+                hashing_kv,
+                cache_datas[i],
+                instructions=instructions,
+            )
+            return
+
+        context = _format_query_context(
+            *[
+                reduce(process_combine_contexts, [tables[i][part] for i in group])
+                for part in range(3)
+            ]
+        )
+        sys_prompt = PROMPTS["rag_batch_response"].format(
+            instructions=instructions,
+            response_type=query_params[group[0]].response_type,
+            context_data=context,
+            question_count=len(group),
+        )
+        user_prompt = "\n".join(
+            PROMPTS["rag_batch_question"].format(index=n + 1, question=queries[i])
+            for n, i in enumerate(group)
+        )
+
+        trace_sink = get_trace_sink()
+        if trace_sink.enabled:
+            for i in group:
+                trace_sink.emit(
+                    query_params[i].transaction_no,
+                    query_params[i].mode,
+                    **{"Final Prompt": sys_prompt + user_prompt},
+                )
+
+        response = await use_model_func(user_prompt, system_prompt=sys_prompt)
+        answers = _split_batch_answers(response, len(group))
+
+        for n, i in enumerate(group):
+            if n + 1 not in answers:
+                logger.warning(
+                    f"Batch answer {n + 1} missing, answering it with a single query"
+                )
+                responses[i] = await _answer_with_context(
+                    queries[i],
+                    _format_query_context(*tables[i]),
+                    query_params[i],
+                    global_config,
+                    hashing_kv,
+                    cache_datas[i],
+                    instructions=instructions,
+                )
+                continue
+            responses[i] = answers[n + 1]
+            cache_datas[i].content = answers[n + 1]
+            await save_to_cache(hashing_kv, cache_datas[i])
+
+    await asyncio.gather(*[_answer_group(group) for group in groups])
+    return responses
+
+
+def _context_keys(entities_context: str, relations_context: str) -> set:
+    """Entity names and (source, target) pairs listed in the context tables"""
+    keys = set()
+    for row in csv_string_to_list(entities_context.strip())[1:]:
+        if len(row) > 1:
+            keys.add(row[1].strip())
+    for row in csv_string_to_list(relations_context.strip())[1:]:
+        if len(row) > 2:
+            keys.add((row[1].strip(), row[2].strip()))
+    return keys
+
+
+def _group_by_context_overlap(
+    items: list[tuple[int, tuple, set]], max_group_size: int, min_overlap: float
+) -> list[list[int]]:
+    """
+    Greedily group (index, group_key, context_keys) items. An item joins the open group with
+    the same group_key that already contains the largest share (at least min_overlap) of
+    its context keys.
+    """
+    groups = []  # (group_key, indexes, union of context keys)
+    for index, group_key, keys in items:
+        best_group, best_overlap = None, min_overlap
+        for group in groups:
+            if group[0] != group_key or len(group[1]) >= max_group_size:
+                continue
+            overlap = len(keys & group[2]) / len(keys) if keys else 0.0
+            if overlap >= best_overlap:
+                best_group, best_overlap = group, overlap
+        if best_group is None:
+            groups.append((group_key, [index], set(keys)))
+        else:
+            best_group[1].append(index)
+            best_group[2].update(keys)
+    return [indexes for _, indexes, _ in groups]
+
+
+def _split_batch_answers(response: str, question_count: int) -> dict[int, str]:
+    """Split a batch response into {question number: answer}"""
+    if not isinstance(response, str):
+        return {}
+    parts = re.split(
+        r"^\s*-{3}\s*Answer\s+(\d+)\s*-{3}\s*$",
+        response,
+        flags=re.MULTILINE | re.IGNORECASE,
+    )
+    answers = {}
+    for number, answer in zip(parts[1::2], parts[2::2]):
+        number = int(number)
+        if 1 <= number <= question_count and number not in answers and answer.strip():
+            answers[number] = answer.strip()
+    return answers
 
 
 async def extract_keywords_only(
@@ -924,12 +1368,46 @@ async def _build_query_context(
     relationships_vdb: BaseVectorStorage,
     text_chunks_db: BaseKVStorage[TextChunkSchema],
     query_param: QueryParam,
+):
+    context_tables = await _build_query_context_tables(
+        query,
+        knowledge_graph_inst,
+        entities_vdb,
+        relationships_vdb,
+        text_chunks_db,
+        query_param,
+    )
+    return _format_query_context(*context_tables)
+
+
+async def _build_query_context_tables(
+    query: list,
+    knowledge_graph_inst: BaseGraphStorage,
+    entities_vdb: BaseVectorStorage,
+    relationships_vdb: BaseVectorStorage,
+    text_chunks_db: BaseKVStorage[TextChunkSchema],
+    query_param: QueryParam,
+    entity_results: list[dict] = None,
+    relation_results: list[dict] = None,
 ):
     # ll_entities_context, ll_relations_context, ll_text_units_context = "", "", ""
     # hl_entities_context, hl_relations_context, hl_text_units_context = "", "", ""
 
     ll_keywords, hl_keywords = query[0], query[1]
 
+    if (
+        query_param.mode == "hybrid"
+        and entity_results is None
+        and relation_results is None
+    ):
+        # Embed both keyword strings in one batch
+        [entity_results], [relation_results] = await _query_vdbs(
+            [
+                (entities_vdb, [ll_keywords], query_param.top_k),
+                (relationships_vdb, [hl_keywords], query_param.top_k),
+            ]
+        )
+
     if query_param.mode == "local":
         entities_context, relations_context, text_units_context = await _get_node_data(
             ll_keywords,
@@ -937,6 +1415,7 @@ async def _build_query_context(
             entities_vdb,
             text_chunks_db,
             query_param,
+            results=entity_results,
         )
     elif query_param.mode == "global":
         entities_context, relations_context, text_units_context = await _get_edge_data(
@@ -945,6 +1424,7 @@ async def _build_query_context(
             relationships_vdb,
             text_chunks_db,
             query_param,
+            results=relation_results,
         )
     else:  # hybrid mode
         (
@@ -957,6 +1437,7 @@ async def _build_query_context(
             entities_vdb,
             text_chunks_db,
             query_param,
+            results=entity_results,
         )
         (
             hl_entities_context,
@@ -968,6 +1449,7 @@ async def _build_query_context(
             relationships_vdb,
             text_chunks_db,
             query_param,
+            results=relation_results,
         )
         entities_context, relations_context, text_units_context = combine_contexts(
             [hl_entities_context, ll_entities_context],
@@ -975,12 +1457,21 @@ async def _build_query_context(
             [hl_text_units_context, ll_text_units_context],
         )
 
-    mylogger.update_transaction(query_param.transaction_no,query_param.mode, **{
-            "Entities Retrieved": entities_context, 
-            "Relations Retrieved": relations_context,
-            "Chunks Retrieved": text_units_context
-        }
-    )
+    trace_sink = get_trace_sink()
+    if trace_sink.enabled:
+        trace_sink.emit(
+            query_param.transaction_no,
+            query_param.mode,
+            **{
+                "Entities Retrieved": entities_context,
+                "Relations Retrieved": relations_context,
+                "Chunks Retrieved": text_units_context,
+            },
+        )
+    return entities_context, relations_context, text_units_context
+
+
+def _format_query_context(entities_context, relations_context, text_units_context):
     return f"""
 -----Entities-----
 ```csv
@@ -997,15 +1488,57 @@ async def _build_query_context(
 """
 
 
+async def _query_vdbs(
+    requests: list[tuple[BaseVectorStorage, list[str], int]],
+) -> list[list[list[dict]]]:
+    """
+    Run several (vdb, queries, top_k) searches. The texts of all storages that implement
+    query_many are embedded in one batch per embedding function and each storage scores its
+    queries together. Returns one list of per-query results for each request.
+    """
+    batched = {}  # embedding func id -> (embedding func, {text: position})
+    for vdb, queries, _ in requests:
+        if not queries or type(vdb).query_many is BaseVectorStorage.query_many:
+            continue
+        _, texts = batched.setdefault(id(vdb.embedding_func), (vdb.embedding_func, {}))
+        for query in queries:
+            texts.setdefault(query, len(texts))
+
+    embedded = dict(
+        zip(
+            batched.keys(),
+            await asyncio.gather(
+                *[func(list(texts)) for func, texts in batched.values()]
+            ),
+        )
+    )
+
+    async def _run(vdb, queries, top_k):
+        if not queries:
+            return []
+        key = id(vdb.embedding_func)
+        if key not in embedded:
+            return await vdb.query_many(queries, top_k)
+        texts = batched[key][1]
+        embeddings = np.asarray(embedded[key])[[texts[query] for query in queries]]
+        return await vdb.query_many(queries, top_k, embeddings=embeddings)
+
+    return await asyncio.gather(
+        *[_run(vdb, queries, top_k) for vdb, queries, top_k in requests]
+    )
+
+
 async def _get_node_data(
     query,
     knowledge_graph_inst: BaseGraphStorage,
     entities_vdb: BaseVectorStorage,
     text_chunks_db: BaseKVStorage[TextChunkSchema],
     query_param: QueryParam,
+    results: list[dict] = None,
 ):
     # get similar entities
-    results = await entities_vdb.query(query, top_k=query_param.top_k)
+    if results is None:
+        results = await entities_vdb.query(query, top_k=query_param.top_k)
     if not len(results):
         return "", "", ""
     # get entity information
@@ -1156,6 +1689,7 @@ async def _find_most_related_text_unit_from_entities(
         all_text_units,
         key=lambda x: x["data"]["content"],
         max_token_size=query_param.max_token_for_text_unit,
+        tokens_key=lambda x: x["data"].get("tokens"),
     )
 
     all_text_units = [t["data"] for t in all_text_units]
@@ -1198,6 +1732,7 @@ async def _find_most_related_edges_from_entities(
         all_edges_data,
         key=lambda x: x["description"],
         max_token_size=query_param.max_token_for_global_context,
+        tokens_key=lambda x: x.get("description_tokens"),
     )
     return all_edges_data
 
@@ -1208,8 +1743,10 @@ async def _get_edge_data(
     relationships_vdb: BaseVectorStorage,
     text_chunks_db: BaseKVStorage[TextChunkSchema],
     query_param: QueryParam,
+    results: list[dict] = None,
 ):
-    results = await relationships_vdb.query(keywords, top_k=query_param.top_k)
+    if results is None:
+        results = await relationships_vdb.query(keywords, top_k=query_param.top_k)
 
     if not len(results):
         return "", "", ""
@@ -1241,6 +1778,7 @@ async def _get_edge_data(
         edge_datas,
         key=lambda x: x["description"],
         max_token_size=query_param.max_token_for_global_context,
+        tokens_key=lambda x: x.get("description_tokens"),
     )
 
     use_entities = await _find_most_related_entities_from_relationships(
@@ -1336,6 +1874,7 @@ async def _find_most_related_entities_from_relationships(
         node_datas,
         key=lambda x: x["description"],
         max_token_size=query_param.max_token_for_local_context,
+        tokens_key=lambda x: x.get("description_tokens"),
     )
 
     return node_datas
@@ -1384,6 +1923,7 @@ async def _find_related_text_unit_from_relationships(
         valid_text_units,
         key=lambda x: x["data"]["content"],
         max_token_size=query_param.max_token_for_text_unit,
+        tokens_key=lambda x: x["data"].get("tokens"),
     )
 
     all_text_units: list[TextChunkSchema] = [t["data"] for t in truncated_text_units]
@@ -1447,6 +1987,7 @@ async def naive_query(
         valid_chunks,
         key=lambda x: x["content"],
         max_token_size=query_param.max_token_for_text_unit,
+        tokens_key=lambda x: x.get("tokens"),
     )
 
     if not maybe_trun_chunks:
@@ -1456,10 +1997,13 @@ async def naive_query(
     logger.info(f"Truncate {len(chunks)} to {len(maybe_trun_chunks)} chunks")
     section = "\n--New Chunk--\n".join([c["content"] for c in maybe_trun_chunks])
 
-    mylogger.update_transaction(query_param.transaction_no,query_param.mode, **{
-            "Chunks Retrieved": section
-        }
-    )
+    trace_sink = get_trace_sink()
+    if trace_sink.enabled:
+        trace_sink.emit(
+            query_param.transaction_no,
+            query_param.mode,
+            **{"Chunks Retrieved": section},
+        )
 
     if query_param.only_need_context:
         return section
@@ -1471,11 +2015,13 @@ async def naive_query(
 
     if query_param.only_need_prompt:
         return sys_prompt
-    
-    mylogger.update_transaction(query_param.transaction_no,query_param.mode, **{
-            "Final Prompt": sys_prompt+query
-        }
-    )
+
+    if trace_sink.enabled:
+        trace_sink.emit(
+            query_param.transaction_no,
+            query_param.mode,
+            **{"Final Prompt": sys_prompt + query},
+        )
 
     response = await use_model_func(
         query,
@@ -1638,6 +2184,7 @@ async def mix_kg_vector_query(
                 valid_chunks,
                 key=lambda x: x["content"],
                 max_token_size=query_param.max_token_for_text_unit,
+                tokens_key=lambda x: x.get("tokens"),
             )
 
             if not maybe_trun_chunks:
@@ -180,6 +180,48 @@ When handling relationships with timestamps:
 
 Add sections and commentary to the response as appropriate for the length and format. Style the response in markdown."""
 
+PROMPTS["rag_response_instructions"] = """
+
+---Instructions---
+
+{instructions}"""
+
+PROMPTS["rag_batch_response"] = """---Role---
+
+You are a helpful assistant responding to several independent questions about data in the tables provided.
+
+
+---Goal---
+
+Answer each numbered question separately, using the shared data tables below and the instructions that apply to every question.
+If you don't know an answer, just say so. Do not make anything up.
+Do not include information where the supporting evidence for it is not provided.
+
+---Instructions for every question---
+
+{instructions}
+
+---Target response length and format---
+
+{response_type}
+
+---Data tables---
+
+{context_data}
+
+---Output format---
+
+Answer all {question_count} questions in order. Start each answer with its marker line and put nothing else on that line:
+---Answer 1---
+[answer to question 1]
+---Answer 2---
+[answer to question 2]
+"""
+
+PROMPTS["rag_batch_question"] = """---Question {index}---
+{question}
+"""
+
 PROMPTS["keywords_extraction"] = """
 ---Role---
 You are a helpful assistant tasked with identifying both high-level and low-level keywords in user queries.
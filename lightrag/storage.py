@@ -1,18 +1,21 @@
 import asyncio
 import html
 import os
+import pickle
 from tqdm.asyncio import tqdm as tqdm_async
 from dataclasses import dataclass
 from typing import Any, Union, cast, Dict
 import networkx as nx
 import numpy as np
+import orjson
 from nano_vectordb import NanoVectorDB
 import time
 
+from .ann import IVFFlatIndex
+from .memmap_vectordb import MemmapVectorDB
+
 from .utils import (
     logger,
-    load_json,
-    write_json,
     compute_mdhash_id,
 )
 
@@ -25,21 +28,165 @@ from .base import (
     DocStatusStorage,
 )
 
+GRAPH_FILE_VERSION = 1
+
+
+def _file_has_data(file_name: str, min_size: int = 1) -> bool:
+    return os.path.exists(file_name) and os.path.getsize(file_name) >= min_size
+
+
+class JsonWAL:
+    """
+    Write-ahead log of a JSON storage file.
+
+    Mutations are appended as orjson lines to `<file>.wal.jsonl` (fsynced if `fsync`) and
+    replayed over the JSON snapshot on load, so a write costs one line instead of a dump
+    of the whole dict. `compact` rotates the log, then writes the new snapshot from a
+    worker thread through a temp file and os.replace; after a crash the rotated log is
+    replayed again, which is harmless since every record sets or removes keys.
+    """
+
+    def __init__(self, snapshot_file: str, fsync: bool = False, compact_entries: int = 1000):
+        self.snapshot_file = snapshot_file
+        self.file_name = f"{os.path.splitext(snapshot_file)[0]}.wal.jsonl"
+        self._compacting_file_name = f"{self.file_name}.compacting"
+        self.fsync = fsync
+        self.compact_entries = compact_entries
+        self.entries = 0
+        self._compaction = None
+
+    @staticmethod
+    def dumps(obj, indent=False) -> bytes:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option, default=str)
+
+    def load(self, apply) -> dict:
+        """The snapshot with every logged record applied by `apply(data, record)`."""
+        data = {}
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, "rb") as f:
+                data = orjson.loads(f.read()) or {}
+        for file_name in (self._compacting_file_name, self.file_name):
+            if not os.path.exists(file_name):
+                continue
+            with open(file_name, "rb") as f:
+                for line in f:
+                    try:
+                        record = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # A partly written last line from a crash
+                        logger.warning(f"Ignoring incomplete line in {file_name}")
+                        continue
+                    apply(data, record)
+                    self.entries += 1
+        if os.path.exists(self._compacting_file_name):
+            # A compaction was interrupted, finish it before the log rotates again
+            self._rotate()
+            self._write_snapshot(self.dumps(data, indent=True))
+        return data
+
+    def append(self, records: list[dict]):
+        if not records:
+            return
+        with open(self.file_name, "ab") as f:
+            f.write(b"".join(self.dumps(record) + b"\n" for record in records))
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        self.entries += len(records)
+
+    def has_data(self) -> bool:
+        """Whether the snapshot holds more than "{}" or the log holds records."""
+        return _file_has_data(self.snapshot_file, min_size=3) or any(
+            _file_has_data(file_name)
+            for file_name in (self.file_name, self._compacting_file_name)
+        )
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self.entries >= self.compact_entries
+
+    def _rotate(self):
+        if os.path.exists(self.file_name):
+            if os.path.exists(self._compacting_file_name):
+                with open(self.file_name, "rb") as src, open(
+                    self._compacting_file_name, "ab"
+                ) as dst:
+                    dst.write(src.read())
+                os.remove(self.file_name)
+            else:
+                os.replace(self.file_name, self._compacting_file_name)
+        self.entries = 0
+
+    def _write_snapshot(self, snapshot: bytes):
+        tmp_file_name = f"{self.snapshot_file}.tmp"
+        with open(tmp_file_name, "wb") as f:
+            f.write(snapshot)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file_name, self.snapshot_file)
+        if os.path.exists(self._compacting_file_name):
+            os.remove(self._compacting_file_name)
+
+    async def compact(self, data: dict, wait: bool = False):
+        """Snapshot `data` now, write it to disk in the background."""
+        if self._compaction is not None:
+            await self._compaction
+        snapshot = self.dumps(data, indent=True)
+        self._rotate()
+        self._compaction = asyncio.ensure_future(
+            asyncio.to_thread(self._write_snapshot, snapshot)
+        )
+        if wait:
+            await self._compaction
+
 
 @dataclass
 class JsonKVStorage(BaseKVStorage):
     def __post_init__(self):
         working_dir = self.global_config["working_dir"]
         self._file_name = os.path.join(working_dir, f"kv_store_{self.namespace}.json")
-        self._data = load_json(self._file_name) or {}
+        self._wal = JsonWAL(
+            self._file_name,
+            fsync=self.global_config.get("json_storage_fsync", False),
+            compact_entries=self.global_config.get("json_storage_compact_entries", 1000),
+        )
+        self._loaded_data = None
         self._lock = asyncio.Lock()
-        logger.info(f"Load KV {self.namespace} with {len(self._data)} data")
+
+    @property
+    def _data(self) -> dict:
+        # Loaded on first use, so namespaces a process never touches are never read
+        if self._loaded_data is None:
+            self._loaded_data = self._wal.load(self._apply_record)
+            logger.info(f"Load KV {self.namespace} with {len(self._loaded_data)} data")
+        return self._loaded_data
+
+    @_data.setter
+    def _data(self, data: dict):
+        self._loaded_data = data
+
+    @staticmethod
+    def _apply_record(data: dict, record: dict):
+        if "upsert" in record:
+            data.update(record["upsert"])
+        elif "delete" in record:
+            for id in record["delete"]:
+                data.pop(id, None)
+        elif record.get("drop"):
+            data.clear()
 
     async def all_keys(self) -> list[str]:
         return list(self._data.keys())
 
+    def has_local_data(self) -> bool:
+        return self._wal.has_data()
+
     async def index_done_callback(self):
-        write_json(self._data, self._file_name)
+        if self._loaded_data is None or not self._wal.needs_compaction:
+            return
+        await self._wal.compact(self._data)
 
     async def get_by_id(self, id):
         return self._data.get(id, None)
@@ -62,10 +209,13 @@ class JsonKVStorage(BaseKVStorage):
     async def upsert(self, data: dict[str, dict]):
         left_data = {k: v for k, v in data.items() if k not in self._data}
         self._data.update(left_data)
+        self._wal.append([{"upsert": left_data}] if left_data else [])
         return left_data
 
     async def drop(self):
         self._data = {}
+        # Snapshot the empty dict right away, so the files show the storage is empty
+        await self._wal.compact(self._data, wait=True)
 
     async def filter(self, filter_func):
         """Filter key-value pairs based on a filter function
@@ -93,10 +243,50 @@ class JsonKVStorage(BaseKVStorage):
             for id in ids:
                 if id in self._data:
                     del self._data[id]
+            self._wal.append([{"delete": ids}])
             await self.index_done_callback()
             logger.info(f"Successfully deleted {len(ids)} items from {self.namespace}")
 
 
+@dataclass
+class JsonLLMCacheStorage(JsonKVStorage):
+    """
+    LLM response cache as {mode: {args hash: entry}}, persisted per entry.
+
+    Every upserted entry is a line of the write-ahead log, so caching a response costs one
+    appended line instead of rewriting the whole cache. The JSON snapshot is rewritten
+    once the log holds `llm_cache_compact_entries` (1000) lines.
+    """
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._wal.compact_entries = self.global_config.get(
+            "llm_cache_compact_entries", 1000
+        )
+
+    @staticmethod
+    def _apply_record(data: dict, record: dict):
+        if "mode" in record:
+            data.setdefault(record["mode"], {})[record["id"]] = record["value"]
+        else:
+            JsonKVStorage._apply_record(data, record)
+
+    async def get_by_mode_and_id(self, mode: str, id: str) -> Union[dict, None]:
+        entry = self._data.get(mode, {}).get(id)
+        return {id: entry} if entry is not None else None
+
+    async def upsert(self, data: dict[str, dict]):
+        """Merge {mode: {args hash: entry}} into the cache, entry by entry."""
+        records = []
+        for mode, entries in data.items():
+            mode_cache = self._data.setdefault(mode, {})
+            for id, entry in entries.items():
+                mode_cache[id] = entry
+                records.append({"mode": mode, "id": id, "value": entry})
+        self._wal.append(records)
+        return data
+
+
 @dataclass
 class NanoVectorDBStorage(BaseVectorStorage):
     cosine_better_than_threshold: float = 0.2
@@ -106,13 +296,14 @@ class NanoVectorDBStorage(BaseVectorStorage):
             self.global_config["working_dir"], f"vdb_{self.namespace}.json"
         )
         self._max_batch_size = self.global_config["embedding_batch_num"]
-        self._client = NanoVectorDB(
-            self.embedding_func.embedding_dim, storage_file=self._client_file_name
-        )
+        self._loaded_client = None
         self.cosine_better_than_threshold = self.global_config.get(
             "cosine_better_than_threshold", self.cosine_better_than_threshold
         )
 
+    def has_local_data(self) -> bool:
+        return _file_has_data(self._client_file_name)
+
     async def upsert(self, data: dict[str, dict]):
         logger.info(f"Inserting {len(data)} vectors to {self.namespace}")
         if not len(data):
@@ -165,7 +356,43 @@ class NanoVectorDBStorage(BaseVectorStorage):
             top_k=top_k,
             better_than_threshold=self.cosine_better_than_threshold,
         )
-        results = [
+        return self._format_results(results)
+
+    async def query_many(self, queries: list[str], top_k=5, embeddings=None):
+        """Embed all queries in one batch and score them with one matrix-matrix product"""
+        if not queries:
+            return []
+        if embeddings is None:
+            embeddings = await self.embedding_func(queries)
+        storage = self.client_storage
+        if not len(storage["data"]):
+            return [[] for _ in queries]
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        scores = (embeddings / np.where(norms == 0, 1, norms)) @ storage["matrix"].T
+
+        top_k = min(top_k, scores.shape[1])
+        if top_k <= 0:
+            return [[] for _ in queries]
+        top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        results = []
+        for query_scores, query_top in zip(scores, top):
+            query_top = query_top[np.argsort(-query_scores[query_top])]
+            results.append(
+                self._format_results(
+                    [
+                        {**storage["data"][i], "__metrics__": float(query_scores[i])}
+                        for i in query_top
+                        if query_scores[i] >= self.cosine_better_than_threshold
+                    ]
+                )
+            )
+        return results
+
+    @staticmethod
+    def _format_results(results: list[dict]) -> list[dict]:
+        return [
             {
                 **dp,
                 "id": dp["__id__"],
@@ -174,7 +401,15 @@ class NanoVectorDBStorage(BaseVectorStorage):
             }
             for dp in results
         ]
-        return results
+
+    @property
+    def _client(self) -> NanoVectorDB:
+        # Loaded on first use, so namespaces a process never touches are never read
+        if self._loaded_client is None:
+            self._loaded_client = NanoVectorDB(
+                self.embedding_func.embedding_dim, storage_file=self._client_file_name
+            )
+        return self._loaded_client
 
     @property
     def client_storage(self):
@@ -230,23 +465,146 @@ class NanoVectorDBStorage(BaseVectorStorage):
             logger.error(f"Error deleting relations for {entity_name}: {e}")
 
     async def index_done_callback(self):
+        if self._loaded_client is None:
+            return
         self._client.save()
 
 
+@dataclass
+class MemmapVectorDBStorage(NanoVectorDBStorage):
+    """
+    Vector storage backed by MemmapVectorDB: vectors are appended to a binary file that is
+    memory-mapped on load, metadata to a compact JSONL side file.
+
+    Options in `vector_db_storage_cls_kwargs`:
+      - "vector_dtype": "float16" halves the file size, "uint8" quarters it with 8-bit
+        scalar quantization. The dtype is fixed when the namespace is created.
+      - "rerank_factor": with float16/uint8 vectors, also keep float32 copies and re-score
+        the best top_k * rerank_factor matches with them, recovering float32 recall.
+      - "ann_index": "ivf" answers queries from an IVF-flat index once the namespace holds
+        "ann_min_rows" (10000) vectors. "ivf_nlist" (100) sets the number of cells and
+        "ivf_nprobe" (8) the cells scanned per query: more cells probed, better recall.
+    """
+
+    def __post_init__(self):
+        self._client_file_name = os.path.join(
+            self.global_config["working_dir"], f"vdb_{self.namespace}"
+        )
+        self._max_batch_size = self.global_config["embedding_batch_num"]
+        self._loaded_client = None
+        self.cosine_better_than_threshold = self.global_config.get(
+            "cosine_better_than_threshold", self.cosine_better_than_threshold
+        )
+        self._storage_kwargs = self.global_config.get("vector_db_storage_cls_kwargs", {})
+
+    def has_local_data(self) -> bool:
+        # The metadata file starts with a header line, rows follow it
+        meta_file_name = f"{self._client_file_name}.meta.jsonl"
+        if not _file_has_data(meta_file_name):
+            return False
+        with open(meta_file_name, "rb") as f:
+            f.readline()
+            return bool(f.readline().strip())
+
+    @property
+    def _client(self) -> MemmapVectorDB:
+        # Mapped on first use, so namespaces a process never touches are never opened
+        if self._loaded_client is None:
+            index = None
+            if self._storage_kwargs.get("ann_index") == "ivf":
+                index = IVFFlatIndex(
+                    nlist=self._storage_kwargs.get("ivf_nlist", 100),
+                    nprobe=self._storage_kwargs.get("ivf_nprobe", 8),
+                )
+            self._loaded_client = MemmapVectorDB(
+                self.embedding_func.embedding_dim,
+                storage_file=self._client_file_name,
+                dtype=self._storage_kwargs.get("vector_dtype", "float32"),
+                index=index,
+                index_min_rows=self._storage_kwargs.get("ann_min_rows", 10000),
+                rerank_factor=self._storage_kwargs.get("rerank_factor", 0),
+            )
+        return self._loaded_client
+
+    @property
+    def client_storage(self):
+        return self._client.storage
+
+    async def query_many(self, queries: list[str], top_k=5, embeddings=None):
+        """Embed all queries in one batch and score them in one pass over the matrix"""
+        if not queries:
+            return []
+        if embeddings is None:
+            embeddings = await self.embedding_func(queries)
+        results = self._client.query_many(
+            embeddings,
+            top_k=top_k,
+            better_than_threshold=self.cosine_better_than_threshold,
+        )
+        return [self._format_results(query_results) for query_results in results]
+
+    async def delete_entity_relation(self, entity_name: str):
+        try:
+            ids_to_delete = [
+                dp["__id__"]
+                for dp in self._client.all()
+                if dp.get("src_id") == entity_name or dp.get("tgt_id") == entity_name
+            ]
+            logger.debug(f"Found {len(ids_to_delete)} relations for entity {entity_name}")
+
+            if ids_to_delete:
+                await self.delete(ids_to_delete)
+                logger.debug(
+                    f"Deleted {len(ids_to_delete)} relations for {entity_name}"
+                )
+            else:
+                logger.debug(f"No relations found for entity {entity_name}")
+        except Exception as e:
+            logger.error(f"Error deleting relations for {entity_name}: {e}")
+
+
 @dataclass
 class NetworkXStorage(BaseGraphStorage):
+    """
+    Graph storage on an in-memory NetworkX graph.
+
+    The graph is saved to `graph_<namespace>.pkl` as pickled node and edge lists, which
+    loads and saves far faster than GraphML; an existing `.graphml` file is read once and
+    converted. `index_done_callback` only writes the graph when it changed, and
+    `export_graphml` writes a GraphML copy for tools like graph_visual.py.
+    """
+
     @staticmethod
     def load_nx_graph(file_name) -> nx.Graph:
-        if os.path.exists(file_name):
+        if not os.path.exists(file_name):
+            return None
+        if file_name.endswith(".graphml"):
             return nx.read_graphml(file_name)
-        return None
+        with open(file_name, "rb") as f:
+            data = pickle.load(f)
+        graph = nx.DiGraph() if data["directed"] else nx.Graph()
+        graph.add_nodes_from(data["nodes"])
+        graph.add_edges_from(data["edges"])
+        return graph
 
     @staticmethod
     def write_nx_graph(graph: nx.Graph, file_name):
         logger.info(
             f"Writing graph with {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges"
         )
-        nx.write_graphml(graph, file_name)
+        if file_name.endswith(".graphml"):
+            nx.write_graphml(graph, file_name)
+            return
+        data = {
+            "version": GRAPH_FILE_VERSION,
+            "directed": graph.is_directed(),
+            "nodes": list(graph.nodes(data=True)),
+            "edges": list(graph.edges(data=True)),
+        }
+        tmp_file_name = f"{file_name}.tmp"
+        with open(tmp_file_name, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file_name, file_name)
 
     @staticmethod
     def stable_largest_connected_component(graph: nx.Graph) -> nx.Graph:
@@ -297,21 +655,56 @@ class NetworkXStorage(BaseGraphStorage):
         return fixed_graph
 
     def __post_init__(self):
+        self._graph_file = os.path.join(
+            self.global_config["working_dir"], f"graph_{self.namespace}.pkl"
+        )
         self._graphml_xml_file = os.path.join(
             self.global_config["working_dir"], f"graph_{self.namespace}.graphml"
         )
-        preloaded_graph = NetworkXStorage.load_nx_graph(self._graphml_xml_file)
-        if preloaded_graph is not None:
-            logger.info(
-                f"Loaded graph from {self._graphml_xml_file} with {preloaded_graph.number_of_nodes()} nodes, {preloaded_graph.number_of_edges()} edges"
-            )
-        self._graph = preloaded_graph or nx.Graph()
+        self._loaded_graph = None
+        self._dirty = False
         self._node_embed_algorithms = {
             "node2vec": self._node2vec_embed,
         }
 
+    @property
+    def _graph(self) -> nx.Graph:
+        # Loaded on first use, so namespaces a process never touches are never read
+        if self._loaded_graph is None:
+            graph_file = self._graph_file
+            if not os.path.exists(graph_file) and os.path.exists(self._graphml_xml_file):
+                # Convert a graph saved by earlier versions on the next write
+                graph_file = self._graphml_xml_file
+                self._dirty = True
+            preloaded_graph = NetworkXStorage.load_nx_graph(graph_file)
+            if preloaded_graph is not None:
+                logger.info(
+                    f"Loaded graph from {graph_file} with {preloaded_graph.number_of_nodes()} nodes, {preloaded_graph.number_of_edges()} edges"
+                )
+            self._loaded_graph = preloaded_graph or nx.Graph()
+        return self._loaded_graph
+
+    @_graph.setter
+    def _graph(self, graph: nx.Graph):
+        self._loaded_graph = graph
+        self._dirty = True
+
+    def has_local_data(self) -> bool:
+        return _file_has_data(self._graph_file) or _file_has_data(
+            self._graphml_xml_file
+        )
+
     async def index_done_callback(self):
-        NetworkXStorage.write_nx_graph(self._graph, self._graphml_xml_file)
+        if self._loaded_graph is None or not self._dirty:
+            return
+        NetworkXStorage.write_nx_graph(self._graph, self._graph_file)
+        self._dirty = False
+
+    def export_graphml(self, file_name: str = None) -> str:
+        """Write the graph as GraphML, next to the graph file by default."""
+        file_name = file_name or self._graphml_xml_file
+        NetworkXStorage.write_nx_graph(self._graph, file_name)
+        return file_name
 
     async def has_node(self, node_id: str) -> bool:
         return self._graph.has_node(node_id)
@@ -340,11 +733,33 @@ class NetworkXStorage(BaseGraphStorage):
 
     async def upsert_node(self, node_id: str, node_data: dict[str, str]):
         self._graph.add_node(node_id, **node_data)
+        self._dirty = True
 
     async def upsert_edge(
         self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
     ):
         self._graph.add_edge(source_node_id, target_node_id, **edge_data)
+        self._dirty = True
+
+    async def get_nodes(self, node_ids: list[str]) -> dict[str, dict]:
+        nodes = self._graph.nodes
+        return {node_id: nodes[node_id] for node_id in node_ids if node_id in nodes}
+
+    async def get_edges(
+        self, edges: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        graph_edges = self._graph.edges
+        return {pair: graph_edges[pair] for pair in edges if pair in graph_edges}
+
+    async def upsert_nodes(self, nodes: dict[str, dict[str, str]]):
+        self._graph.add_nodes_from(nodes.items())
+        self._dirty = True
+
+    async def upsert_edges(self, edges: dict[tuple[str, str], dict[str, str]]):
+        self._graph.add_edges_from(
+            (src, tgt, edge_data) for (src, tgt), edge_data in edges.items()
+        )
+        self._dirty = True
 
     async def delete_node(self, node_id: str):
         """
@@ -354,6 +769,7 @@ class NetworkXStorage(BaseGraphStorage):
         """
         if self._graph.has_node(node_id):
             self._graph.remove_node(node_id)
+            self._dirty = True
             logger.info(f"Node {node_id} deleted from the graph.")
         else:
             logger.warning(f"Node {node_id} not found in the graph for deletion.")
@@ -384,6 +800,7 @@ class NetworkXStorage(BaseGraphStorage):
         for node in nodes:
             if self._graph.has_node(node):
                 self._graph.remove_node(node)
+                self._dirty = True
 
     def remove_edges(self, edges: list[tuple[str, str]]):
         """Delete multiple edges
@@ -394,6 +811,7 @@ class NetworkXStorage(BaseGraphStorage):
         for source, target in edges:
             if self._graph.has_edge(source, target):
                 self._graph.remove_edge(source, target)
+                self._dirty = True
 
 
 @dataclass
@@ -403,8 +821,26 @@ class JsonDocStatusStorage(DocStatusStorage):
     def __post_init__(self):
         working_dir = self.global_config["working_dir"]
         self._file_name = os.path.join(working_dir, f"kv_store_{self.namespace}.json")
-        self._data = load_json(self._file_name) or {}
-        logger.info(f"Loaded document status storage with {len(self._data)} records")
+        self._wal = JsonWAL(
+            self._file_name,
+            fsync=self.global_config.get("json_storage_fsync", False),
+            compact_entries=self.global_config.get("json_storage_compact_entries", 1000),
+        )
+        self._loaded_data = None
+
+    @property
+    def _data(self) -> dict:
+        # Loaded on first use, so a process that only queries never reads it
+        if self._loaded_data is None:
+            self._loaded_data = self._wal.load(JsonKVStorage._apply_record)
+            logger.info(
+                f"Loaded document status storage with {len(self._loaded_data)} records"
+            )
+        return self._loaded_data
+
+    @_data.setter
+    def _data(self, data: dict):
+        self._loaded_data = data
 
     async def filter_keys(self, data: list[str]) -> set[str]:
         """Return keys that should be processed (not in storage or not successfully processed)"""
@@ -432,8 +868,10 @@ class JsonDocStatusStorage(DocStatusStorage):
         return {k: v for k, v in self._data.items() if v["status"] == DocStatus.PENDING}
 
     async def index_done_callback(self):
-        """Save data to file after indexing"""
-        write_json(self._data, self._file_name)
+        """Compact the write-ahead log into the JSON file after indexing"""
+        if self._loaded_data is None or not self._wal.needs_compaction:
+            return
+        await self._wal.compact(self._data)
 
     async def upsert(self, data: dict[str, dict]):
         """Update or insert document status
@@ -442,7 +880,7 @@ class JsonDocStatusStorage(DocStatusStorage):
             data: Dictionary of document IDs and their status data
         """
         self._data.update(data)
-        await self.index_done_callback()
+        self._wal.append([{"upsert": data}])
         return data
 
     async def get(self, doc_id: str) -> Union[DocProcessingStatus, None]:
@@ -453,4 +891,5 @@ class JsonDocStatusStorage(DocStatusStorage):
         """Delete document status by IDs"""
         for doc_id in doc_ids:
             self._data.pop(doc_id, None)
+        self._wal.append([{"delete": doc_ids}])
         await self.index_done_callback()
@@ -5,9 +5,11 @@ import csv
 import json
 import logging
 import os
+import queue
 import re
+import threading
 from dataclasses import dataclass
-from functools import wraps
+from functools import lru_cache, wraps
 from hashlib import md5
 from typing import Any, Union, List, Optional
 import xml.etree.ElementTree as ET
@@ -38,6 +40,86 @@ logger = logging.getLogger("lightrag")
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
 
+class TraceSink:
+    """Receives structured retrieval events emitted by the query functions.
+
+    The default sink is disabled and drops every event, so tracing costs nothing unless a
+    sink is installed with `set_trace_sink`.
+    """
+
+    enabled = False
+
+    def emit(self, transaction_no: int, mode: str, **fields):
+        pass
+
+    def close(self):
+        pass
+
+
+class QueueTraceSink(TraceSink):
+    """Non-blocking trace sink that hands events to `handler` on a background thread.
+
+    Events wait in a bounded queue; when it is full new events are dropped and counted
+    instead of stalling the query path.
+
+    Usage example:
+        ```python
+        sink = QueueTraceSink(mylogger.update_transaction)
+        set_trace_sink(sink)
+        ...
+        sink.close()  # drain remaining events
+        ```
+    """
+
+    enabled = True
+    _STOP = object()
+
+    def __init__(self, handler: callable, max_queue_size: int = 10000):
+        self._handler = handler
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def emit(self, transaction_no: int, mode: str, **fields):
+        try:
+            self._queue.put_nowait((transaction_no, mode, fields))
+        except queue.Full:
+            if not self.dropped:
+                logger.warning("Trace queue is full, dropping trace events")
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            transaction_no, mode, fields = item
+            try:
+                self._handler(transaction_no, mode, **fields)
+            except Exception as e:
+                logger.warning(f"Trace handler failed: {e}")
+
+    def close(self):
+        """Process all queued events and stop the background thread"""
+        self._queue.put(self._STOP)
+        self._thread.join()
+        if self.dropped:
+            logger.warning(f"Dropped {self.dropped} trace events")
+
+
+_trace_sink = TraceSink()
+
+
+def set_trace_sink(sink: TraceSink):
+    global _trace_sink
+    _trace_sink = sink
+
+
+def get_trace_sink() -> TraceSink:
+    return _trace_sink
+
+
 def set_logger(log_file: str):
     logger.setLevel(logging.DEBUG)
 
@@ -176,6 +258,19 @@ def decode_tokens_by_tiktoken(tokens: list[int], model_name: str = "gpt-4o"):
     return content
 
 
+def token_offsets(content: str, tokens: list[int], model_name: str = "gpt-4o"):
+    """
+    Character offset in `content` at which each of its `tokens` starts, so token windows
+    can be cut out of `content` by slicing instead of decoding them again. None if the
+    tokens don't decode back to `content`.
+    """
+    global ENCODER
+    if ENCODER is None:
+        ENCODER = tiktoken.encoding_for_model(model_name)
+    text, offsets = ENCODER.decode_with_offsets(tokens)
+    return offsets if text == content else None
+
+
 def pack_user_ass_to_openai_messages(*args: str):
     roles = ["user", "assistant"]
     return [
@@ -208,13 +303,26 @@ def is_float_regex(value):
     return bool(re.match(r"^[-+]?[0-9]*\.?[0-9]+$", value))
 
 
-def truncate_list_by_token_size(list_data: list, key: callable, max_token_size: int):
-    """Truncate a list of data by token size"""
+@lru_cache(maxsize=65536)
+def count_tokens(content: str, model_name: str = "gpt-4o") -> int:
+    """Number of tokens in `content`, cached for strings that come back query after query"""
+    return len(encode_string_by_tiktoken(content, model_name=model_name))
+
+
+def truncate_list_by_token_size(
+    list_data: list, key: callable, max_token_size: int, tokens_key: callable = None
+):
+    """Truncate a list of data by token size
+
+    `tokens_key` returns the token count stored with an item at write time, or None for
+    items stored without one, whose `key` text is counted instead.
+    """
     if max_token_size <= 0:
         return []
     tokens = 0
     for i, data in enumerate(list_data):
-        tokens += len(encode_string_by_tiktoken(key(data)))
+        data_tokens = tokens_key(data) if tokens_key is not None else None
+        tokens += data_tokens if data_tokens is not None else count_tokens(key(data))
         if tokens > max_token_size:
             return list_data[:i]
     return list_data
@@ -335,6 +443,95 @@ def process_combine_contexts(hl, ll):
     return combined_sources_result
 
 
+class EmbeddingCacheIndex:
+    """
+    Normalized matrix of the cached query embeddings of each mode, so the best cached
+    response is found with one matrix-vector product instead of dequantizing and comparing
+    every entry.
+
+    A mode's matrix is built lazily from its cache dict on the first lookup and updated
+    by `add` when save_to_cache stores an entry. It is rebuilt when the cache dict no
+    longer matches, e.g. after a drop or an entry written by another process.
+    """
+
+    def __init__(self):
+        self._modes = {}  # mode -> (cache dict, its size, cache ids, cache id -> row, matrix)
+
+    @staticmethod
+    def _decode(cache_data: dict) -> np.ndarray:
+        quantized = np.frombuffer(
+            bytes.fromhex(cache_data["embedding"]), dtype=np.uint8
+        ).reshape(cache_data["embedding_shape"])
+        embedding = dequantize_embedding(
+            quantized, cache_data["embedding_min"], cache_data["embedding_max"]
+        )
+        return embedding / (np.linalg.norm(embedding) or 1)
+
+    def _build(self, mode: str, mode_cache: dict):
+        ids = [
+            cache_id
+            for cache_id, cache_data in mode_cache.items()
+            if cache_data.get("embedding") is not None
+        ]
+        matrix = (
+            np.stack([self._decode(mode_cache[cache_id]) for cache_id in ids])
+            if ids
+            else None
+        )
+        rows = {cache_id: row for row, cache_id in enumerate(ids)}
+        self._modes[mode] = (mode_cache, len(mode_cache), ids, rows, matrix)
+
+    def _is_current(self, mode: str, mode_cache: dict) -> bool:
+        if mode not in self._modes:
+            return False
+        source, size, ids, _, _ = self._modes[mode]
+        if size != len(mode_cache):
+            return False
+        # A dict fetched again from a non-JSON backend: the size and the newest indexed
+        # entry, one keyed lookup, tell a drop or an entry of another process apart
+        return source is mode_cache or not ids or ids[-1] in mode_cache
+
+    def add(self, mode: str, cache_id: str, cache_data: dict, is_new: bool = True):
+        """Record the entry `cache_id` just stored in the `mode` cache."""
+        if mode not in self._modes:
+            return
+        source, size, ids, rows, matrix = self._modes[mode]
+        has_embedding = cache_data.get("embedding") is not None
+        if cache_id in rows:
+            if not has_embedding:
+                # Rare, let the next lookup rebuild the mode
+                del self._modes[mode]
+                return
+            matrix[rows[cache_id]] = self._decode(cache_data)
+        elif has_embedding:
+            vector = self._decode(cache_data)[None, :]
+            matrix = vector if matrix is None else np.vstack([matrix, vector])
+            rows[cache_id] = len(ids)
+            ids.append(cache_id)
+        self._modes[mode] = (source, size + is_new, ids, rows, matrix)
+
+    def best_match(self, mode: str, mode_cache: dict, embedding) -> tuple:
+        """(cache id, cosine similarity) of the closest cached embedding, or (None, -1)."""
+        if not self._is_current(mode, mode_cache):
+            self._build(mode, mode_cache)
+        _, _, ids, _, matrix = self._modes[mode]
+        if matrix is None:
+            return None, -1
+        query = np.asarray(embedding, dtype=np.float32)
+        similarities = matrix @ (query / (np.linalg.norm(query) or 1))
+        best = int(np.argmax(similarities))
+        return ids[best], float(similarities[best])
+
+
+def embedding_cache_index(hashing_kv) -> EmbeddingCacheIndex:
+    """The EmbeddingCacheIndex of an LLM cache storage, created on first use."""
+    index = getattr(hashing_kv, "_embedding_cache_index", None)
+    if index is None:
+        index = EmbeddingCacheIndex()
+        hashing_kv._embedding_cache_index = index
+    return index
+
+
 async def get_best_cached_response(
     hashing_kv,
     current_embedding,
@@ -349,32 +546,13 @@ async def get_best_cached_response(
     if not mode_cache:
         return None
 
-    best_similarity = -1
-    best_response = None
-    best_prompt = None
-    best_cache_id = None
-
-    # Only iterate through cache entries for this mode
-    for cache_id, cache_data in mode_cache.items():
-        if cache_data["embedding"] is None:
-            continue
-
-        # Convert cached embedding list to ndarray
-        cached_quantized = np.frombuffer(
-            bytes.fromhex(cache_data["embedding"]), dtype=np.uint8
-        ).reshape(cache_data["embedding_shape"])
-        cached_embedding = dequantize_embedding(
-            cached_quantized,
-            cache_data["embedding_min"],
-            cache_data["embedding_max"],
-        )
-
-        similarity = cosine_similarity(current_embedding, cached_embedding)
-        if similarity > best_similarity:
-            best_similarity = similarity
-            best_response = cache_data["return"]
-            best_prompt = cache_data["original_prompt"]
-            best_cache_id = cache_id
+    best_cache_id, best_similarity = embedding_cache_index(hashing_kv).best_match(
+        mode, mode_cache, current_embedding
+    )
+    if best_cache_id is None:
+        return None
+    best_response = mode_cache[best_cache_id]["return"]
+    best_prompt = mode_cache[best_cache_id]["original_prompt"]
 
     if best_similarity > similarity_threshold:
         # If LLM check is enabled and all required parameters are provided
@@ -452,6 +630,17 @@ def dequantize_embedding(
     return (quantized * scale + min_val).astype(np.float32)
 
 
+async def get_cached_response(hashing_kv, args_hash, mode="default"):
+    """Exact-match cache lookup by args hash, whatever enable_llm_cache says"""
+    if exists_func(hashing_kv, "get_by_mode_and_id"):
+        mode_cache = await hashing_kv.get_by_mode_and_id(mode, args_hash) or {}
+    else:
+        mode_cache = await hashing_kv.get_by_id(mode) or {}
+    if args_hash in mode_cache:
+        return mode_cache[args_hash]["return"]
+    return None
+
+
 async def handle_cache(hashing_kv, args_hash, prompt, mode="default"):
     """Generic cache handling function"""
     if hashing_kv is None or not hashing_kv.global_config.get("enable_llm_cache"):
@@ -460,13 +649,7 @@ async def handle_cache(hashing_kv, args_hash, prompt, mode="default"):
     # For naive mode, only use simple cache matching
     # if mode == "naive":
     if mode == "default":
-        if exists_func(hashing_kv, "get_by_mode_and_id"):
-            mode_cache = await hashing_kv.get_by_mode_and_id(mode, args_hash) or {}
-        else:
-            mode_cache = await hashing_kv.get_by_id(mode) or {}
-        if args_hash in mode_cache:
-            return mode_cache[args_hash]["return"], None, None, None
-        return None, None, None, None
+        return await get_cached_response(hashing_kv, args_hash, mode), None, None, None
 
     # Get embedding cache configuration
     embedding_cache_config = hashing_kv.global_config.get(
@@ -499,12 +682,9 @@ async def handle_cache(hashing_kv, args_hash, prompt, mode="default"):
             return best_cached_response, None, None, None
     else:
         # Use regular cache
-        if exists_func(hashing_kv, "get_by_mode_and_id"):
-            mode_cache = await hashing_kv.get_by_mode_and_id(mode, args_hash) or {}
-        else:
-            mode_cache = await hashing_kv.get_by_id(mode) or {}
-        if args_hash in mode_cache:
-            return mode_cache[args_hash]["return"], None, None, None
+        cached_response = await get_cached_response(hashing_kv, args_hash, mode)
+        if cached_response is not None:
+            return cached_response, None, None, None
 
     return None, quantized, min_val, max_val
 
@@ -532,6 +712,7 @@ async def save_to_cache(hashing_kv, cache_data: CacheData):
     else:
         mode_cache = await hashing_kv.get_by_id(cache_data.mode) or {}
 
+    is_new = cache_data.args_hash not in mode_cache
     mode_cache[cache_data.args_hash] = {
         "return": cache_data.content,
         "embedding": cache_data.quantized.tobytes().hex()
@@ -546,6 +727,12 @@ async def save_to_cache(hashing_kv, cache_data: CacheData):
     }
 
     await hashing_kv.upsert({cache_data.mode: mode_cache})
+    embedding_cache_index(hashing_kv).add(
+        cache_data.mode,
+        cache_data.args_hash,
+        mode_cache[cache_data.args_hash],
+        is_new,
+    )
 
 
 def safe_unicode_decode(content):
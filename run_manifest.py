@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+from lightrag.base import DocStatus
+
+logger = logging.getLogger(__name__)
+
+
+class RunManifest:
+    """
+    Checkpoint of a classification run, keyed by Sr No and the transaction input hash.
+
+    Every finished transaction is appended to a JSONL file as soon as it is logged, with a
+    status like LightRAG's DocStatus. Re-running after a crash loads the manifest, skips
+    transactions that were already processed and reuses their results, so the run resumes
+    from the failure point. Rows whose input changed since get classified again, and failed
+    rows are retried. Once the results are saved the manifest is removed with `clear`.
+    """
+
+    def __init__(self, file_name, fsync=False):
+        self.file_name = file_name
+        self.fsync = fsync
+        self.records = {}  # (sr_no, input_hash) -> record
+        self._lock = threading.Lock()
+        self._file = None
+        self.load()
+
+    @staticmethod
+    def key(sr_no, input_hash):
+        return (str(sr_no), input_hash)
+
+    def load(self):
+        """
+        Load the records of a previous, unfinished run. Later lines win, and a partly
+        written last line from a crash is ignored.
+        """
+        self.records = {}
+        if not os.path.exists(self.file_name):
+            return
+        with open(self.file_name, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring incomplete line in {self.file_name}")
+                    continue
+                self.records[self.key(record["sr_no"], record["input_hash"])] = record
+        processed = sum(
+            record["status"] == DocStatus.PROCESSED for record in self.records.values()
+        )
+        logger.info(
+            f"Resuming run from {self.file_name}: {processed} transactions already processed"
+        )
+
+    def get_processed(self, sr_no, input_hash):
+        """
+        Return the stored record of a processed transaction, or None if it still needs work.
+        """
+        record = self.records.get(self.key(sr_no, input_hash))
+        if record is None or record["status"] != DocStatus.PROCESSED:
+            return None
+        return record
+
+    def mark_processed(self, sr_no, input_hash, **result):
+        self._append(sr_no, input_hash, DocStatus.PROCESSED, result)
+
+    def mark_failed(self, sr_no, input_hash, error):
+        self._append(sr_no, input_hash, DocStatus.FAILED, {"error": str(error)})
+
+    def _append(self, sr_no, input_hash, status, fields):
+        record = {
+            "sr_no": str(sr_no),
+            "input_hash": input_hash,
+            "status": status.value,
+            "updated_at": datetime.now().isoformat(),
+            **fields,
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self.records[self.key(sr_no, input_hash)] = record
+            if self._file is None:
+                self._file = open(self.file_name, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def clear(self):
+        """
+        Remove the manifest once the run's results have been saved.
+        """
+        self.close()
+        with self._lock:
+            self.records.clear()
+        if os.path.exists(self.file_name):
+            os.remove(self.file_name)
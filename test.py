@@ -2,16 +2,25 @@ import os
 import logging
 import asyncio
 import numpy as np
-import pandas as pd
 
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
 
-from openai import AzureOpenAI
 from lightrag import LightRAG, QueryParam
-from lightrag.utils import EmbeddingFunc
+from lightrag.lightrag import always_get_an_event_loop
+from lightrag.llm import get_azure_openai_async_client, SentenceTransformerEmbedding
+from lightrag.utils import (
+    EmbeddingFunc,
+    QueueTraceSink,
+    set_trace_sink,
+    compute_args_hash,
+    handle_cache,
+    save_to_cache,
+    CacheData,
+)
 from langchain.prompts import PromptTemplate
 from transaction_logger import mylogger
+from transaction_source import TransactionSource
+from run_manifest import RunManifest
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +32,111 @@ AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT")
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 
+# Maximum number of transactions classified concurrently
+MAX_CONCURRENT_TRANSACTIONS = int(os.getenv("MAX_CONCURRENT_TRANSACTIONS", 8))
+
+# Transactions answered by one classification prompt; 1 classifies each transaction on its own.
+# Batches are formed from transactions in flight, so MAX_CONCURRENT_TRANSACTIONS should be a
+# few times larger.
+CLASSIFICATION_BATCH_SIZE = int(os.getenv("CLASSIFICATION_BATCH_SIZE", 1))
+# Seconds to wait for more summaries before a partial batch is classified
+CLASSIFICATION_BATCH_WINDOW = float(os.getenv("CLASSIFICATION_BATCH_WINDOW", 0.2))
+
+# Transaction fields that determine the summary and therefore the classification
+SUMMARY_FIELDS = ["po_desc", "line_desc", "gl_desc", "invoice_desc"]
+
+
+def transaction_key(transaction):
+    """
+    Hash of the normalized description fields. Transactions with the same key share one
+    summary and one classification.
+    """
+    normalized = [" ".join(transaction[f].split()).lower() for f in SUMMARY_FIELDS]
+    return compute_args_hash("transaction_summary", *normalized)
+
+
+# Prompt template for transaction interpretation
+SUMMARY_PROMPT = PromptTemplate(
+    input_variables=["po_desc", "line_desc", "gl_desc", "invoice_desc"],
+    template="""
+                You are provided with details of a transaction including descriptions from various fields. Using the descriptions given below, generate a concise yet comprehensive summary that captures all essential aspects of the transaction.
+
+                Transaction Details: {{
+                    "po_desc": "{po_desc}",
+                    "line_desc": "{line_desc}",
+                    "gl_desc": "{gl_desc}",
+                    "invoice_desc": "{invoice_desc}"
+                }}
+
+                Please provide a summary that integrates information from all the above fields to offer a complete understanding of the transaction in one or two sentences.
+                """
+)
+
+# Pieces of the TDS section classification prompt. The per-transaction prompt uses all of
+# them; batch classification states the task, guidelines and output format once per call.
+CLASSIFICATION_TASK = """
+                You are provided with a transaction summary and a set of keywords extracted from that transaction summary.
+                Your task is to identify the most relevant TDS (Tax Deducted at Source) section(s) from this list:
+                ["194C", "194JA", "194JB", "194Q", "194A", "194IA", "194IB", "194H", "No TDS"] based on the guidelines below.
+
+"""
+
+CLASSIFICATION_GUIDELINES = """                Guidelines:
+                1. Analyze the provided transaction summary and keywords (low-level and high-level) to determine the most applicable TDS section.
+                2. Distinctly classify transactions that involve procurement of services as falling under 194C when the service involves labor or work execution, like construction, repairs, advertising services, and broadcasting.
+                3. Classify transactions that involve straightforward goods purchases under 194Q, especially when these are large-scale transactions that purely involve buying goods without an associated service component.
+                4. For transactions involving payments for professional or technical services and royalties, consider:
+                - 194JA for specific technical services and film-related royalties,
+                - 194JB for professional services, non-compete fees, and other royalties.
+                5. When there is ambiguity or reasonable doubt between two sections, particularly between 194C and 194Q, explicitly return both sections.
+                - Format: Section 1: [primary section], Section 2: [secondary section if applicable]
+                6. If considering "No TDS" but not completely certain, list "No TDS" and pair it with the next most applicable section.
+                - Format: Section 1: No TDS, Section 2: [second most applicable section]
+                7. Avoid defaulting to "No TDS" unless it is clear from the transaction details that no TDS deduction is applicable.
+
+"""
+
+CLASSIFICATION_ITEM = """                #### Keywords:
+                Low-level keywords: {ll_keywords}
+                High-level keywords: {hl_keywords}
+
+                ### Transaction summary:
+                Transaction summary: {summary}
+
+"""
+
+CLASSIFICATION_OUTPUT_FORMAT = """                ### Required Output Format:
+                Section 1: [Your answer here]
+                Section 2: [Optional; include only if applicable based on ambiguity]
+
+                ### Strictly adhere to this output format. Do not include any additional information. Only provide the section numbers as mentioned in the example.
+                For example: 
+                Section 1: 194C
+                Section 2: 194Q
+                """
+
+# Question prompt for TDS section classification
+CLASSIFICATION_PROMPT = PromptTemplate(
+    input_variables=["ll_keywords", "hl_keywords", "summary"],
+    template=(
+        CLASSIFICATION_TASK
+        + CLASSIFICATION_GUIDELINES
+        + CLASSIFICATION_ITEM
+        + CLASSIFICATION_OUTPUT_FORMAT
+    )
+)
+
+# Batch classification: instructions shared by every transaction in one call (substituted
+# into the batch prompt as a value, so they need no brace escaping), and the question
+# asked per transaction
+CLASSIFICATION_INSTRUCTIONS = (
+    CLASSIFICATION_TASK + CLASSIFICATION_GUIDELINES + CLASSIFICATION_OUTPUT_FORMAT
+)
+CLASSIFICATION_ITEM_PROMPT = PromptTemplate(
+    input_variables=["ll_keywords", "hl_keywords", "summary"],
+    template=CLASSIFICATION_ITEM
+)
+
 
 class TransactionApp:
     """
@@ -31,15 +145,28 @@ class TransactionApp:
       - Token counters
       - LLM model functionality
       - Embedding functionality
+      - Concurrent transaction classification
       - Main processing flow
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrent_transactions=MAX_CONCURRENT_TRANSACTIONS,
+        classification_batch_size=CLASSIFICATION_BATCH_SIZE,
+    ):
         """
-        Initialize the application with counters for input and output tokens.
+        Initialize the application with counters for input and output tokens, the
+        maximum number of transactions that may be in flight at once and the number of
+        transactions answered by one classification prompt.
         """
         self.total_input_tokens = 0
         self.total_output_tokens = 0
+        self.max_concurrent_transactions = max_concurrent_transactions
+        self.classification_batch_size = classification_batch_size
+        self._pending_classifications = []  # (transaction_no, summary, future)
+        self._classification_flush = None
+        self._classification_tasks = set()  # running batches, referenced until done
+        self.embedder = SentenceTransformerEmbedding('all-MiniLM-L6-v2')
 
     async def llm_model_func(
         self,
@@ -50,15 +177,16 @@ class TransactionApp:
         **kwargs
     ) -> str:
         """
-        Asynchronous function to call the AzureOpenAI chat completion endpoint. 
+        Asynchronous function to call the AzureOpenAI chat completion endpoint through the
+        shared async client, so concurrent calls reuse pooled keep-alive connections.
         It builds the messages list from system and user prompts, logs token usage, 
         and updates the global (class-level) counters.
         """
-        # Create a client for AzureOpenAI
-        client = AzureOpenAI(
+        # Reuse the shared, connection-pooled AzureOpenAI client
+        client = get_azure_openai_async_client(
+            azure_endpoint=AZURE_OPENAI_ENDPOINT,
             api_key=AZURE_OPENAI_API_KEY,
             api_version=AZURE_OPENAI_API_VERSION,
-            azure_endpoint=AZURE_OPENAI_ENDPOINT,
         )
 
         # Build the messages list for the conversation
@@ -70,7 +198,7 @@ class TransactionApp:
         messages.append({"role": "user", "content": prompt})
 
         # Call the LLM
-        chat_completion = client.chat.completions.create(
+        chat_completion = await client.chat.completions.create(
             model=AZURE_OPENAI_DEPLOYMENT,
             messages=messages,
             temperature=kwargs.get("temperature", 0),
@@ -96,19 +224,251 @@ class TransactionApp:
     async def embedding_func(self, texts: list[str]) -> np.ndarray:
         """
         Asynchronous function to generate text embeddings using SentenceTransformer.
+        The model is loaded once per process and concurrent requests are micro-batched.
+        """
+        return await self.embedder(texts)
+
+
+    async def summarize_transaction(self, rag, transaction):
+        """
+        Summarize a single transaction with the LLM. Summaries are cached in LightRAG's
+        llm_response_cache under the transaction key, so recurring transactions are only
+        summarized once across runs.
+        """
+        # Format the prompt with the transaction fields
+        formatted_prompt = SUMMARY_PROMPT.format(
+            po_desc=transaction["po_desc"],
+            line_desc=transaction["line_desc"],
+            gl_desc=transaction["gl_desc"],
+            invoice_desc=transaction["invoice_desc"],
+        )
+
+        args_hash = transaction_key(transaction)
+        cached_summary, _, _, _ = await handle_cache(
+            rag.llm_response_cache, args_hash, formatted_prompt
+        )
+        if cached_summary is not None:
+            return cached_summary
+
+        summary = await self.llm_model_func(
+            prompt=formatted_prompt,
+            system_prompt=None,
+            history_messages=[
+                {
+                    "role": "system",
+                    "content": (
+                        "You are a helpful assistant responsible for interpreting transactions."
+                    )
+                },
+                {
+                    "role": "user",
+                    "content": (
+                        "Can you help me interpret this transaction comprehensively using all the details provided?"
+                    )
+                },
+            ],
+            temperature=0.1
+        )
+
+        await save_to_cache(
+            rag.llm_response_cache,
+            CacheData(args_hash=args_hash, content=summary, prompt=formatted_prompt),
+        )
+        return summary
+
+    async def classify_transaction(self, rag, transaction_no, transaction):
+        """
+        Run the summarize -> keyword extraction -> kg_query_with_keywords chain for one
+        transaction and return (summary, retrieved section). In batch mode the summary is
+        queued and classified together with other transactions in flight.
+        """
+        # Summarize the transaction
+        summary = await self.summarize_transaction(rag, transaction)
+
+        if self.classification_batch_size > 1:
+            hybrid_response = await self.batch_classify(rag, transaction_no, summary)
+            return summary, hybrid_response
+
+        # Query LightRAG in 'hybrid' mode with separate keyword extraction
+        hybrid_response = await rag.aquery_with_separate_keyword_extraction(
+            query=summary,
+            prompt=CLASSIFICATION_PROMPT,
+            param=QueryParam(mode="hybrid", top_k=5, transaction_no=transaction_no)
+        )
+        return summary, hybrid_response
+
+    def batch_classify(self, rag, transaction_no, summary):
+        """
+        Queue a summary for batch classification and return a future for its section.
+        The queue is classified once it holds enough transactions to fill a few prompts, or
+        after CLASSIFICATION_BATCH_WINDOW seconds.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_classifications.append((transaction_no, summary, future))
+
+        if len(self._pending_classifications) >= 4 * self.classification_batch_size:
+            if self._classification_flush is not None:
+                self._classification_flush.cancel()
+            self._flush_classifications(rag)
+        elif self._classification_flush is None:
+            self._classification_flush = loop.call_later(
+                CLASSIFICATION_BATCH_WINDOW, self._flush_classifications, rag
+            )
+        return future
+
+    def _flush_classifications(self, rag):
+        pending, self._pending_classifications = self._pending_classifications, []
+        self._classification_flush = None
+        if pending:
+            task = asyncio.ensure_future(self._classify_batch(rag, pending))
+            self._classification_tasks.add(task)
+            task.add_done_callback(self._classification_tasks.discard)
+
+    async def _classify_batch(self, rag, pending):
+        """
+        Classify queued summaries with LightRAG's batch query, which answers transactions
+        retrieving overlapping context with one prompt and parses the answers back.
+        """
+        try:
+            responses = await rag.aquery_batch_with_separate_keyword_extraction(
+                queries=[summary for _, summary, _ in pending],
+                prompt=CLASSIFICATION_ITEM_PROMPT,
+                instructions=CLASSIFICATION_INSTRUCTIONS,
+                param=QueryParam(
+                    mode="hybrid", top_k=5, batch_size=self.classification_batch_size
+                ),
+                transaction_nos=[transaction_no for transaction_no, _, _ in pending],
+            )
+        except Exception as e:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), response in zip(pending, responses):
+            if not future.done():
+                future.set_result(response)
+
+    async def record_transaction(
+        self, transaction_no, transaction, classification, manifest=None, trace_source=None
+    ):
+        """
+        Wait for the (possibly shared) classification and log it for this transaction.
+        A shared classification was traced under `trace_source`, the transaction number it
+        was run for; the logger copies that trace into this transaction's row.
+        The result is checkpointed in the run manifest as soon as it is logged.
         """
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        embeddings = model.encode(texts, convert_to_numpy=True)
-        return embeddings
+        key = transaction_key(transaction)
+        try:
+            summary, hybrid_response = await classification
+        except Exception as e:
+            if manifest is not None:
+                manifest.mark_failed(transaction["sr_no"], key, e)
+            raise
+
+        # Update the logger with the retrieved and original section
+        mylogger.update_transaction(transaction_no, "hybrid", **{
+            "Retrieved Section": hybrid_response,
+            "Original Answer": transaction["section"],
+            "Transaction summary": summary,
+            **({"Trace Source": trace_source} if trace_source is not None else {}),
+        })
+        if manifest is not None:
+            manifest.mark_processed(
+                transaction["sr_no"],
+                key,
+                summary=summary,
+                retrieved_section=hybrid_response,
+            )
+        return f"Transaction no: {transaction_no} Section: {hybrid_response}"
+
+    async def record_checkpointed_transaction(self, transaction_no, transaction, record):
+        """
+        Log a transaction processed by an earlier, interrupted run from its manifest record.
+        """
+        mylogger.update_transaction(transaction_no, "hybrid", **{
+            "Retrieved Section": record["retrieved_section"],
+            "Original Answer": transaction["section"],
+            "Transaction summary": record["summary"]
+        })
+        return f"Transaction no: {transaction_no} Section: {record['retrieved_section']}"
+
+    async def aprocess_transactions(self, rag, transaction_batches, manifest=None):
+        """
+        Classify transactions concurrently on a single event loop while they are still being
+        read. At most `max_concurrent_transactions` are in flight; reading the next batch
+        waits for a free slot, so memory stays bounded. Transactions with the same
+        transaction key are classified once and the result is fanned out to every duplicate.
+        Transactions already processed according to `manifest` are not classified again.
+        Results are returned in input order.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_transactions)
+        loop = asyncio.get_running_loop()
+        batches = iter(transaction_batches)
+
+        async def classify_and_release(transaction_no, transaction):
+            try:
+                return await self.classify_transaction(rag, transaction_no, transaction)
+            finally:
+                semaphore.release()
+
+        classifications = {}  # transaction key -> (transaction no, classification task) of its first occurrence
+        tasks = []
+        transaction_no = 0
+        while True:
+            # Read the next batch in a worker thread so in-flight classifications keep running
+            batch = await loop.run_in_executor(None, next, batches, None)
+            if batch is None:
+                break
+            for transaction in batch:
+                transaction_no += 1
+                key = transaction_key(transaction)
+                record = (
+                    manifest.get_processed(transaction["sr_no"], key)
+                    if manifest is not None
+                    else None
+                )
+                if record is not None:
+                    tasks.append(
+                        asyncio.create_task(
+                            self.record_checkpointed_transaction(
+                                transaction_no, transaction, record
+                            )
+                        )
+                    )
+                    continue
+                if key in classifications:
+                    trace_source, classification = classifications[key]
+                else:
+                    await semaphore.acquire()
+                    trace_source = None
+                    classification = asyncio.create_task(
+                        classify_and_release(transaction_no, transaction)
+                    )
+                    classifications[key] = (transaction_no, classification)
+                tasks.append(
+                    asyncio.create_task(
+                        self.record_transaction(
+                            transaction_no,
+                            transaction,
+                            classification,
+                            manifest,
+                            trace_source=trace_source,
+                        )
+                    )
+                )
+        return await asyncio.gather(*tasks)
 
     def run(self):
         """
         The main entry point for the transaction processing:
           1. Reads and processes text chunks from a file.
           2. Configures LightRAG for knowledge retrieval.
-          3. Reads Excel data, extracts relevant columns, and processes each transaction.
-          4. Uses both LLM for summarization and LightRAG for TDS section classification.
-          5. Logs the results and token usage.
+          3. Streams Excel data in cleaned batches and processes each transaction.
+          4. Uses both LLM for summarization and LightRAG for TDS section classification,
+             running many transactions concurrently on one event loop.
+          5. Logs the results and token usage, checkpointing each transaction in a run
+             manifest so a crashed run resumes from the failure point.
         """
         # Read file contents
         file_path = "final_docs.txt"
@@ -147,158 +507,34 @@ class TransactionApp:
         self.total_input_tokens = 0
         self.total_output_tokens = 0
 
-        # Read Excel data
-        data = pd.read_excel("sample_wht_100_data.xlsx")
-        columns_to_extract = [
-            'Sr No', 
-            'PO Line Item Description', 
-            'Line Description', 
-            'Expense GL Description', 
-            'Invoice Description',
-            'Section as required in TDS Return'     
-        ]
-        filtered_data = data[columns_to_extract]
-
-        # Convert each row into a transaction dictionary
-        transactions_list = []
-        for _, row in filtered_data.iterrows():
-            def clean_cell_value(val):
-                """
-                Clean each cell by removing unwanted characters and handling missing values.
-                """
-                if pd.isna(val):
-                    return ""
-                if isinstance(val, str):
-                    val = val.replace('\xa0', ' ').strip()
-                    return val if val else ""
-                return str(val)
-
-            po_desc = clean_cell_value(row["PO Line Item Description"])
-            line_desc = clean_cell_value(row["Line Description"])
-            gl_desc = clean_cell_value(row["Expense GL Description"])
-            invoice_desc = clean_cell_value(row["Invoice Description"])
-            section = clean_cell_value(row['Section as required in TDS Return'])
-
-            transaction = {
-                "po_desc": po_desc,
-                "line_desc": line_desc,
-                "gl_desc": gl_desc,
-                "invoice_desc": invoice_desc,
-                "section": section
-            }
-            transactions_list.append(transaction)
-
-        # Process each transaction
-        hybrid_results = []
-        for i, transaction in enumerate(transactions_list):
-            # Create a prompt template for transaction interpretation
-            prompt = PromptTemplate(
-                input_variables=["po_desc", "line_desc", "gl_desc", "invoice_desc"],
-                template="""
-                You are provided with details of a transaction including descriptions from various fields. Using the descriptions given below, generate a concise yet comprehensive summary that captures all essential aspects of the transaction.
-
-                Transaction Details: {{
-                    "po_desc": "{po_desc}",
-                    "line_desc": "{line_desc}",
-                    "gl_desc": "{gl_desc}",
-                    "invoice_desc": "{invoice_desc}"
-                }}
+        # Send retrieval traces (keywords, context, final prompt) to the transaction logger
+        trace_sink = QueueTraceSink(mylogger.update_transaction)
+        set_trace_sink(trace_sink)
 
-                Please provide a summary that integrates information from all the above fields to offer a complete understanding of the transaction in one or two sentences.
-                """
-            )
+        # Stream transactions from the Excel file in cleaned batches
+        transaction_file = "sample_wht_100_data.xlsx"
+        transaction_batches = TransactionSource(transaction_file)
 
-            # Format the prompt with the transaction fields
-            formatted_prompt = prompt.format(
-                po_desc=transaction["po_desc"],
-                line_desc=transaction["line_desc"],
-                gl_desc=transaction["gl_desc"],
-                invoice_desc=transaction["invoice_desc"],
-            )
+        # Checkpoint every finished transaction so an interrupted run resumes where it stopped
+        manifest = RunManifest(f"{os.path.splitext(transaction_file)[0]}.run-manifest.jsonl")
 
-            # Summarize the transaction
-            summary = asyncio.run(
-                self.llm_model_func(
-                    prompt=formatted_prompt,
-                    system_prompt=None,
-                    history_messages=[
-                        {
-                            "role": "system",
-                            "content": (
-                                "You are a helpful assistant responsible for interpreting transactions."
-                            )
-                        },
-                        {
-                            "role": "user",
-                            "content": (
-                                "Can you help me interpret this transaction comprehensively using all the details provided?"
-                            )
-                        },
-                    ],
-                    temperature=0.1
-                )
+        # Process all transactions on the same event loop LightRAG uses
+        loop = always_get_an_event_loop()
+        try:
+            hybrid_results = loop.run_until_complete(
+                self.aprocess_transactions(rag, transaction_batches, manifest)
             )
+        finally:
+            manifest.close()
 
-            # Prepare the question prompt for TDS section classification
-            question = PromptTemplate(
-                input_variables=["ll_keywords", "hl_keywords", "summary"],
-                template="""
-                You are provided with a transaction summary and a set of keywords extracted from that transaction summary.
-                Your task is to identify the most relevant TDS (Tax Deducted at Source) section(s) from this list:
-                ["194C", "194JA", "194JB", "194Q", "194A", "194IA", "194IB", "194H", "No TDS"] based on the guidelines below.
-
-                Guidelines:
-                1. Analyze the provided transaction summary and keywords (low-level and high-level) to determine the most applicable TDS section.
-                2. Distinctly classify transactions that involve procurement of services as falling under 194C when the service involves labor or work execution, like construction, repairs, advertising services, and broadcasting.
-                3. Classify transactions that involve straightforward goods purchases under 194Q, especially when these are large-scale transactions that purely involve buying goods without an associated service component.
-                4. For transactions involving payments for professional or technical services and royalties, consider:
-                - 194JA for specific technical services and film-related royalties,
-                - 194JB for professional services, non-compete fees, and other royalties.
-                5. When there is ambiguity or reasonable doubt between two sections, particularly between 194C and 194Q, explicitly return both sections.
-                - Format: Section 1: [primary section], Section 2: [secondary section if applicable]
-                6. If considering "No TDS" but not completely certain, list "No TDS" and pair it with the next most applicable section.
-                - Format: Section 1: No TDS, Section 2: [second most applicable section]
-                7. Avoid defaulting to "No TDS" unless it is clear from the transaction details that no TDS deduction is applicable.
-
-                #### Keywords:
-                Low-level keywords: {ll_keywords}
-                High-level keywords: {hl_keywords}
-
-                ### Transaction summary:
-                Transaction summary: {summary}
-
-                ### Required Output Format:
-                Section 1: [Your answer here]
-                Section 2: [Optional; include only if applicable based on ambiguity]
-
-                ### Strictly adhere to this output format. Do not include any additional information. Only provide the section numbers as mentioned in the example.
-                For example: 
-                Section 1: 194C
-                Section 2: 194Q
-                """
-            )
-
-            # Query LightRAG in 'hybrid' mode with separate keyword extraction
-            hybrid_response = rag.query_with_separate_keyword_extraction(
-                query=summary,
-                prompt=question,
-                param=QueryParam(mode="hybrid", top_k=5, transaction_no=i+1)
-            )
-
-            # Collect the results
-            hybrid_results.append(f"Transaction no: {i+1} Section: {hybrid_response}")
-
-            # Update the logger with the retrieved and original section
-            mylogger.update_transaction(i+1, "hybrid", **{
-                "Retrieved Section": hybrid_response,
-                "Original Answer": transaction["section"], 
-                "Transaction summary": summary
-            })
-        
-        # Save all transaction logs to Excel
+        # Drain pending traces, then save all transaction logs to Excel
+        trace_sink.close()
         mylogger.save_to_excel()    
+
+        # Every result is in the Excel file now, the next run starts from scratch
+        manifest.clear()
         
-        print("########################## Tokens used for 100 queries: #####################################")
+        print(f"########################## Tokens used for {len(hybrid_results)} queries: #####################################")
         print("Total Input Tokens:", self.total_input_tokens)
         print("Total Output Tokens:", self.total_output_tokens)
 
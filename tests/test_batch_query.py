@@ -0,0 +1,86 @@
+import asyncio
+
+from lightrag import operate
+from lightrag.base import QueryParam
+
+INSTRUCTIONS = "Classify the transaction.\nSection 1: [Your answer here]"
+ENTITIES = 'id,entity\n0,"ACME"'
+RELATIONS = 'id,source,target\n0,"ACME","VENDOR"'
+
+
+def run_batch_query(monkeypatch, queries, llm_responses, batch_size=8):
+    """Run kg_batch_query_with_keywords on fixed context tables, returning the
+    responses and the system prompts the LLM was called with."""
+
+    async def query_vdbs(requests):
+        return [[[] for _ in texts] for _, texts, _ in requests]
+
+    async def build_query_context_tables(*args, **kwargs):
+        return ENTITIES, RELATIONS, "id,content"
+
+    system_prompts = []
+
+    async def llm_model_func(prompt, system_prompt=None, **kwargs):
+        system_prompts.append(system_prompt)
+        return llm_responses(system_prompt)
+
+    monkeypatch.setattr(operate, "_query_vdbs", query_vdbs)
+    monkeypatch.setattr(
+        operate, "_build_query_context_tables", build_query_context_tables
+    )
+    query_params = [
+        QueryParam(
+            mode="hybrid",
+            hl_keywords=["tax"],
+            ll_keywords=["acme"],
+            batch_size=batch_size,
+            transaction_no=n,
+        )
+        for n in range(len(queries))
+    ]
+    responses = asyncio.run(
+        operate.kg_batch_query_with_keywords(
+            queries,
+            query_params,
+            INSTRUCTIONS,
+            knowledge_graph_inst=None,
+            entities_vdb=None,
+            relationships_vdb=None,
+            text_chunks_db=None,
+            global_config={"llm_model_func": llm_model_func},
+        )
+    )
+    return responses, system_prompts
+
+
+def test_singleton_group_prompt_has_instructions(monkeypatch):
+    responses, system_prompts = run_batch_query(
+        monkeypatch, ["Summary: paid ACME"], lambda _: "Section 1: 194C"
+    )
+    assert responses == ["Section 1: 194C"]
+    assert len(system_prompts) == 1
+    assert INSTRUCTIONS in system_prompts[0]
+
+
+def test_unbatched_query_prompt_has_instructions(monkeypatch):
+    _, system_prompts = run_batch_query(
+        monkeypatch, ["Summary: paid ACME"], lambda _: "Section 1: 194C", batch_size=1
+    )
+    assert len(system_prompts) == 1
+    assert INSTRUCTIONS in system_prompts[0]
+
+
+def test_missing_batch_answer_fallback_has_instructions(monkeypatch):
+    def llm_responses(system_prompt):
+        # The batch call answers nothing parseable, each query is asked again alone
+        if "several independent questions" in system_prompt:
+            return "unparseable"
+        return "Section 1: 194C"
+
+    responses, system_prompts = run_batch_query(
+        monkeypatch, ["Summary: paid ACME", "Summary: paid ACME again"], llm_responses
+    )
+    assert responses == ["Section 1: 194C", "Section 1: 194C"]
+    assert len(system_prompts) == 3
+    assert "several independent questions" in system_prompts[0]
+    assert all(INSTRUCTIONS in system_prompt for system_prompt in system_prompts)
@@ -1,70 +1,169 @@
-import pandas as pd
+import glob
+import json
+import logging
 import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Columns written by the retrieval trace of a classification
+TRACE_COLUMNS = [
+    "High-Level Keywords", "Low-Level Keywords", "Entities Retrieved", "Relations Retrieved",
+    "Chunks Retrieved", "Final Prompt"
+]
+
 
 class TransactionLogger:
-    def __init__(self, file_name="final-results-gpt4o.xlsx"):
+    """
+    Collects per-transaction results keyed by (Transaction No, Mode).
+
+    Updates are merged into an in-memory index in O(1) and appended to a JSONL segment for
+    this run, which a background thread flushes every `flush_interval` seconds. The Excel
+    file is only written by `save_to_excel`, as a final compaction step. Segments left
+    behind by interrupted runs are replayed on start-up, so their rows reach the Excel file.
+    """
+
+    def __init__(self, file_name="final-results-gpt4o.xlsx", flush_interval=5.0):
         self.file_name = file_name
-        self.data = []  # Use a list to store rows of data
+        self.flush_interval = flush_interval
+        run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.segment_file_name = f"{os.path.splitext(file_name)[0]}.{run_id}.jsonl"
         self.headers = [
-            "Transaction No", "Transaction summary", "High-Level Keywords", "Low-Level Keywords", 
-            "Entities Retrieved", "Relations Retrieved", "Chunks Retrieved", "Final Prompt", 
+            "Transaction No", "Transaction summary", "High-Level Keywords", "Low-Level Keywords",
+            "Entities Retrieved", "Relations Retrieved", "Chunks Retrieved", "Final Prompt",
             "Mode", "Retrieved Section", "Original Answer"
         ]
+        self.rows = {}  # (transaction_no, mode) -> row
+        self._pending = []  # updates not yet flushed to the segment
+        self._lock = threading.Lock()
+        self._stop_flushing = threading.Event()
+        self._flush_thread = None
+        self._recovered_segments = self._recover_segments()
+
+    def _recover_segments(self):
+        """
+        Merge the rows of segments left by interrupted runs, returning their file names.
+        """
+        pattern = f"{glob.escape(os.path.splitext(self.file_name)[0])}.*.jsonl"
+        segment_file_names = sorted(
+            name for name in glob.glob(pattern) if name != self.segment_file_name
+        )
+        for segment_file_name in segment_file_names:
+            for key, row in self.load_segment(segment_file_name).items():
+                self.rows.setdefault(key, {}).update(row)
+            logger.info(f"Recovered transaction rows from {segment_file_name}.")
+        return segment_file_names
 
-        # Check if the file exists and load data
-        if os.path.exists(self.file_name):
-            self.existing_data = pd.read_excel(self.file_name)
-        else:
-            # Initialize an empty DataFrame with headers
-            self.existing_data = pd.DataFrame(columns=self.headers)
-
-    # def update_transaction(self, transaction_no, **kwargs):
-    #     """
-    #     Add a new row to the data.
-    #     """
-    #     row = {"Transaction No": transaction_no}
-    #     row.update(kwargs)
-    #     self.data.append(row)
     def update_transaction(self, transaction_no, mode, **kwargs):
         """
-        Update or add a new row to the data based on the composite key of Transaction No and Mode.
+        Update or add a new row based on the composite key of Transaction No and Mode.
         """
-        row = {"Transaction No": transaction_no, "Mode": mode}
-        row.update(kwargs)
-        # Debugging output
-        print("Row to be updated/added:", row)
-        # Check if the row already exists
-        matching_rows = [(index, r) for index, r in enumerate(self.data)
-                         if r["Transaction No"] == transaction_no and r["Mode"] == mode]
-        
-        if matching_rows:
-            # Update the existing row
-            index, existing_row = matching_rows[0]  # Assuming only one match should be found
-            existing_row.update(row)
-            self.data[index] = existing_row
-            print(f"Updated row for Transaction No = {transaction_no} and Mode = {mode}.")
-        else:
-            # Add new row
-            self.data.append(row)
-            print(f"Added new row for Transaction No = {transaction_no} and Mode = {mode}.")
+        update = {"Transaction No": transaction_no, "Mode": mode, **kwargs}
+        with self._lock:
+            row = self.rows.get((transaction_no, mode))
+            if row is None:
+                self.rows[(transaction_no, mode)] = dict(update)
+            else:
+                row.update(update)
+            self._pending.append(update)
+        logger.debug(f"Updated row for Transaction No = {transaction_no} and Mode = {mode}.")
+        self._start_flushing()
+
+    def _start_flushing(self):
+        if self._flush_thread is not None:
+            return
+        with self._lock:
+            if self._flush_thread is None:
+                self._stop_flushing.clear()
+                self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flush_thread.start()
+
+    def _flush_loop(self):
+        while not self._stop_flushing.wait(self.flush_interval):
+            self.flush()
+
+    def _stop_flush_thread(self):
+        thread = self._flush_thread
+        if thread is not None:
+            self._stop_flushing.set()
+            thread.join()
+            self._flush_thread = None
+
+    def flush(self):
+        """
+        Append pending updates to this run's JSONL segment.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        with open(self.segment_file_name, "a", encoding="utf-8") as f:
+            for update in pending:
+                f.write(json.dumps(update, ensure_ascii=False, default=str) + "\n")
+
+    @staticmethod
+    def load_segment(segment_file_name):
+        """
+        Rebuild the logged rows, keyed by (Transaction No, Mode), from a JSONL segment.
+        """
+        rows = {}
+        with open(segment_file_name, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    update = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partly written last line from a crash
+                    logger.warning(f"Ignoring incomplete line in {segment_file_name}")
+                    continue
+                key = (update["Transaction No"], update["Mode"])
+                rows.setdefault(key, {}).update(update)
+        return rows
+
+    def _rows_with_shared_traces(self):
+        """
+        The logged rows, with the trace columns of rows that reused another transaction's
+        classification ("Trace Source") copied from that transaction's row.
+        """
+        rows = []
+        for (_, mode), row in self.rows.items():
+            source = self.rows.get((row.get("Trace Source"), mode))
+            if source is not None:
+                row = {**{c: source[c] for c in TRACE_COLUMNS if c in source}, **row}
+            rows.append(row)
+        return rows
 
     def save_to_excel(self):
         """
         Save all logged transactions to an Excel file, appending to existing data.
         """
-        # Convert current data to a DataFrame
-        new_df = pd.DataFrame(self.data, columns=self.headers)
+        self._stop_flush_thread()
+        self.flush()
+
+        with self._lock:
+            new_df = pd.DataFrame(self._rows_with_shared_traces(), columns=self.headers)
 
         # Append to existing data
-        updated_df = pd.concat([self.existing_data, new_df], ignore_index=True)
+        if os.path.exists(self.file_name):
+            existing_data = pd.read_excel(self.file_name)
+            updated_df = pd.concat([existing_data, new_df], ignore_index=True)
+        else:
+            updated_df = new_df
 
         # Save the updated data to the Excel file
         updated_df.to_excel(self.file_name, index=False)
 
-        # Clear the in-memory data after saving
-        self.data.clear()
-
-
+        # Clear the in-memory data and the segments now that Excel holds them
+        with self._lock:
+            self.rows.clear()
+        for segment_file_name in [self.segment_file_name, *self._recovered_segments]:
+            if os.path.exists(segment_file_name):
+                os.remove(segment_file_name)
+        self._recovered_segments = []
 
 
 # Create a shared logger instance
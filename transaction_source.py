@@ -0,0 +1,105 @@
+import os
+import pandas as pd
+
+# Source column -> transaction field
+TRANSACTION_COLUMNS = {
+    "Sr No": "sr_no",
+    "PO Line Item Description": "po_desc",
+    "Line Description": "line_desc",
+    "Expense GL Description": "gl_desc",
+    "Invoice Description": "invoice_desc",
+    "Section as required in TDS Return": "section",
+}
+
+
+class TransactionSource:
+    """
+    Streams transactions from an Excel, CSV or Parquet file in batches.
+
+    Rows are read in chunks of `batch_size`, cleaned with vectorized column operations and
+    yielded as lists of transaction dictionaries, so memory stays flat for large ledgers and
+    classification can start before the whole file has been read.
+    """
+
+    def __init__(self, file_name, batch_size=500, columns=None, sheet_name=None):
+        self.file_name = file_name
+        self.batch_size = batch_size
+        self.columns = columns or TRANSACTION_COLUMNS
+        self.sheet_name = sheet_name
+
+    def __iter__(self):
+        for frame in self._iter_frames():
+            yield self.clean_frame(frame).rename(columns=self.columns).to_dict("records")
+
+    def _iter_frames(self):
+        """
+        Yield raw DataFrames of at most `batch_size` rows with only the configured columns.
+        """
+        extension = os.path.splitext(self.file_name)[1].lower()
+        if extension == ".csv":
+            yield from pd.read_csv(
+                self.file_name,
+                usecols=list(self.columns),
+                dtype=object,
+                chunksize=self.batch_size,
+            )
+        elif extension in (".xlsx", ".xlsm"):
+            yield from self._iter_excel_frames()
+        elif extension == ".parquet":
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(self.file_name)
+            for record_batch in parquet_file.iter_batches(
+                batch_size=self.batch_size, columns=list(self.columns)
+            ):
+                yield record_batch.to_pandas()
+        else:
+            raise ValueError(f"Unsupported transaction file type: {extension}")
+
+    def _iter_excel_frames(self):
+        """
+        Read the workbook in read-only mode so rows are streamed instead of loaded at once.
+        """
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.file_name, read_only=True, data_only=True)
+        try:
+            sheet = (
+                workbook[self.sheet_name] if self.sheet_name else workbook.worksheets[0]
+            )
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            missing = [column for column in self.columns if column not in header]
+            if missing:
+                raise KeyError(f"Columns not found in {self.file_name}: {missing}")
+            positions = [header.index(column) for column in self.columns]
+
+            batch = []
+            for row in rows:
+                batch.append([row[i] if i < len(row) else None for i in positions])
+                if len(batch) >= self.batch_size:
+                    yield pd.DataFrame(batch, columns=list(self.columns), dtype=object)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=list(self.columns), dtype=object)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def clean_frame(frame):
+        """
+        Clean every cell by removing unwanted characters and handling missing values:
+        missing values become "", other values are converted to stripped strings with
+        non-breaking spaces replaced.
+        """
+        cleaned = {}
+        for column in frame.columns:
+            values = frame[column]
+            missing = values.isna()
+            values = (
+                values.astype(str).str.replace("\xa0", " ", regex=False).str.strip()
+            )
+            cleaned[column] = values.mask(missing, "")
+        return pd.DataFrame(cleaned, index=frame.index)